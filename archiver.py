@@ -0,0 +1,328 @@
+import json
+import os
+import shutil
+import time
+import zipfile
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import CONFIG, get_logger
+from jsonl_writer import JsonlWriter
+from output_files import latest_run_dir
+
+logger = get_logger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def packed_copy(info: zipfile.ZipInfo, path: str, size: int, mtime: float) -> bool:
+    """True when the archive member holds this very file: same size, timestamp and CRC"""
+    date_time = time.localtime(mtime)[:6]
+    # Zip timestamps have two-second resolution
+    if info.file_size != size or info.date_time != date_time[:5] + (date_time[5] // 2 * 2,):
+        return False
+    crc = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            crc = zlib.crc32(chunk, crc)
+    return crc == info.CRC
+
+
+class OutputArchiver:
+    """Pack aged runs and result files into monthly zip archives and enforce their retention.
+
+    A manifest in the archive directory remembers every source directory's
+    mtime, each file's (size, mtime) and each finished run's last write, so a
+    directory nothing was added to or removed from since the last run is not
+    listed again. Run directories (except ``latest`` and any still holding
+    ``.tmp`` files) and loose files whose last write is older than
+    CONFIG['ARCHIVE_AFTER_DAYS'] go into
+    ``<archive>/<runs|dir>/<YYYY-MM>.zip`` by month and are deleted once the
+    archive holds them.
+    Archives older than CONFIG['ARCHIVE_RETENTION_MONTHS'] are deleted. Every
+    action is appended to a JSON-lines log as it happens.
+    """
+
+    def __init__(self, output_dir=None, archive_dir=None, after_days: Optional[float] = None,
+                 retention_months: Optional[int] = None, action_log=None):
+        self.output_dir = Path(output_dir or CONFIG['OUTPUT_DIR'])
+        self.runs_dir = self.output_dir / Path(CONFIG['RUNS_DIR']).name
+        self.archive_dir = Path(archive_dir or CONFIG['ARCHIVE_DIR'])
+        self.after_days = CONFIG['ARCHIVE_AFTER_DAYS'] if after_days is None else after_days
+        self.retention_months = CONFIG['ARCHIVE_RETENTION_MONTHS'] if retention_months is None else retention_months
+        self.action_log_path = Path(action_log or CONFIG['ARCHIVE_ACTION_LOG'])
+        self.manifest_path = self.archive_dir / 'manifest.json'
+        self.manifest = self.load_manifest()
+        self.actions = None
+        self.stats = {
+            'directories_scanned': 0,
+            'directories_unchanged': 0,
+            'runs_archived': 0,
+            'files_seen': 0,
+            'files_archived': 0,
+            'bytes_archived': 0,
+            'archives_deleted': 0,
+            'errors': 0
+        }
+
+    def load_manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+        except (OSError, ValueError):
+            pass
+        return {'version': MANIFEST_VERSION, 'dirs': {}, 'files': {}, 'runs': {}, 'archives': {}}
+
+    def save_manifest(self):
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.manifest_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False)
+        os.replace(temp_path, self.manifest_path)
+
+    def log_action(self, action: str, **data):
+        self.actions.write({'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'), 'action': action, **data})
+
+    def run(self, directories: Optional[List[str]] = None) -> Dict:
+        """Archive aged files of the given output subdirectories, then apply retention"""
+        self.actions = JsonlWriter(self.action_log_path, compress=False, fsync='never')
+        try:
+            self.archive_runs()
+            for name in directories or CONFIG['ARCHIVE_DIRS']:
+                self.archive_directory(name)
+            self.apply_retention()
+        finally:
+            self.save_manifest()
+            self.actions.close()
+        return self.stats
+
+    def scan(self, directory: Path) -> Dict[str, List[float]]:
+        """{path: [size, mtime]} of the directory's files, from the manifest when it is unchanged"""
+        key = str(directory)
+        known = {path: entry for path, entry in self.manifest['files'].items() if entry[2] == key}
+        try:
+            directory_mtime = directory.stat().st_mtime
+        except FileNotFoundError:
+            for path in known:
+                del self.manifest['files'][path]
+            self.manifest['dirs'].pop(key, None)
+            return {}
+
+        if self.manifest['dirs'].get(key) == directory_mtime:
+            self.stats['directories_unchanged'] += 1
+            return {path: entry[:2] for path, entry in known.items()}
+
+        self.stats['directories_scanned'] += 1
+        files = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    files[entry.path] = [stat.st_size, stat.st_mtime]
+        for path in known:
+            if path not in files:
+                del self.manifest['files'][path]
+        for path, (size, mtime) in files.items():
+            if known.get(path, [None, None])[:2] != [size, mtime]:
+                self.manifest['files'][path] = [size, mtime, key]
+                self.log_action('indexed', path=path, size=size)
+        self.manifest['dirs'][key] = directory_mtime
+        return files
+
+    def archive_runs(self):
+        """Archive whole run directories whose last write is older than the cutoff"""
+        if not self.runs_dir.is_dir():
+            return
+        runs = self.manifest.setdefault('runs', {})
+        latest = latest_run_dir(self.runs_dir)
+        cutoff = time.time() - self.after_days * 24 * 60 * 60
+        by_month: Dict[str, List[Path]] = {}
+
+        with os.scandir(self.runs_dir) as entries:
+            run_dirs = [Path(entry.path) for entry in entries if entry.is_dir(follow_symlinks=False)]
+        for path in list(runs):
+            if Path(path) not in run_dirs:
+                del runs[path]
+        for run_dir in run_dirs:
+            if latest is not None and run_dir == latest:
+                continue  # Still the run `latest` points at; it may be resumed
+            if str(run_dir) not in runs:
+                # Until it looks aged, a run's last write comes from the manifest instead of a walk
+                runs[str(run_dir)] = self.last_write(run_dir)
+                self.stats['directories_scanned'] += 1
+            elif runs[str(run_dir)] is None or runs[str(run_dir)] < cutoff:
+                # Other processes (pool parents, daemon workers) may have written to it since; look again
+                runs[str(run_dir)] = self.last_write(run_dir)
+                self.stats['directories_scanned'] += 1
+            if runs[str(run_dir)] is None:
+                self.log_action('skipped_run', path=str(run_dir), reason='temporary files')
+                continue  # A writer is still publishing into it, or stopped before its rename
+            if runs[str(run_dir)] < cutoff:
+                month = datetime.fromtimestamp(runs[str(run_dir)]).strftime('%Y-%m')
+                by_month.setdefault(month, []).append(run_dir)
+
+        for month, run_dirs in sorted(by_month.items()):
+            archive_path = self.archive_dir / 'runs' / f"{month}.zip"
+            for run_dir in sorted(run_dirs):
+                self.add_run_to_archive(archive_path, month, run_dir)
+
+    def last_write(self, run_dir: Path) -> Optional[float]:
+        """Newest mtime of the run's files, or None while it holds ``.tmp`` files"""
+        last = None
+        for path in run_dir.rglob('*'):
+            if path.name.endswith('.tmp'):
+                return None
+            try:
+                if path.is_file():
+                    mtime = path.stat().st_mtime
+                    last = mtime if last is None else max(last, mtime)
+            except FileNotFoundError:
+                pass
+        return run_dir.stat().st_mtime if last is None else last
+
+    def add_run_to_archive(self, archive_path: Path, month: str, run_dir: Path):
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        files = [f for f in sorted(run_dir.rglob('*')) if f.is_file()]
+        size = sum(f.stat().st_size for f in files)
+        try:
+            with zipfile.ZipFile(archive_path, 'a', compression=zipfile.ZIP_DEFLATED,
+                                 compresslevel=CONFIG['ARCHIVE_COMPRESSION_LEVEL']) as archive:
+                existing = {info.filename: info for info in archive.infolist()}
+                for path in files:
+                    member = f"{run_dir.name}/{path.relative_to(run_dir).as_posix()}"
+                    stat = path.stat()
+                    if member not in existing or not packed_copy(existing[member], str(path), stat.st_size, stat.st_mtime):
+                        archive.write(path, member)
+        except (OSError, zipfile.BadZipFile) as e:
+            self.stats['errors'] += 1
+            self.log_action('error', path=str(run_dir), error=str(e))
+            logger.error(f"Could not archive run {run_dir.name}: {str(e)}")
+            return
+
+        shutil.rmtree(run_dir, ignore_errors=True)
+        self.manifest['runs'].pop(str(run_dir), None)
+        self.stats['runs_archived'] += 1
+        self.stats['files_archived'] += len(files)
+        self.stats['bytes_archived'] += size
+        self.log_action('archived_run', path=str(run_dir), files=len(files), size=size, archive=str(archive_path))
+
+        entry = self.manifest['archives'].setdefault(str(archive_path), {'month': month, 'files': 0, 'bytes': 0})
+        entry['files'] += len(files)
+        entry['bytes'] += size
+        entry['size'] = archive_path.stat().st_size
+        logger.info(f"Archived run {run_dir.name} ({len(files)} files) into {archive_path.relative_to(self.archive_dir)}")
+
+    def archive_directory(self, name: str):
+        directory = self.output_dir / name
+        files = self.scan(directory)
+        self.stats['files_seen'] += len(files)
+        cutoff = time.time() - self.after_days * 24 * 60 * 60
+
+        by_month: Dict[str, List[str]] = {}
+        for path, (size, mtime) in list(files.items()):
+            if mtime >= cutoff:
+                continue
+            # The manifest can be stale: rewriting a file in place leaves its directory's mtime alone
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                self.manifest['files'].pop(path, None)
+                del files[path]
+                continue
+            if [stat.st_size, stat.st_mtime] != [size, mtime]:
+                files[path] = [stat.st_size, stat.st_mtime]
+                self.manifest['files'][path] = [stat.st_size, stat.st_mtime, str(directory)]
+                self.log_action('indexed', path=path, size=stat.st_size)
+            if stat.st_mtime < cutoff:
+                by_month.setdefault(datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m'), []).append(path)
+        if not by_month:
+            return
+
+        for month, paths in sorted(by_month.items()):
+            archive_path = self.archive_dir / name / f"{month}.zip"
+            self.add_to_archive(archive_path, month, sorted(paths), files)
+
+        try:
+            # Deleting the originals changed the directory; record it so the next run can skip it
+            self.manifest['dirs'][str(directory)] = directory.stat().st_mtime
+        except FileNotFoundError:
+            pass
+
+    def add_to_archive(self, archive_path: Path, month: str, paths: List[str], files: Dict[str, List[float]]):
+        archive_path.parent.mkdir(parents=True, exist_ok=True)
+        archived = []
+        try:
+            with zipfile.ZipFile(archive_path, 'a', compression=zipfile.ZIP_DEFLATED,
+                                 compresslevel=CONFIG['ARCHIVE_COMPRESSION_LEVEL']) as archive:
+                existing = {info.filename: info for info in archive.infolist()}
+                for path in paths:
+                    size, mtime = files[path]
+                    name = Path(path).name
+                    renamed = f"{Path(name).stem}_{int(mtime)}{Path(name).suffix}"
+                    if any(member in existing and packed_copy(existing[member], path, size, mtime)
+                           for member in (name, renamed)):
+                        # Already packed by a run that stopped before deleting the original
+                        archived.append(path)
+                        continue
+                    member = renamed if name in existing else name
+                    try:
+                        archive.write(path, member)
+                        archived.append(path)
+                    except OSError as e:
+                        self.stats['errors'] += 1
+                        self.log_action('error', path=path, error=str(e))
+                        logger.error(f"Could not archive {path}: {str(e)}")
+        except (OSError, zipfile.BadZipFile) as e:
+            self.stats['errors'] += 1
+            self.log_action('error', path=str(archive_path), error=str(e))
+            logger.error(f"Could not write archive {archive_path}: {str(e)}")
+            return
+
+        # The archive is closed (central directory written) before any original is removed
+        for path in archived:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.stats['errors'] += 1
+                self.log_action('error', path=path, error=str(e))
+                continue
+            size = files[path][0]
+            self.manifest['files'].pop(path, None)
+            self.stats['files_archived'] += 1
+            self.stats['bytes_archived'] += size
+            self.log_action('archived', path=path, size=size, archive=str(archive_path))
+
+        entry = self.manifest['archives'].setdefault(str(archive_path), {'month': month, 'files': 0, 'bytes': 0})
+        entry['files'] += len(archived)
+        entry['bytes'] += sum(files[path][0] for path in archived)
+        entry['size'] = archive_path.stat().st_size
+        logger.info(f"Archived {len(archived)} files into {archive_path.relative_to(self.archive_dir)}")
+
+    def apply_retention(self):
+        """Delete monthly archives older than the retention period (0 keeps them forever)"""
+        if not self.retention_months:
+            return
+        now = datetime.now()
+        current = now.year * 12 + now.month - 1
+        for path, entry in list(self.manifest['archives'].items()):
+            year, month = (int(part) for part in entry['month'].split('-'))
+            if current - (year * 12 + month - 1) <= self.retention_months:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self.stats['errors'] += 1
+                self.log_action('error', path=path, error=str(e))
+                continue
+            del self.manifest['archives'][path]
+            self.stats['archives_deleted'] += 1
+            self.log_action('expired', path=path, month=entry['month'], files=entry['files'])
+            logger.info(f"Deleted expired archive {Path(path).name} ({entry['files']} files)")
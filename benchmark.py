@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+import zlib
+from datetime import datetime
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from config import CONFIG, get_logger
+from metrics import metrics
+from utils import scheduler
+
+logger = get_logger(__name__)
+
+ALL_WRITERS = ['json', 'excel', 'run_excel', 'jsonl', 'parquet', 'rank_store']
+
+# CLI entry points whose `--help` start-up time is held to CONFIG['COLD_START_BUDGET']
+ENTRY_POINTS = ['main.py', 'scraper.py', 'content_processor.py', 'benchmark.py']
+
+# Metrics compared by --compare; True means higher is better
+COMPARED_METRICS = {
+    'keywords_per_min': True,
+    'extraction_ms_per_page': False,
+    'processing_us_per_result': False,
+    'logging_us_per_keyword': False,
+}
+
+RESULT_TEMPLATE = '''<div class="g"><div><a href="{link}"><h3>{title}</h3></a>
+<div class="VwiC3b"><span>{description}</span></div></div></div>'''
+
+# Blocked domains are mixed in so the domain filter does real work
+SYNTHETIC_DOMAINS = ['example.com', 'example.org', 'docs.example.net', 'shop.example.io', 'blog.example.co.uk',
+                     'www.youtube.com', 'news.example.de', 'wiki.example.org', 'm.facebook.com', 'example.ir']
+
+
+def synthetic_serp(keyword: str, page: int = 1, results: int = 10, padding_kb: int = 200) -> str:
+    """A Google-like results page: ``results`` div.g blocks inside #search plus inline script padding"""
+    rng = random.Random(f"{keyword}:{page}")
+    blocks = []
+    for index in range(results):
+        domain = rng.choice(SYNTHETIC_DOMAINS)
+        position = (page - 1) * results + index + 1
+        blocks.append(RESULT_TEMPLATE.format(
+            link=f"https://{domain}/{escape(keyword.replace(' ', '-'))}/{position}",
+            title=escape(f"{keyword.title()} result {position} - {domain}"),
+            description=escape(f"Everything about {keyword} on {domain}. " * rng.randint(2, 6))
+        ))
+    # Real result pages carry several hundred KB of inline scripts and styles
+    padding = '<script>var _x="' + 'x' * 1024 + '";</script>\n'
+    return (
+        f"<!DOCTYPE html><html><head><title>{escape(keyword)} - Search</title>{padding * (padding_kb // 2)}</head>"
+        f"<body><div id=\"search\"><div id=\"rso\">{''.join(blocks)}</div></div>"
+        f"{padding * (padding_kb - padding_kb // 2)}<a id=\"pnnext\" href=\"?{urlencode({'q': keyword, 'start': page * 10})}\">Next</a>"
+        f"</body></html>"
+    )
+
+
+class SerpServer:
+    """Local HTTP stand-in for the search engine with configurable latency and error rate.
+
+    Serves recorded pages from ``pages`` (round robin by keyword and page) or
+    synthetic ones. A share ``error_rate`` of requests gets a 503, like a block.
+    """
+
+    def __init__(self, pages: Optional[List[str]] = None, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, padding_kb: int = 200, seed: int = 1234, port: int = 0):
+        self.pages = pages or []
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.padding_kb = padding_kb
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self.make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name='serp-server', daemon=True)
+
+    @property
+    def search_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/search"
+
+    def page_for(self, keyword: str, page: int) -> str:
+        if self.pages:
+            return self.pages[zlib.crc32(f"{keyword}:{page}".encode('utf-8')) % len(self.pages)]
+        return synthetic_serp(keyword, page, padding_kb=self.padding_kb)
+
+    def make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                query = parse_qs(urlsplit(self.path).query)
+                keyword = query.get('q', [''])[0]
+                page = int(query.get('start', ['0'])[0]) // 10 + 1
+                with server.lock:
+                    server.requests += 1
+                    delay = server.latency + server.rng.uniform(0, server.jitter)
+                    failed = server.rng.random() < server.error_rate
+                    if failed:
+                        server.errors += 1
+                time.sleep(delay)
+
+                if failed:
+                    body = b'<html><body>Our systems have detected unusual traffic</body></html>'
+                    self.send_response(503)
+                else:
+                    body = server.page_for(keyword, page).encode('utf-8')
+                    self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with server.lock:
+                    server.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def fetch(url: str) -> Optional[str]:
+    try:
+        with urllib.request.urlopen(url, timeout=CONFIG['TIMEOUT']) as response:
+            return response.read().decode('utf-8', errors='replace')
+    except urllib.error.HTTPError:
+        return None
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in Path(path).rglob('*') if f.is_file())
+
+
+def scrape_offline(processor, server: SerpServer, keywords: List[str]) -> Dict[str, List[Dict]]:
+    """Fetch both result pages over HTTP and run the WebScraper extraction and result processing"""
+    scraped = {}
+    for keyword in keywords:
+        processor.current_keyword = keyword
+        processor.stats['processed_keywords'] += 1
+        with metrics.time('process_keyword'):
+            raw_results = []
+            for page in (1, 2):
+                url = processor.build_search_url(keyword, page)
+                with metrics.time('navigation'):
+                    html = fetch(url)
+                if html is None:
+                    metrics.inc('fetch_errors')
+                    break
+                with metrics.time('extraction'):
+                    page_results = processor.extract_results_from_html(html, base_url=url)
+                metrics.inc('pages_extracted')
+                raw_results.extend(page_results)
+
+            results = []
+            start = time.perf_counter()
+            for index, result in enumerate(raw_results[:20], 1):
+                result['rank'] = index
+                processed = processor.process_result(result)
+                if processed:
+                    results.append(processed)
+            metrics.observe('processing', time.perf_counter() - start)
+            metrics.inc('results_processed', len(raw_results[:20]))
+
+        if results:
+            processor.stats['successful_searches'] += 1
+            processor.stats['total_results'] += len(results)
+        else:
+            processor.stats['failed_searches'] += 1
+        scraped[keyword] = results
+    return scraped
+
+
+def scrape_with_browser(processor, keywords: List[str]) -> Dict[str, List[Dict]]:
+    """Full ContentProcessor.process_keyword path, with Chrome pointed at the local server"""
+    return {keyword: processor.process_keyword(keyword) for keyword in keywords}
+
+
+def benchmark_writers(processor, scraped: Dict[str, List[Dict]], writers: List[str], output_dir: Path) -> Dict:
+    """Run each writer over every keyword in its own pass and measure time and bytes written"""
+    report = {}
+    for name in writers:
+        before = directory_size(output_dir)
+        start = time.perf_counter()
+        for keyword, results in scraped.items():
+            if results:
+                processor.save_results(keyword, results, retry=False, writers=[name])
+        processor.close_writers()
+        seconds = time.perf_counter() - start
+        written = directory_size(output_dir) - before
+        report[name] = {
+            'seconds': round(seconds, 4),
+            'mb_written': round(written / (1024 * 1024), 3),
+            'mb_per_s': round(written / (1024 * 1024) / seconds, 2) if seconds else 0.0,
+            'ms_per_keyword': round(seconds * 1000 / max(1, len(scraped)), 3)
+        }
+    return report
+
+
+def measure_cold_start(repeat: int = 5, budget: Optional[float] = None) -> Dict:
+    """Median wall time of `python <entry point> --help` in a fresh interpreter, against the budget"""
+    budget = budget or CONFIG['COLD_START_BUDGET']
+    base_dir = Path(__file__).parent
+    report = {}
+    for script in ENTRY_POINTS:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, str(base_dir / script), '--help'], cwd=base_dir,
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            timings.append(time.perf_counter() - start)
+        median = sorted(timings)[len(timings) // 2]
+        report[script] = {
+            'median_ms': round(median * 1000, 1),
+            'budget_ms': round(budget * 1000, 1),
+            'within_budget': median <= budget
+        }
+    return report
+
+
+def measure_record_memory(rows: int = 20000) -> Dict:
+    """Bytes per processed result row: the old per-row dict against ResultRecord"""
+    from result_record import ResultRecord
+
+    def dict_row(index, keyword):
+        # What process_result built before: nine keys, two timestamps formatted per row
+        return {
+            'title': f"Result title {index}",
+            'link': f"https://example.com/page/{index}",
+            'description': f"Description of result {index} " * 4,
+            'keyword': keyword,
+            'timestamp': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+            'processing_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'source': 'Google Search',
+            'rank': index % 20 + 1,
+            'status': 'processed'
+        }
+
+    def record_row(index, keyword, timestamp, processing_time):
+        return ResultRecord(f"Result title {index}", f"https://example.com/page/{index}",
+                            f"Description of result {index} " * 4, keyword, timestamp, processing_time,
+                            rank=index % 20 + 1)
+
+    def measure(build) -> float:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        used = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        del kept
+        return used / rows
+
+    # Keywords arrive as fresh strings per keyword (20 rows each), as they do from a keyword file or a pool worker
+    dict_bytes = measure(lambda: [dict_row(index, f"benchmark keyword {index // 20}") for index in range(rows)])
+    timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+    processing_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    record_bytes = measure(lambda: [record_row(index, f"benchmark keyword {index // 20}", timestamp, processing_time)
+                                    for index in range(rows)])
+    return {
+        'rows': rows,
+        'dict_bytes_per_row': round(dict_bytes, 1),
+        'record_bytes_per_row': round(record_bytes, 1),
+        'saving_percent': round((1 - record_bytes / dict_bytes) * 100, 1) if dict_bytes else 0.0
+    }
+
+
+def measure_rank_store(keywords: int = 1000, days: int = 20, results: int = 20, repeat: int = 20) -> Dict:
+    """Median time of each RankStore query helper on a store of keywords x days x results rows"""
+    import statistics
+    from datetime import timedelta
+    from rank_store import RankStore
+
+    rng = random.Random(13)
+    domains = [f"site{index}.example.com" for index in range(500)]
+    first_day = datetime(2024, 1, 1)
+    with tempfile.TemporaryDirectory(prefix='seo_rank_store_') as temp_dir:
+        store = RankStore(Path(temp_dir) / 'rankings.sqlite3')
+        start = time.perf_counter()
+        for day in range(days):
+            captured = first_day + timedelta(days=day)
+            for index in range(keywords):
+                store.add_results(f"benchmark keyword {index}", [
+                    {'link': f"https://{domain}/page", 'rank': rank, 'title': 'Result'}
+                    for rank, domain in enumerate(rng.sample(domains, results), 1)
+                ], captured)
+        load_seconds = time.perf_counter() - start
+
+        last_day = (first_day + timedelta(days=days - 1)).strftime('%Y-%m-%d')
+        queries = {
+            'rank_history': lambda: store.rank_history('benchmark keyword 7', domains[3], days=3650),
+            'domain_history': lambda: store.domain_history(domains[3], days=3650),
+            'share_of_voice_keyword': lambda: store.share_of_voice('2024-01-01', last_day, keyword='benchmark keyword 7'),
+            'share_of_voice_day': lambda: store.share_of_voice(last_day),
+            'rank_deltas_keyword': lambda: store.rank_deltas(last_day, keyword='benchmark keyword 7'),
+            'rank_deltas_day': lambda: store.rank_deltas(last_day),
+        }
+        report = {}
+        for name, query in queries.items():
+            timings = []
+            for _ in range(repeat):
+                query_start = time.perf_counter()
+                query()
+                timings.append(time.perf_counter() - query_start)
+            report[name] = round(statistics.median(timings) * 1000, 3)
+        store.close()
+    return {
+        'rows': keywords * days * results,
+        'load_rows_per_s': round(keywords * days * results / load_seconds),
+        'median_ms': report
+    }
+
+
+def measure_logging_overhead(keywords: int = 200, records: int = 30, threads: int = 4) -> Dict:
+    """Time scraping threads spend in logging calls per keyword: handlers called inline against the queue"""
+    import logging
+    import os
+    import queue
+    from logging.handlers import QueueListener
+    from config import create_log_handlers
+    from log_handlers import RecordQueueHandler
+
+    def emit_keywords(bench_logger, count):
+        for index in range(count):
+            keyword = f"benchmark keyword {index}"
+            bench_logger.info(f"Processing keyword: {keyword}")
+            for record in range(records - 2):
+                bench_logger.debug(f"Extracted result {record} for {keyword}: https://example.com/page/{record}")
+            bench_logger.info(f"Completed {keyword}: {records - 2} results")
+
+    def measure(attach) -> Dict:
+        with tempfile.TemporaryDirectory(prefix='seo_logging_') as temp_dir, open(os.devnull, 'w') as console:
+            handlers = create_log_handlers(console_stream=console, log_path=Path(temp_dir) / 'debug.log')
+            bench_logger = logging.getLogger('benchmark.logging')
+            bench_logger.propagate = False
+            bench_logger.setLevel(logging.DEBUG)
+            stop = attach(bench_logger, handlers)
+            workers = [threading.Thread(target=emit_keywords, args=(bench_logger, keywords // threads))
+                       for _ in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            seconds = time.perf_counter() - start
+            drain_start = time.perf_counter()
+            stop()
+            drain_seconds = time.perf_counter() - drain_start
+            for handler in list(bench_logger.handlers):
+                bench_logger.removeHandler(handler)
+            for handler in handlers:
+                handler.close()
+        done = keywords // threads * threads
+        return {'us_per_keyword': round(seconds * 1e6 / done, 1), 'drain_ms': round(drain_seconds * 1000, 1)}
+
+    def inline(bench_logger, handlers):
+        # What setup_logging did before: every call formats and writes under the handler locks
+        for handler in handlers:
+            bench_logger.addHandler(handler)
+        return lambda: None
+
+    def queued(bench_logger, handlers):
+        record_queue = queue.Queue(-1)
+        listener = QueueListener(record_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        bench_logger.addHandler(RecordQueueHandler(record_queue))
+        return listener.stop
+
+    sync_report = measure(inline)
+    queue_report = measure(queued)
+    return {
+        'keywords': keywords,
+        'records_per_keyword': records,
+        'threads': threads,
+        'log_format': CONFIG['LOG_FORMAT'],
+        'sync_us_per_keyword': sync_report['us_per_keyword'],
+        'queue_us_per_keyword': queue_report['us_per_keyword'],
+        'queue_drain_ms': queue_report['drain_ms'],
+        'saving_percent': (round((1 - queue_report['us_per_keyword'] / sync_report['us_per_keyword']) * 100, 1)
+                           if sync_report['us_per_keyword'] else 0.0)
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_benchmark(keywords: int = 50, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0,
+                  serp_dir: Optional[str] = None, padding_kb: int = 200, writers: Optional[List[str]] = None,
+                  browser: bool = False) -> Dict:
+    writers = writers or ALL_WRITERS
+    pages = [path.read_text(encoding='utf-8', errors='replace') for path in sorted(Path(serp_dir).glob('*.html'))] if serp_dir else None
+    keyword_list = [f"benchmark keyword {index}" for index in range(keywords)]
+
+    with tempfile.TemporaryDirectory(prefix='seo_benchmark_') as temp_dir, \
+            SerpServer(pages, latency, jitter, error_rate, padding_kb) as server:
+        output_dir = Path(temp_dir)
+        CONFIG.update({
+            'OUTPUT_DIR': output_dir,
+            'RANK_DB_PATH': output_dir / 'rankings.sqlite3',
+            'RUNS_DIR': output_dir / 'runs',
+            'SEARCH_URL': server.search_url,
+            'FAST_MODE': True,
+            'CACHE_ENABLED': False,
+            'ENRICH_RESULTS': False,
+            'COMPARE_EXTRACTION': False,
+        })
+        # The benchmark measures our code, not the politeness delay
+        scheduler.rate = scheduler.burst = 1000.0
+
+        from content_processor import ContentProcessor
+        processor = ContentProcessor(launch_browser=browser)
+        metrics.reset()
+
+        start = time.perf_counter()
+        if browser:
+            scraped = scrape_with_browser(processor, keyword_list)
+        else:
+            scraped = scrape_offline(processor, server, keyword_list)
+        scrape_seconds = time.perf_counter() - start
+
+        writer_report = benchmark_writers(processor, scraped, writers, output_dir)
+        summary = metrics.summary()
+        stages = summary['stages']
+        pages_extracted = summary['counters'].get('pages_extracted', 0)
+        results_processed = summary['counters'].get('results_processed', processor.stats['total_results'])
+        default_writer_seconds = sum(writer_report[name]['seconds'] for name in CONFIG['OUTPUT_WRITERS'] if name in writer_report)
+        total_written = sum(report['mb_written'] for report in writer_report.values())
+        total_write_seconds = sum(report['seconds'] for report in writer_report.values())
+
+        return {
+            'commit': git_commit(),
+            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'settings': {
+                'mode': 'browser' if browser else 'offline',
+                'keywords': keywords,
+                'latency_ms': latency * 1000,
+                'jitter_ms': jitter * 1000,
+                'error_rate': error_rate,
+                'pages': 'recorded' if pages else f"synthetic ({padding_kb} KB)",
+                'writers': writers
+            },
+            'summary': {
+                'keywords_per_min': round(keywords * 60 / scrape_seconds, 2),
+                'end_to_end_keywords_per_min': round(keywords * 60 / (scrape_seconds + default_writer_seconds), 2),
+                'extraction_ms_per_page': round(stages.get('extraction', {}).get('total_s', 0) * 1000 / max(1, pages_extracted), 3),
+                'processing_us_per_result': (round(stages['processing']['total_s'] * 1e6 / max(1, results_processed), 2)
+                                             if 'processing' in stages else None),
+                'write_mb_per_s': round(total_written / total_write_seconds, 2) if total_write_seconds else 0.0,
+                'failed_keywords': processor.stats['failed_searches'],
+                'server_requests': server.requests,
+                'server_errors': server.errors
+            },
+            'stages': stages,
+            'writers': writer_report
+        }
+
+
+def compare(current: Dict, previous: Dict, max_regression: Optional[float] = None) -> bool:
+    """Print the change of the key metrics; False if one regressed more than max_regression percent"""
+    ok = True
+    for name, higher_is_better in COMPARED_METRICS.items():
+        now, before = current['summary'].get(name), previous.get('summary', {}).get(name)
+        if not now or not before:
+            continue
+        change = (now - before) / before * 100
+        regression = -change if higher_is_better else change
+        flag = ''
+        if max_regression is not None and regression > max_regression:
+            flag = '  <-- regression'
+            ok = False
+        print(f"{name:<28} {before:>12.3f} -> {now:>12.3f}  ({change:+.1f}%){flag}", file=sys.stderr)
+    for script, report in current.get('cold_start', {}).items():
+        before = previous.get('cold_start', {}).get(script, {}).get('median_ms')
+        if before:
+            change = (report['median_ms'] - before) / before * 100
+            print(f"{'cold start ' + script + ' ms':<28} {before:>12.3f} -> {report['median_ms']:>12.3f}  ({change:+.1f}%)",
+                  file=sys.stderr)
+    for name, report in current.get('writers', {}).items():
+        before = previous.get('writers', {}).get(name, {}).get('mb_per_s')
+        if before:
+            change = (report['mb_per_s'] - before) / before * 100
+            flag = ''
+            if max_regression is not None and -change > max_regression:
+                flag = '  <-- regression'
+                ok = False
+            print(f"{'write ' + name + ' MB/s':<28} {before:>12.3f} -> {report['mb_per_s']:>12.3f}  ({change:+.1f}%){flag}",
+                  file=sys.stderr)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction, result processing and output writers "
+                                                 "against a local SERP server")
+    parser.add_argument('--keywords', type=int, default=50, help="Number of synthetic keywords (default: 50)")
+    parser.add_argument('--latency', type=float, default=50, help="Server latency per page in ms (default: 50)")
+    parser.add_argument('--jitter', type=float, default=0, help="Extra random latency up to this many ms")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered with 503 (0-1)")
+    parser.add_argument('--serp-dir', default=None, help="Serve recorded *.html SERP pages from this directory")
+    parser.add_argument('--padding-kb', type=int, default=200, help="Size of the synthetic page padding (default: 200)")
+    parser.add_argument('--writers', default=','.join(ALL_WRITERS),
+                        help=f"Comma-separated writers to measure (default: {','.join(ALL_WRITERS)})")
+    parser.add_argument('--browser', action='store_true',
+                        help="Drive Chrome through ContentProcessor.process_keyword instead of fetching over HTTP")
+    parser.add_argument('--output', default=None, help="Write the JSON report here (default: output/benchmarks/)")
+    parser.add_argument('--compare', default=None, help="Previous JSON report to compare against")
+    parser.add_argument('--max-regression', type=float, default=None,
+                        help="Exit with status 1 if a compared metric got worse by more than this percent")
+    parser.add_argument('--record-rows', type=int, default=20000,
+                        help="Rows used to measure memory per result row (default: 20000)")
+    parser.add_argument('--record-memory', action='store_true',
+                        help="Only measure memory per result row (dict vs ResultRecord)")
+    parser.add_argument('--rank-store', action='store_true',
+                        help="Only measure rank store query latency on a 400k-row store")
+    parser.add_argument('--logging', action='store_true',
+                        help="Only measure logging overhead per keyword (inline handlers vs the log queue)")
+    parser.add_argument('--cold-start', action='store_true',
+                        help="Only measure entry point start-up time; exit with status 1 if one is over budget")
+    parser.add_argument('--full', action='store_true',
+                        help="Also measure entry point start-up time (20 interpreter launches) in the report")
+    args = parser.parse_args()
+    # No console log handler: stdout carries only the JSON report
+
+    output_path = Path(args.output) if args.output else (
+        CONFIG['OUTPUT_DIR'] / 'benchmarks' / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+
+    if args.record_memory:
+        print(json.dumps(measure_record_memory(args.record_rows), indent=2))
+        return
+    if args.logging:
+        print(json.dumps(measure_logging_overhead(), indent=2))
+        return
+    if args.rank_store:
+        print(json.dumps(measure_rank_store(), indent=2))
+        return
+
+    if args.cold_start:
+        report = {'commit': git_commit(), 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                  'summary': {}, 'cold_start': measure_cold_start()}
+    else:
+        report = run_benchmark(
+            keywords=args.keywords,
+            latency=args.latency / 1000,
+            jitter=args.jitter / 1000,
+            error_rate=args.error_rate,
+            serp_dir=args.serp_dir,
+            padding_kb=args.padding_kb,
+            writers=[name.strip() for name in args.writers.split(',') if name.strip()],
+            browser=args.browser
+        )
+        if args.full:
+            report['cold_start'] = measure_cold_start()
+        report['record_memory'] = measure_record_memory(args.record_rows)
+        report['logging'] = measure_logging_overhead()
+        report['summary']['logging_us_per_keyword'] = report['logging']['queue_us_per_keyword']
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    print(f"Benchmark report saved to: {output_path}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        if not compare(report, previous, args.max_regression):
+            sys.exit(1)
+    over_budget = [script for script, result in report.get('cold_start', {}).items() if not result['within_budget']]
+    if over_budget:
+        print(f"Cold start over budget: {', '.join(over_budget)}", file=sys.stderr)
+        if args.cold_start:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,23 @@
+import argparse
 import shutil
 from pathlib import Path
 from datetime import datetime
 import os
+import sys
 from colorama import Fore, Style, init
 import logging
 import json
+from archiver import OutputArchiver
+from config import CONFIG
+from jsonl_writer import JsonlWriter
 
 # Initialize colorama
 init(autoreset=True)
 
+# Project files left where they are by the root tidy-up (directories such as tests/ are never touched)
+PROJECT_FILES = {'requirements.txt', 'keywords.txt', 'user_agents.txt', 'cleanup_log.txt', 'cleanup_summary.json',
+                 '.gitignore', 'pytest.ini', 'pyproject.toml', 'setup.cfg', 'tox.ini'}
+
 def setup_logging():
     """Setup logging configuration"""
     log_file = Path(__file__).parent / 'cleanup_log.txt'
@@ -29,92 +38,67 @@ def write_summary(summary_data):
     with open(summary_file, 'w', encoding='utf-8') as f:
         json.dump(summary_data, f, indent=4, ensure_ascii=False)
 
-def clean_directories():
-    """Clean and organize files in the project directories"""
+def clean_directories(archive: bool = True):
+    """Tidy stray files in the project root and archive aged results"""
     logger = setup_logging()
     start_time = datetime.now()
     
     try:
         base_dir = Path(__file__).parent
         temp_dir = base_dir / 'output' / 'temp'
-        archive_dir = base_dir / 'output' / 'archive'
         
         # Create directories if they don't exist
         temp_dir.mkdir(parents=True, exist_ok=True)
-        archive_dir.mkdir(parents=True, exist_ok=True)
         
         logger.info(f"Starting cleanup process at {start_time}")
         print(f"{Fore.CYAN}Starting cleanup process...{Style.RESET_ALL}")
         
-        # Statistics
+        # Statistics; individual actions are streamed to the action log, not kept here
         stats = {
             'start_time': start_time.strftime('%Y-%m-%d %H:%M:%S'),
             'files_processed': 0,
             'files_moved': 0,
-            'files_kept': 0,
-            'directories_processed': 0,
-            'actions': []
         }
         
         # List of important file extensions to keep
         important_extensions = {'.json', '.xlsx', '.csv', '.log', '.txt'}
         
-        # Process all directories recursively
-        for root, dirs, files in os.walk(base_dir):
-            current_dir = Path(root)
-            
-            # Skip git directory and virtual environment
-            if '.git' in dirs:
-                dirs.remove('.git')
-            if 'venv' in dirs:
-                dirs.remove('venv')
-            if '__pycache__' in dirs:
-                dirs.remove('__pycache__')
-                
-            stats['directories_processed'] += 1
-            logger.info(f"Processing directory: {current_dir}")
-            
-            for file in files:
-                file_path = current_dir / file
-                stats['files_processed'] += 1
-                
-                # Skip if file is in temp or archive directory
-                if temp_dir in file_path.parents or archive_dir in file_path.parents:
+        # Only the project root collects stray files; output/ is managed by the archiver below
+        # and walking it (caches, databases, archives) on every run is what made cleanup slow
+        with JsonlWriter(CONFIG['ARCHIVE_ACTION_LOG'], compress=False, fsync='never') as actions, \
+                os.scandir(base_dir) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
                     continue
+                file_path = Path(entry.path)
+                stats['files_processed'] += 1
                 
                 # Skip Python files and important project files
-                if file_path.suffix in ['.py', '.md'] or file in ['requirements.txt', 'keywords.txt']:
+                if file_path.suffix in ['.py', '.md'] or file_path.name in PROJECT_FILES:
                     continue
                 
-                action = {
-                    'file': str(file_path),
-                    'action': '',
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
                 # Move to appropriate directory based on extension
                 if file_path.suffix in important_extensions:
-                    # Keep important files in output directory
-                    if 'output' not in str(file_path):
-                        new_path = base_dir / 'output' / file_path.name
-                        shutil.move(str(file_path), str(new_path))
-                        action['action'] = f"Moved to output: {file_path.name}"
-                        stats['files_moved'] += 1
-                    else:
-                        action['action'] = f"Kept in output: {file_path.name}"
-                        stats['files_kept'] += 1
-                    logger.info(f"Keeping important file: {file_path.name}")
-                    print(f"{Fore.GREEN}Keeping important file: {file_path.name}{Style.RESET_ALL}")
+                    new_path = base_dir / 'output' / file_path.name
+                    message = f"Moved to output: {file_path.name}"
+                    color = Fore.GREEN
                 else:
-                    # Move other files to temp directory
                     new_path = temp_dir / file_path.name
-                    shutil.move(str(file_path), str(new_path))
-                    action['action'] = f"Moved to temp: {file_path.name}"
-                    stats['files_moved'] += 1
-                    logger.info(f"Moved to temp: {file_path.name}")
-                    print(f"{Fore.YELLOW}Moved to temp: {file_path.name}{Style.RESET_ALL}")
-                
-                stats['actions'].append(action)
+                    message = f"Moved to temp: {file_path.name}"
+                    color = Fore.YELLOW
+                shutil.move(str(file_path), str(new_path))
+                stats['files_moved'] += 1
+                actions.write({
+                    'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'action': 'moved',
+                    'path': str(file_path),
+                    'to': str(new_path)
+                })
+                logger.info(message)
+                print(f"{color}{message}{Style.RESET_ALL}")
+        
+        if archive:
+            stats['archive'] = OutputArchiver(output_dir=base_dir / 'output').run()
         
         # Update final statistics
         end_time = datetime.now()
@@ -126,10 +110,14 @@ def clean_directories():
         
         # Log final statistics
         logger.info("\nCleanup Summary:")
-        logger.info(f"Directories processed: {stats['directories_processed']}")
         logger.info(f"Files processed: {stats['files_processed']}")
         logger.info(f"Files moved: {stats['files_moved']}")
-        logger.info(f"Files kept: {stats['files_kept']}")
+        if archive:
+            archive_stats = stats['archive']
+            logger.info(f"Runs archived: {archive_stats['runs_archived']}")
+            logger.info(f"Files archived: {archive_stats['files_archived']} "
+                        f"({archive_stats['bytes_archived'] / (1024 * 1024):.1f} MB)")
+            logger.info(f"Expired archives deleted: {archive_stats['archives_deleted']}")
         logger.info(f"Duration: {stats['duration']}")
         
         print(f"\n{Fore.GREEN}Cleanup completed successfully!{Style.RESET_ALL}")
@@ -138,7 +126,8 @@ def clean_directories():
         print(f"    ├── output/")
         print(f"    │   ├── Important files (.json, .xlsx, .csv, .log, .txt)")
         print(f"    │   ├── temp/ ({stats['files_moved']} non-essential files)")
-        print(f"    │   └── archive/ (For future use)")
+        print(f"    │   ├── archive/ (Results older than {CONFIG['ARCHIVE_AFTER_DAYS']} days, one zip per month)")
+        print(f"    │   └── logs/{Path(CONFIG['ARCHIVE_ACTION_LOG']).name} (Every action, one JSON line each)")
         print(f"    ├── cleanup_log.txt (Detailed log of all actions)")
         print(f"    └── cleanup_summary.json (Statistical summary)")
         
@@ -148,6 +137,19 @@ def clean_directories():
         print(f"{Fore.RED}{error_msg}{Style.RESET_ALL}")
 
 if __name__ == "__main__":
-    clean_directories()
+    parser = argparse.ArgumentParser(description="Tidy the project root and archive aged results")
+    parser.add_argument('--no-archive', action='store_true', help="Only tidy the project root")
+    parser.add_argument('--archive-after', type=float, default=None, metavar='DAYS',
+                        help="Archive results older than this many days (default: CONFIG['ARCHIVE_AFTER_DAYS'])")
+    parser.add_argument('--retention', type=int, default=None, metavar='MONTHS',
+                        help="Delete archives older than this many months, 0 keeps them "
+                             "(default: CONFIG['ARCHIVE_RETENTION_MONTHS'])")
+    args = parser.parse_args()
+    if args.archive_after is not None:
+        CONFIG['ARCHIVE_AFTER_DAYS'] = args.archive_after
+    if args.retention is not None:
+        CONFIG['ARCHIVE_RETENTION_MONTHS'] = args.retention
+    clean_directories(archive=not args.no_archive)
     print(f"\n{Fore.CYAN}Check cleanup_log.txt for detailed information{Style.RESET_ALL}")
-    input("\nPress Enter to exit...")
\ No newline at end of file
+    if sys.stdin.isatty():
+        input("\nPress Enter to exit...")
\ No newline at end of file
@@ -3,20 +3,12 @@ from pathlib import Path
 import sys
 from datetime import datetime
 import os
-from colorama import Fore, Style, init
-
-# Initialize colorama
-init(autoreset=True)
 
 # Base directories
 BASE_DIR = Path(__file__).parent
 OUTPUT_DIR = BASE_DIR / 'output'
 LOG_DIR = OUTPUT_DIR / 'logs'
 
-# Create directories
-for dir_path in [OUTPUT_DIR, LOG_DIR]:
-    dir_path.mkdir(parents=True, exist_ok=True)
-
 # Basic configuration
 CONFIG = {
     'VERSION': '1.0.0',
@@ -24,31 +16,203 @@ CONFIG = {
     'DEBUG': False,
     'MAX_RETRIES': 3,
     'TIMEOUT': 30,
+    'OUTPUT_DIR': OUTPUT_DIR,
+    'POOL_SIZE': int(os.getenv('SCRAPER_POOL_SIZE', '1')),  # Number of browser processes
+    'EXTRACTION_METHOD': 'html',  # 'html' (page_source + serp_parser), 'script' or 'elements'
+    'COMPARE_EXTRACTION': False,  # Log timings of every extraction method per page
+    'FAST_MODE': False,  # Load result pages by URL and wait on the DOM instead of fixed sleeps
+    'SEARCH_URL': 'https://www.google.com/search',
+    'RATE_LIMIT': 0.5,  # Requests per second per host, shared by every worker
+    'RATE_BURST': 1,  # Requests a host may take back to back after being idle
+    'RATE_ERROR_WINDOW': 300,  # Seconds of outcomes used to compute the error rate
+    'RATE_MIN_SAMPLES': 3,  # Outcomes needed in the window before backing off
+    'RATE_ERROR_THRESHOLD': 0.3,  # Error share that triggers a back-off
+    'RATE_BACKOFF_FACTOR': 0.5,  # Rate multiplier applied on each back-off
+    'RATE_RECOVERY_FACTOR': 1.1,  # Rate multiplier applied on each success while backed off
+    'RATE_MIN_FRACTION': 0.1,  # Back-off never goes below this share of RATE_LIMIT
+    'BLOCKED_DOMAINS': ['google.*', 'youtube.com', 'facebook.com'],  # Subdomains are blocked too; 'name.*' covers every country TLD
+    'BLOCKLIST_FILES': [],  # Extra blocklists, one domain per line or hosts-file format
+    'ALLOWLIST_FILES': [],  # Domains that override the blocklists
+    'CACHE_ENABLED': True,
+    'CACHE_PATH': OUTPUT_DIR / 'cache' / 'serp_cache.sqlite3',
+    'CACHE_TTL': 24 * 60 * 60,  # Seconds before a cached SERP page is refetched
+    'CACHE_MAX_BYTES': 200 * 1024 * 1024,  # Least recently used pages are evicted beyond this
+    'CACHE_REFRESH': False,  # Ignore cached pages and fetch again
+    'RUNS_DIR': OUTPUT_DIR / 'runs',  # One directory per run (json, excel, jsonl); 'latest' names the newest
+    'JOURNAL_DIR': OUTPUT_DIR / 'journal',  # Completed-keyword journals used by --resume
+    'OUTPUT_WRITERS': ['json', 'run_excel', 'rank_store'],  # Also: 'excel', 'jsonl', 'parquet'
+    'RANK_DB_PATH': OUTPUT_DIR / 'rankings.sqlite3',  # Rank history written by the 'rank_store' writer
+    'PARQUET_ROW_GROUP_SIZE': 100000,  # Rows buffered per Parquet row group
+    'PARQUET_FLUSH_INTERVAL': 300,  # Seconds rows may wait in memory before they are written as a part file
+    'PARQUET_COMPRESSION': 'snappy',
+    'PER_KEYWORD_EXCEL': False,  # WebScraper writes one workbook per keyword (opt-in)
+    'ENRICH_RESULTS': False,  # Fetch each result's landing page for status, title, meta, H1, word count
+    'ENRICH_CONCURRENCY': 20,  # Open landing-page requests overall
+    'ENRICH_PER_HOST': 2,  # Open landing-page requests per host
+    'ENRICH_TIMEOUT': 20,  # Seconds per landing page
+    'ENRICH_MAX_BYTES': 2 * 1024 * 1024,  # Stop reading a landing page after this many bytes
+    'ENRICH_USER_AGENT': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+    'JSONL_COMPRESS': False,  # Write .jsonl.gz instead of .jsonl
+    'JSONL_FSYNC': 'interval',  # 'always', 'interval' or 'never'
+    'JSONL_FSYNC_INTERVAL': 5,  # Seconds between fsyncs for the 'interval' policy
+    'METRICS_FILE': LOG_DIR / 'metrics.prom',  # Prometheus text file for node_exporter's textfile collector
+    'METRICS_EXPORT_INTERVAL': 15,  # Seconds between metrics file updates during a run
+    'PROFILE': False,  # cProfile + tracemalloc per keyword (--profile)
+    'PROFILE_EVERY': 1,  # Profile every Nth keyword only
+    'PROFILE_TOP_N': 30,  # Hot functions and allocation sites kept in the report
+    'PROFILE_TRACE_FRAMES': 1,  # tracemalloc frames per allocation; more is slower
+    'BLOCK_PROFILE': 'media',  # Resources not loaded: 'off', 'media' (images, fonts, media, trackers), 'text' (+ CSS), 'strict' (+ JavaScript, fast mode only)
+    'BLOCKED_URL_PATTERNS': [],  # Extra URL patterns blocked unless the profile is 'off', e.g. '*.example-cdn.com/*'
+    'HEADLESS': False,
+    'CHROME_BINARY': None,  # Chrome executable; found automatically when None
+    'CHROME_PROFILE_DIR': None,  # Reusable Chrome profile, e.g. OUTPUT_DIR / 'chrome_profile' (one subdirectory per pool worker)
+    'DRIVER_CACHE_DIR': OUTPUT_DIR / 'drivers',  # Resolved Chrome/chromedriver locations and the patched driver
+    'DRIVER_CACHE_MAX_AGE': 7 * 24 * 60 * 60,  # Seconds before a cached driver is resolved again
+    'COLD_START_BUDGET': 0.5,  # Seconds allowed for `<entry point> --help` (benchmark.py --cold-start)
+    'JOB_DB_PATH': OUTPUT_DIR / 'jobs.sqlite3',  # Job queue shared by `daemon.py submit/status/run`
+    'DAEMON_JOB_LEASE': 10 * 60,  # Seconds before a job claimed by a dead worker is handed out again
+    'DAEMON_RETRY_DELAY': 60,  # Seconds per failed attempt before a job is retried
+    'DAEMON_BROWSER_FAILURES': 3,  # Browser errors in a row before a daemon worker exits and is restarted
+    'DAEMON_POLL_INTERVAL': 1.0,  # Seconds an idle daemon worker waits before checking the queue again
+    'SHARD_DIR': OUTPUT_DIR / 'shards',  # Shard database and per-shard results; must be shared by every node
+    'SHARD_COUNT': 16,  # Shards per run; more shards spread better across nodes
+    'SHARD_LEASE': 10 * 60,  # Seconds without progress before a node's shard is reassigned
+    'SHARD_POLL_INTERVAL': 10,  # Seconds a node with nothing to claim waits for other nodes' leases
+    'ARCHIVE_DIR': OUTPUT_DIR / 'archive',  # Monthly zip archives written by cleanup.py, plus their manifest
+    'ARCHIVE_DIRS': ['json', 'excel'],  # Loose result files from before run directories, archived file by file
+    'ARCHIVE_AFTER_DAYS': 30,  # Files older than this are moved into the archive
+    'ARCHIVE_RETENTION_MONTHS': 12,  # Monthly archives older than this are deleted; 0 keeps them forever
+    'ARCHIVE_COMPRESSION_LEVEL': 6,  # zlib level for the archives (1 fastest, 9 smallest)
+    'ARCHIVE_ACTION_LOG': LOG_DIR / 'cleanup_actions.jsonl',  # One JSON line per cleanup action
+    'LOG_FORMAT': os.getenv('SCRAPER_LOG_FORMAT', 'text'),  # Debug log as 'text' (debug.log) or 'json' (debug.jsonl, one object per line)
+    'LOG_MAX_BYTES': 10 * 1024 * 1024,  # Debug log size before it is rotated
+    'LOG_BACKUP_COUNT': 5,  # Rotated debug logs kept next to the current one
+    'CONSOLE_RATE_LIMIT': 20,  # INFO lines per second on the console; warnings and errors always show, 0 disables the limit
+}
+
+STATUS_MESSAGES = {
+    'start': 'Starting keyword processing...',
+    'complete': 'Keyword processing completed',
 }
 
-# Set up console logging
-console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.INFO)
-console_format = logging.Formatter(
-    '%(asctime)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-console_handler.setFormatter(console_format)
-
-# Set up file logging
-file_handler = logging.FileHandler(LOG_DIR / 'debug.log', encoding='utf-8')
-file_handler.setLevel(logging.DEBUG)
-file_format = logging.Formatter(
-    '%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-file_handler.setFormatter(file_format)
-
-# Configure root logger
+PROGRESS_BAR_FORMAT = {
+    'bar_format': '{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]',
+    'ncols': 100,
+}
+
+# Root logger; handlers are attached by setup_logging() so importing config has no side effects
 logger = logging.getLogger()
-logger.setLevel(logging.DEBUG)
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+_logging_configured = False
+_log_handlers = []
+_log_listeners = []
+_worker_log_queues = {}
+
+
+def ensure_directories():
+    """Create the output and log directories"""
+    for dir_path in [CONFIG['OUTPUT_DIR'], LOG_DIR]:
+        Path(dir_path).mkdir(parents=True, exist_ok=True)
+
+
+def log_file_path() -> Path:
+    return LOG_DIR / ('debug.jsonl' if CONFIG['LOG_FORMAT'] == 'json' else 'debug.log')
+
+
+def create_log_handlers(console_stream=None, log_path=None) -> list:
+    """Console and rotating debug log handlers, as set up by setup_logging()"""
+    from logging.handlers import RotatingFileHandler
+    from log_handlers import ConsoleHandler, JsonLineFormatter
+
+    # Set up console logging
+    console_stream = console_stream or sys.stdout
+    console_handler = ConsoleHandler(console_stream, rate=CONFIG['CONSOLE_RATE_LIMIT'],
+                                     color=console_stream.isatty())
+    console_handler.setLevel(logging.INFO)
+    console_format = logging.Formatter(
+        '%(asctime)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    console_handler.setFormatter(console_format)
+
+    # Set up file logging; only the listener thread writes, so rotation is safe
+    file_handler = RotatingFileHandler(log_path or log_file_path(), maxBytes=CONFIG['LOG_MAX_BYTES'],
+                                       backupCount=CONFIG['LOG_BACKUP_COUNT'], encoding='utf-8')
+    file_handler.setLevel(logging.DEBUG)
+    if CONFIG['LOG_FORMAT'] == 'json':
+        file_format = JsonLineFormatter()
+    else:
+        file_format = logging.Formatter(
+            '%(asctime)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+    file_handler.setFormatter(file_format)
+    return [console_handler, file_handler]
+
+
+def setup_logging(log_queue=None):
+    """Route the root logger through a queue to a listener thread; called once by the entry points.
+
+    Logging calls only enqueue the record, so scraping threads never wait on
+    the console or debug.log. A spawned worker passes the queue it got from
+    worker_log_queue() and its records are written by the parent's listener.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    import atexit
+    import queue
+    from logging.handlers import QueueListener
+    from log_handlers import RecordQueueHandler
+
+    logger.setLevel(logging.DEBUG)
+    _logging_configured = True
+    if log_queue is not None:
+        logger.addHandler(RecordQueueHandler(log_queue))
+        return
+
+    ensure_directories()
+
+    # Initialize colorama
+    from colorama import init
+    init(autoreset=True)
+
+    _log_handlers.extend(create_log_handlers())
+    record_queue = queue.Queue(-1)
+    listener = QueueListener(record_queue, *_log_handlers, respect_handler_level=True)
+    listener.start()
+    _log_listeners.append(listener)
+    logger.addHandler(RecordQueueHandler(record_queue))
+    atexit.register(shutdown_logging)
+
+
+def worker_log_queue(context):
+    """Queue that spawned workers pass to setup_logging(); None if this process has no handlers"""
+    if not _log_handlers:
+        return None
+    method = context.get_start_method()
+    if method not in _worker_log_queues:
+        from logging.handlers import QueueListener
+        log_queue = context.Queue(-1)
+        listener = QueueListener(log_queue, *_log_handlers, respect_handler_level=True)
+        listener.start()
+        _log_listeners.append(listener)
+        _worker_log_queues[method] = log_queue
+    return _worker_log_queues[method]
+
+
+def shutdown_logging():
+    """Write out the records still queued and stop the listener threads (also run at exit)"""
+    global _logging_configured
+    from log_handlers import RecordQueueHandler
+    while _log_listeners:
+        _log_listeners.pop().stop()
+    for handler in list(logger.handlers):
+        if isinstance(handler, RecordQueueHandler):
+            logger.removeHandler(handler)
+    while _log_handlers:
+        _log_handlers.pop().close()
+    _worker_log_queues.clear()
+    _logging_configured = False
 
 def get_logger(name):
     return logging.getLogger(name)
\ No newline at end of file
@@ -1,5 +1,5 @@
-import json
-import pandas as pd
+import argparse
+from contextlib import nullcontext
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
@@ -7,39 +7,69 @@ from tqdm import tqdm
 from colorama import Fore, Style
 import time
 import logging
-import shutil
 import os
 
-from config import CONFIG, get_logger, STATUS_MESSAGES, PROGRESS_BAR_FORMAT
+from config import CONFIG, get_logger, setup_logging, STATUS_MESSAGES, PROGRESS_BAR_FORMAT
 from web_scraper import WebScraper
+from worker_pool import WorkerPool, MSG_RESULT, MSG_ERROR, MSG_DONE
+from run_journal import RunJournal
+from jsonl_writer import JsonlWriter
+from excel_export import RunWorkbook
+from rank_store import RankStore
+from driver_cache import DriverCache
+from resource_blocking import BLOCK_PROFILES
+from metrics import metrics, MetricsExporter
+from profiling import KeywordProfiler
+from result_record import ResultRecord, as_dicts, json_default
+from output_files import atomic_path, atomic_write_json, create_run_dir, latest_run_dir
+from utils import scheduler
 
 logger = get_logger(__name__)
 
 class ContentProcessor(WebScraper):
-    def __init__(self):
+    def __init__(self, launch_browser: bool = True):
         """Initialize ContentProcessor with necessary directories and configurations"""
-        super().__init__()
+        super().__init__(launch_browser=launch_browser)
         self.output_dir = CONFIG['OUTPUT_DIR']
-        self.backup_dir = self.output_dir / 'backup'
         self.failed_dir = self.output_dir / 'failed'
+        self.run_dir = None  # output/runs/<run>, created by start_run_dir() or the first save
         self.setup_directories()
-        self.stats = {
+        self.stats = self.new_stats()
+        self.journal = None
+        self.resumed_outputs = {}
+        self.jsonl_writer = None
+        self.run_workbook = None
+        self.parquet_exporter = None
+        self.rank_store = None
+        self.unpublished = []  # Callbacks waiting for buffered Parquet rows to reach disk
+        self.profiler = KeywordProfiler() if CONFIG['PROFILE'] else None
+
+    @staticmethod
+    def new_stats() -> Dict:
+        """Return an empty statistics structure"""
+        return {
             'processed_keywords': 0,
             'successful_searches': 0,
             'failed_searches': 0,
             'total_results': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
             'start_time': datetime.now(),
             'errors': []
         }
 
+    def merge_stats(self, other: Dict):
+        """Fold statistics reported by a pool worker into self.stats"""
+        for key in ('processed_keywords', 'successful_searches', 'failed_searches', 'total_results',
+                    'cache_hits', 'cache_misses'):
+            self.stats[key] += other.get(key, 0)
+        self.stats['errors'].extend(other.get('errors', []))
+
     def setup_directories(self):
         """Create necessary directories for output management"""
         directories = [
             self.output_dir,
-            self.backup_dir,
             self.failed_dir,
-            self.output_dir / 'json',
-            self.output_dir / 'excel',
             self.output_dir / 'logs'
         ]
         
@@ -47,41 +77,39 @@ class ContentProcessor(WebScraper):
             directory.mkdir(parents=True, exist_ok=True)
             logger.debug(f"Created directory: {directory}")
 
-    def backup_existing_files(self):
-        """Backup existing result files before new processing"""
-        try:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_subdir = self.backup_dir / timestamp
-            backup_subdir.mkdir(parents=True, exist_ok=True)
-
-            # Move existing files to backup
-            for ext in ['*.json', '*.xlsx']:
-                for file in self.output_dir.glob(ext):
-                    if file.is_file():
-                        shutil.move(str(file), str(backup_subdir / file.name))
-                        logger.debug(f"Backed up: {file.name}")
-
-            logger.info(f"Previous results backed up to: {backup_subdir}")
-        except Exception as e:
-            logger.error(f"Backup error: {str(e)}")
+    def start_run_dir(self, resume: bool = False):
+        """Give this run its own output directory; earlier runs stay where they are, nothing is moved"""
+        if resume:
+            self.run_dir = latest_run_dir()
+        if self.run_dir is None:
+            self.run_dir = create_run_dir(self.stats['start_time'])
+        logger.info(f"Writing results to: {self.run_dir}")
+
+    def run_path(self, kind: str) -> Path:
+        """This run's directory for one kind of output (json, excel, jsonl)"""
+        if self.run_dir is None:
+            self.start_run_dir()
+        directory = self.run_dir / kind
+        directory.mkdir(exist_ok=True)
+        return directory
 
-    def process_result(self, result: Dict) -> Dict:
-        """Process and enrich a single search result"""
+    def process_result(self, result: Dict, timestamp: Optional[str] = None,
+                       processing_time: Optional[str] = None) -> Optional[ResultRecord]:
+        """Process and enrich a single search result (timestamps are shared by the keyword's rows)"""
         try:
-            processed_data = {
-                'title': result.get('title', '').strip(),
-                'link': result.get('link', '').strip(),
-                'description': result.get('description', '').strip(),
-                'keyword': result.get('keyword', self.current_keyword),
-                'timestamp': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
-                'processing_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'source': result.get('source', 'Google Search'),
-                'rank': result.get('rank', 0),
-                'status': 'processed'
-            }
+            processed_data = ResultRecord(
+                title=result.get('title', '').strip(),
+                link=result.get('link', '').strip(),
+                description=result.get('description', '').strip(),
+                keyword=result.get('keyword', self.current_keyword),
+                timestamp=timestamp or datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S'),
+                processing_time=processing_time or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                source=result.get('source', 'Google Search'),
+                rank=result.get('rank', 0)
+            )
             
             # Validate processed data
-            if not processed_data['title'] or not processed_data['link']:
+            if not processed_data.title or not processed_data.link:
                 logger.warning(f"Invalid result data: {processed_data}")
                 return None
                 
@@ -92,15 +120,22 @@ class ContentProcessor(WebScraper):
             self.stats['errors'].append(str(e))
             return None
 
-    def process_keyword(self, keyword: str) -> List[Dict]:
-        """Process a single keyword and return results"""
+    def process_keyword(self, keyword: str, refresh: Optional[bool] = None) -> List[ResultRecord]:
+        """Process a single keyword and return results (cached SERP pages are used unless refresh)"""
         logger.info(f"Processing keyword: {keyword}")
+        self.current_keyword = keyword
         self.stats['processed_keywords'] += 1
         results = []
+        start = time.perf_counter()
         
         try:
-            # Perform search
-            search_results = self.search_google(keyword)
+            # Perform search, served from the SERP cache when fresh
+            if self.cache:
+                hits, misses = self.cache.hits, self.cache.misses
+            search_results = self.search_google(keyword, refresh=refresh)
+            if self.cache:
+                self.stats['cache_hits'] += self.cache.hits - hits
+                self.stats['cache_misses'] += self.cache.misses - misses
             
             if not search_results:
                 logger.warning(f"No results found for keyword: {keyword}")
@@ -108,16 +143,26 @@ class ContentProcessor(WebScraper):
                 return results
             
             # Process each result
+            timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
+            processing_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             for index, result in enumerate(search_results, 1):
                 try:
                     result['rank'] = index
-                    processed_result = self.process_result(result)
+                    processed_result = self.process_result(result, timestamp, processing_time)
                     if processed_result:
                         results.append(processed_result)
                 except Exception as e:
                     logger.error(f"Error processing result {index} for {keyword}: {str(e)}")
                     continue
             
+            if results and CONFIG['ENRICH_RESULTS']:
+                try:
+                    from enrichment import LandingPageEnricher  # aiohttp is only loaded when enriching
+                    with metrics.time('enrichment'):
+                        LandingPageEnricher().enrich(results)
+                except Exception as e:
+                    logger.error(f"Error enriching results for {keyword}: {str(e)}")
+            
             if results:
                 self.stats['successful_searches'] += 1
                 self.stats['total_results'] += len(results)
@@ -131,9 +176,15 @@ class ContentProcessor(WebScraper):
             self.stats['failed_searches'] += 1
             return []
 
-    def save_results(self, keyword: str, results: List[Dict], retry: bool = True):
-        """Save results to JSON and Excel files with retry mechanism"""
+        finally:
+            metrics.observe('process_keyword', time.perf_counter() - start)
+            metrics.inc('keywords_processed')
+
+    def save_results(self, keyword: str, results: List[Dict], retry: bool = True,
+                     writers: Optional[List[str]] = None) -> Dict[str, str]:
+        """Save results with every configured output writer, returning the written paths"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        start = time.perf_counter()
         
         # Prepare output data
         output_data = {
@@ -143,101 +194,237 @@ class ContentProcessor(WebScraper):
             'total_results': len(results),
             'processing_stats': {
                 'duration': str(datetime.now() - self.stats['start_time']),
+                'cache_hits': self.stats['cache_hits'],
+                'cache_misses': self.stats['cache_misses'],
                 'success_rate': f"{(self.stats['successful_searches'] / max(1, self.stats['processed_keywords'])) * 100:.2f}%"
             }
         }
         
-        try:
-            # Save JSON
-            json_filename = self.output_dir / 'json' / f"results_{keyword}_{timestamp}.json"
-            with open(json_filename, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, ensure_ascii=False, indent=2)
-            
-            # Save Excel with additional formatting
-            df = pd.DataFrame(results)
-            excel_filename = self.output_dir / 'excel' / f"results_{keyword}_{timestamp}.xlsx"
-            
-            with pd.ExcelWriter(excel_filename, engine='xlsxwriter') as writer:
-                df.to_excel(writer, index=False, sheet_name='Results')
-                
-                # Get workbook and worksheet objects
-                workbook = writer.book
-                worksheet = writer.sheets['Results']
-                
-                # Add formats
-                header_format = workbook.add_format({
-                    'bold': True,
-                    'text_wrap': True,
-                    'valign': 'top',
-                    'bg_color': '#D9EAD3',
-                    'border': 1
-                })
-                
-                # Format headers
-                for col_num, value in enumerate(df.columns.values):
-                    worksheet.write(0, col_num, value, header_format)
-                    worksheet.set_column(col_num, col_num, 15)  # Set column width
-                
-                # Add summary sheet
-                summary_df = pd.DataFrame([{
-                    'Keyword': keyword,
-                    'Total Results': len(results),
-                    'Processing Time': output_data['processing_stats']['duration'],
-                    'Success Rate': output_data['processing_stats']['success_rate'],
-                    'Timestamp': output_data['timestamp']
-                }])
-                
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
-            
+        output_writers = {
+            'json': self.save_json,
+            'excel': self.save_excel,
+            'run_excel': self.save_run_excel,
+            'jsonl': self.save_jsonl,
+            'parquet': self.save_parquet,
+            'rank_store': self.save_rank_store,
+        }
+        outputs = {}
+        failed = []
+        for name in writers or CONFIG['OUTPUT_WRITERS']:
+            if name not in output_writers:
+                logger.error(f"Unknown output writer: {name}")
+                continue
+            try:
+                with metrics.time(f'save_{name}'):
+                    outputs[name] = output_writers[name](keyword, results, output_data, timestamp)
+            except Exception as e:
+                logger.error(f"Error saving {name} results for {keyword}: {str(e)}")
+                failed.append(name)
+
+        if outputs:
             logger.info(f"Results saved successfully:")
-            logger.info(f"├── JSON: {json_filename.name}")
-            logger.info(f"└── Excel: {excel_filename.name}")
-            
-        except Exception as e:
-            error_msg = f"Error saving results for {keyword}: {str(e)}"
-            logger.error(error_msg)
-            
+            for index, (name, path) in enumerate(outputs.items(), 1):
+                branch = '└──' if index == len(outputs) else '├──'
+                logger.info(f"{branch} {name.upper()}: {Path(path).name}")
+
+        if failed:
             if retry:
                 logger.info("Retrying save operation...")
                 time.sleep(2)
-                return self.save_results(keyword, results, retry=False)
+                outputs.update(self.save_results(keyword, results, retry=False, writers=failed))
             else:
                 # Save to failed directory as last resort
                 failed_file = self.failed_dir / f"failed_{keyword}_{timestamp}.json"
                 try:
-                    with open(failed_file, 'w', encoding='utf-8') as f:
-                        json.dump(output_data, f, ensure_ascii=False, indent=2)
+                    atomic_write_json(failed_file, output_data, ensure_ascii=False, indent=2, default=json_default)
                     logger.info(f"Results saved to failed directory: {failed_file.name}")
+                    outputs['failed'] = str(failed_file)
                 except Exception as backup_error:
                     logger.error(f"Critical: Could not save to failed directory: {str(backup_error)}")
 
-    def process_keywords(self, keywords: List[str]):
+        if retry:  # Only the outer call, so a retry counts towards the same save
+            metrics.observe('save_results', time.perf_counter() - start)
+        return outputs
+
+    def save_json(self, keyword: str, results: List[Dict], output_data: Dict, timestamp: str) -> str:
+        """Write one pretty-printed JSON file for the keyword"""
+        json_filename = self.run_path('json') / f"results_{keyword}_{timestamp}.json"
+        atomic_write_json(json_filename, output_data, ensure_ascii=False, indent=2, default=json_default)
+        return str(json_filename)
+
+    def save_excel(self, keyword: str, results: List[Dict], output_data: Dict, timestamp: str) -> str:
+        """Write one formatted Excel workbook for the keyword (opt-in, see save_run_excel)"""
+        import pandas as pd
+
+        df = pd.DataFrame(as_dicts(results))
+        excel_filename = self.run_path('excel') / f"results_{keyword}_{timestamp}.xlsx"
+        
+        with atomic_path(excel_filename) as temp_path, pd.ExcelWriter(temp_path, engine='xlsxwriter') as writer:
+            df.to_excel(writer, index=False, sheet_name='Results')
+            
+            # Get workbook and worksheet objects
+            workbook = writer.book
+            worksheet = writer.sheets['Results']
+            
+            # Add formats
+            header_format = workbook.add_format({
+                'bold': True,
+                'text_wrap': True,
+                'valign': 'top',
+                'bg_color': '#D9EAD3',
+                'border': 1
+            })
+            
+            # Format headers
+            for col_num, value in enumerate(df.columns.values):
+                worksheet.write(0, col_num, value, header_format)
+                worksheet.set_column(col_num, col_num, 15)  # Set column width
+            
+            # Add summary sheet
+            summary_df = pd.DataFrame([{
+                'Keyword': keyword,
+                'Total Results': len(results),
+                'Processing Time': output_data['processing_stats']['duration'],
+                'Success Rate': output_data['processing_stats']['success_rate'],
+                'Timestamp': output_data['timestamp']
+            }])
+            
+            summary_df.to_excel(writer, sheet_name='Summary', index=False)
+        return str(excel_filename)
+
+    def save_run_excel(self, keyword: str, results: List[Dict], output_data: Dict, timestamp: str) -> str:
+        """Append the keyword to the run's single constant-memory workbook"""
+        if self.run_workbook is None:
+            run_timestamp = self.stats['start_time'].strftime('%Y%m%d_%H%M%S')
+            self.run_workbook = RunWorkbook(self.run_path('excel') / f"run_{run_timestamp}.xlsx")
+        self.run_workbook.add_keyword(keyword, results, {
+            'Keyword': keyword,
+            'Total Results': len(results),
+            'Processing Time': output_data['processing_stats']['duration'],
+            'Success Rate': output_data['processing_stats']['success_rate'],
+            'Timestamp': output_data['timestamp']
+        })
+        return str(self.run_workbook.path)
+
+    def save_jsonl(self, keyword: str, results: List[Dict], output_data: Dict, timestamp: str) -> str:
+        """Append the keyword as one compact line to the run's JSON-lines file"""
+        if self.jsonl_writer is None:
+            run_timestamp = self.stats['start_time'].strftime('%Y%m%d_%H%M%S')
+            self.jsonl_writer = JsonlWriter(self.run_path('jsonl') / f"results_{run_timestamp}.jsonl")
+        self.jsonl_writer.write(output_data)
+        return str(self.jsonl_writer.path)
+
+    def save_parquet(self, keyword: str, results: List[Dict], output_data: Dict, timestamp: str) -> str:
+        """Add the keyword's rows to the run's Parquet file, partitioned by run date"""
+        if self.parquet_exporter is None:
+            from parquet_export import ParquetExporter  # pyarrow is only loaded for this writer
+            self.parquet_exporter = ParquetExporter(self.output_dir / 'parquet', self.stats['start_time'])
+        path = self.parquet_exporter.path  # The part file these rows go into; write() may flush and move on
+        self.parquet_exporter.write(keyword, results)
+        return str(path)
+
+    def save_rank_store(self, keyword: str, results: List[Dict], output_data: Dict, timestamp: str) -> str:
+        """Insert the keyword's rankings into the rank history database in one transaction"""
+        if self.rank_store is None:
+            self.rank_store = RankStore()
+        self.rank_store.add_results(keyword, results)
+        return str(self.rank_store.path)
+
+    def close_writers(self):
+        """Close run-level output streams"""
+        if self.jsonl_writer is not None:
+            self.jsonl_writer.close()
+            self.jsonl_writer = None
+        if self.run_workbook is not None:
+            self.run_workbook.close()
+            self.run_workbook = None
+        if self.parquet_exporter is not None:
+            if not self.parquet_exporter.close():
+                # Not journaled, so --resume and the job queue process these keywords again
+                logger.error(f"Dropping {len(self.unpublished)} keywords whose Parquet rows were not saved")
+                self.unpublished = []
+            self.parquet_exporter = None
+        if self.rank_store is not None:
+            self.rank_store.close()
+            self.rank_store = None
+        self.publish()
+
+    def when_published(self, callback):
+        """Call ``callback`` (journal entry, job completion) once the keyword's outputs are on disk.
+
+        Every writer but Parquet has written its output by the time save_results
+        returns; buffered Parquet rows are saved with the next part file.
+        """
+        self.unpublished.append(callback)
+        if self.parquet_exporter is None or not self.parquet_exporter.buffered:
+            self.publish()
+
+    def saved_outputs(self, outputs: Dict[str, str]) -> Dict[str, str]:
+        """The outputs that are on disk already: the run workbook is only written when it closes"""
+        return {name: path for name, path in outputs.items() if name != 'run_excel'}
+
+    def publish(self):
+        callbacks, self.unpublished = self.unpublished, []
+        for callback in callbacks:
+            callback()
+
+    def handle_keyword_results(self, keyword: str, results: List[Dict]):
+        """Save the results of a finished keyword"""
+        if results:
+            outputs = self.save_results(keyword, results)
+            if outputs and self.journal:
+                journal, saved = self.journal, self.saved_outputs(outputs)
+                self.when_published(lambda: journal.record(keyword, result_count=len(results), outputs=saved))
+            logger.info(f"Successfully processed keyword: {keyword}")
+        else:
+            logger.warning(f"No results found for keyword: {keyword}")
+
+    def resume_from_journal(self, keywords: List[str]) -> List[str]:
+        """Reattach outputs of journaled keywords to this run and return the remaining ones"""
+        for keyword in keywords:
+            entry = self.journal.entries.get(keyword)
+            if entry is None or keyword in self.resumed_outputs:
+                continue
+            self.resumed_outputs[keyword] = entry.get('outputs', {})
+            self.stats['processed_keywords'] += 1
+            self.stats['successful_searches'] += 1
+            self.stats['total_results'] += entry.get('result_count', 0)
+
+        if self.resumed_outputs:
+            logger.info(f"Reattached saved outputs for {len(self.resumed_outputs)} completed keywords")
+        return self.journal.pending(keywords)
+
+    def process_keywords(self, keywords: List[str], resume: bool = False):
         """Process multiple keywords with progress tracking and error handling"""
         logger.info(STATUS_MESSAGES['start'])
-        self.backup_existing_files()
+        self.journal = RunJournal('content_processor', resume=resume)
+        self.start_run_dir(resume=resume)
+        if resume:
+            keywords = self.resume_from_journal(keywords)
+        exporter = MetricsExporter(metrics).start()
         
         try:
             with tqdm(total=len(keywords), **PROGRESS_BAR_FORMAT) as self.progress_bar:
-                for keyword in keywords:
-                    try:
-                        self.progress_bar.set_description(f"Processing: {keyword}")
-                        results = self.process_keyword(keyword)
+                if CONFIG['POOL_SIZE'] > 1 and len(keywords) > 1:
+                    self.process_keywords_parallel(keywords)
+                else:
+                    for keyword in keywords:
+                        try:
+                            self.progress_bar.set_description(f"Processing: {keyword}")
+                            with self.keyword_profile(keyword):
+                                results = self.process_keyword(keyword)
+                                self.handle_keyword_results(keyword, results)
+                            
+                        except Exception as e:
+                            error_msg = f"Error processing keyword {keyword}: {str(e)}"
+                            logger.error(error_msg)
+                            self.stats['errors'].append(error_msg)
+                            continue
                         
-                        if results:
-                            self.save_results(keyword, results)
-                            logger.info(f"Successfully processed keyword: {keyword}")
-                        else:
-                            logger.warning(f"No results found for keyword: {keyword}")
-                        
-                    except Exception as e:
-                        error_msg = f"Error processing keyword {keyword}: {str(e)}"
-                        logger.error(error_msg)
-                        self.stats['errors'].append(error_msg)
-                        continue
-                    
-                    finally:
-                        self.progress_bar.update(1)
-                        time.sleep(0.1)  # Prevent GUI flicker
+                        finally:
+                            self.progress_bar.update(1)
+                            if not CONFIG['FAST_MODE']:
+                                time.sleep(0.1)  # Prevent GUI flicker
             
             self.save_processing_stats()
             logger.info(STATUS_MESSAGES['complete'])
@@ -252,6 +439,49 @@ class ContentProcessor(WebScraper):
             self.save_processing_stats()
             raise
 
+        finally:
+            self.close_writers()  # Before the journal: it records keywords as their Parquet rows are saved
+            self.journal.close()
+            exporter.stop()
+            if self.profiler:
+                self.profiler.write_report()
+
+    def keyword_profile(self, keyword: str):
+        """Profiling context for one keyword; a no-op unless --profile is on"""
+        if self.profiler:
+            return self.profiler.profile(keyword)
+        return nullcontext()
+
+    def process_keywords_parallel(self, keywords: List[str]):
+        """Process keywords on a pool of browser processes, saving results here"""
+        def on_result(keyword, payload):
+            results, worker_stats, worker_metrics = payload
+            self.merge_stats(worker_stats)
+            metrics.merge(worker_metrics)
+            try:
+                self.handle_keyword_results(keyword, results)
+            except Exception as e:
+                error_msg = f"Error saving keyword {keyword}: {str(e)}"
+                logger.error(error_msg)
+                self.stats['errors'].append(error_msg)
+            self.progress_bar.set_description(f"Processed: {keyword}")
+            self.progress_bar.update(1)
+
+        def on_error(keyword, message):
+            error_msg = f"Error processing keyword {keyword}: {message}"
+            logger.error(error_msg)
+            self.stats['processed_keywords'] += 1
+            self.stats['failed_searches'] += 1
+            self.stats['errors'].append(error_msg)
+            self.progress_bar.update(1)
+
+        try:
+            DriverCache().undetected_chromedriver()  # Resolve once here, not concurrently in every worker
+        except Exception as e:
+            logger.error(f"Could not prepare chromedriver: {str(e)}")
+
+        WorkerPool(_pool_worker, CONFIG['POOL_SIZE']).run(keywords, on_result, on_error)
+
     def save_processing_stats(self):
         """Save processing statistics to a log file"""
         try:
@@ -260,11 +490,12 @@ class ContentProcessor(WebScraper):
                 **self.stats,
                 'end_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'total_duration': str(datetime.now() - self.stats['start_time']),
+                'scheduler': scheduler.stats(),
+                'metrics': metrics.summary(),
                 'success_rate': f"{(self.stats['successful_searches'] / max(1, self.stats['processed_keywords'])) * 100:.2f}%"
             }
             
-            with open(stats_file, 'w', encoding='utf-8') as f:
-                json.dump(final_stats, f, ensure_ascii=False, indent=2)
+            atomic_write_json(stats_file, final_stats, ensure_ascii=False, indent=2, default=str)
             
             logger.info(f"Processing statistics saved to: {stats_file.name}")
             
@@ -274,7 +505,7 @@ class ContentProcessor(WebScraper):
     def cleanup(self):
         """Cleanup temporary files and resources"""
         try:
-            # Cleanup code here if needed
+            self.close_writers()
             logger.info("Cleanup completed successfully")
         except Exception as e:
             logger.error(f"Error during cleanup: {str(e)}")
@@ -282,4 +513,98 @@ class ContentProcessor(WebScraper):
     def __del__(self):
         """Destructor to ensure proper cleanup"""
         self.cleanup()
-        super().__del__()
\ No newline at end of file
+        super().__del__()
+
+
+def _pool_worker(worker_id: int, task_queue, result_queue):
+    """Worker process: own browser, pull keywords, report results with their stats and metrics"""
+    try:
+        processor = ContentProcessor()
+        if processor.profiler:
+            processor.profiler.name = f"profile_worker{worker_id}"
+    except Exception as e:
+        logger.error(f"Worker {worker_id} could not start: {str(e)}")
+        result_queue.put((MSG_DONE, worker_id, None))
+        return
+
+    try:
+        while True:
+            keyword = task_queue.get()
+            if keyword is None:
+                break
+            try:
+                # Fresh stats per keyword so the parent can merge them incrementally
+                processor.stats = processor.new_stats()
+                with processor.keyword_profile(keyword):
+                    results = processor.process_keyword(keyword)
+                result_queue.put((MSG_RESULT, keyword, (results, processor.stats, metrics.drain())))
+            except Exception as e:
+                result_queue.put((MSG_ERROR, keyword, str(e)))
+    finally:
+        if processor.profiler:
+            processor.profiler.write_report()
+        result_queue.put((MSG_DONE, worker_id, None))
+
+
+def load_keywords(path) -> List[str]:
+    """Read one keyword per line, skipping blanks"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search, process and save results for a keyword list")
+    parser.add_argument('keywords_file', nargs='?', default='keywords.txt',
+                        help="File with one keyword per line (default: keywords.txt)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip keywords completed by the previous run and reattach their outputs")
+    parser.add_argument('--refresh-cache', action='store_true',
+                        help="Ignore cached SERP pages and fetch every keyword again")
+    parser.add_argument('--fast', action='store_true',
+                        help="Load result pages by URL and wait on the DOM instead of fixed sleeps")
+    parser.add_argument('--enrich', action='store_true',
+                        help="Fetch each result's landing page and add status, title, meta description, H1 and word count")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of browser processes (default: CONFIG['POOL_SIZE'])")
+    parser.add_argument('--writers', default=None,
+                        help="Comma-separated output writers, e.g. json,run_excel,parquet "
+                             "(default: CONFIG['OUTPUT_WRITERS'])")
+    parser.add_argument('--block', choices=list(BLOCK_PROFILES), default=None,
+                        help="Resource blocking profile (default: CONFIG['BLOCK_PROFILE'])")
+    parser.add_argument('--headless', action='store_true', help="Run Chrome without a window")
+    parser.add_argument('--profile', action='store_true',
+                        help="Profile CPU (cProfile) and memory (tracemalloc) per keyword; "
+                             "reports go to output/logs")
+    parser.add_argument('--profile-every', type=int, default=None, metavar='N',
+                        help="Profile only every Nth keyword (default: CONFIG['PROFILE_EVERY'])")
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.refresh_cache:
+        CONFIG['CACHE_REFRESH'] = True
+    if args.fast:
+        CONFIG['FAST_MODE'] = True
+    if args.enrich:
+        CONFIG['ENRICH_RESULTS'] = True
+    if args.workers:
+        CONFIG['POOL_SIZE'] = args.workers
+    if args.writers:
+        CONFIG['OUTPUT_WRITERS'] = [name.strip() for name in args.writers.split(',') if name.strip()]
+    if args.block:
+        CONFIG['BLOCK_PROFILE'] = args.block
+    if args.headless:
+        CONFIG['HEADLESS'] = True
+    if args.profile or args.profile_every:
+        CONFIG['PROFILE'] = True
+    if args.profile_every:
+        CONFIG['PROFILE_EVERY'] = args.profile_every
+
+    keywords = load_keywords(args.keywords_file)
+    logger.info(f"Loaded {len(keywords)} keywords")
+
+    processor = ContentProcessor()
+    processor.process_keywords(keywords, resume=args.resume)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import multiprocessing as mp
+import signal
+import sys
+import time
+from typing import List
+
+from config import CONFIG, get_logger, setup_logging, worker_log_queue
+from job_queue import JobQueue, LeaseKeeper
+from resource_blocking import BLOCK_PROFILES
+
+logger = get_logger(__name__)
+
+
+class BrowserError(Exception):
+    """The search failed in the browser (start-up, dead session), not because of the keyword"""
+
+
+def _daemon_worker(worker_id: int, config: dict, stop_event, log_queue=None, backoff=None):
+    """Worker process: one warm ContentProcessor claiming jobs until the daemon stops"""
+    from worker_pool import init_worker_process
+    init_worker_process(config, worker_id, log_queue, backoff)
+    # Ctrl+C and `kill`/systemd SIGTERM reach the whole process group; the parent decides
+    # when workers stop, and a worker killed inside stop_event.wait() would leave its lock held
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    from content_processor import ContentProcessor
+    name = f"worker{worker_id}"
+    jobs = JobQueue()
+    leases = LeaseKeeper(jobs, name).start()
+    processor = ContentProcessor()  # Chrome starts with the first uncached job and then stays up
+    idle = True
+    browser_failures = 0
+    try:
+        while not stop_event.is_set():
+            job = jobs.claim(name)
+            if job is None:
+                if not idle:
+                    # Finish run-level files (workbook, JSONL, Parquet) while there is nothing to do;
+                    # the next busy period writes into a run directory of its own
+                    processor.close_writers()
+                    processor.run_dir = None
+                    idle = True
+                stop_event.wait(CONFIG['DAEMON_POLL_INTERVAL'])
+                continue
+
+            idle = False
+            keyword = job['keyword']
+            leases.hold(job['id'])
+            try:
+                results = processor.process_keyword(keyword, refresh=job['refresh'])
+                if not results:
+                    browser_error = processor.search_error
+                    # A dead session or a CAPTCHA page: the next job gets a fresh Chrome
+                    processor.quit_browser()
+                    if browser_error:
+                        raise BrowserError(browser_error)
+                    raise Exception("No results found")
+                browser_failures = 0
+                outputs = processor.saved_outputs(processor.save_results(keyword, results))
+
+                def complete(job=job, count=len(results), outputs=outputs):
+                    jobs.complete(job['id'], count, outputs)
+                    leases.release(job['id'])
+                    logger.info(f"[{name}] Job #{job['id']} done: {job['keyword']} ({count} results)")
+
+                # Done only once buffered Parquet rows are on disk; until then a crash requeues the job
+                processor.when_published(complete)
+            except BrowserError as e:
+                browser_failures += 1
+                if browser_failures < CONFIG['DAEMON_BROWSER_FAILURES']:
+                    # The browser's fault, not the keyword's: the attempt is not charged
+                    jobs.requeue(job['id'], f"Browser error: {str(e)}")
+                    leases.release(job['id'])
+                    logger.error(f"[{name}] Job #{job['id']} requeued after a browser error: {keyword}: {str(e)}")
+                    continue
+                # Charged this time, so a keyword that breaks Chrome every time still ends up failed
+                jobs.fail(job['id'], f"Browser error: {str(e)}", job['attempts'])
+                leases.release(job['id'])
+                logger.error(f"[{name}] {browser_failures} browser errors in a row, exiting to be restarted")
+                break
+            except Exception as e:
+                final = jobs.fail(job['id'], str(e), job['attempts'])
+                leases.release(job['id'])
+                state = 'failed' if final else f"requeued (attempt {job['attempts']}/{CONFIG['MAX_RETRIES']})"
+                logger.error(f"[{name}] Job #{job['id']} {state}: {keyword}: {str(e)}")
+    finally:
+        processor.close_writers()
+        processor.quit_browser()
+        leases.stop()
+        jobs.close()
+
+
+def run(workers: int):
+    """Keep ``workers`` browser processes alive, restarting any that die, until SIGINT/SIGTERM"""
+    context = mp.get_context('spawn')
+    stop_event = context.Event()
+
+    # Same request budget as a pool run, split across the workers
+    worker_config = dict(CONFIG)
+    worker_config['RATE_LIMIT'] = CONFIG['RATE_LIMIT'] / workers
+    log_queue = worker_log_queue(context)
+    backoff = context.Value('d', 1.0)  # Search host back-off, shared so workers slow down together
+
+    try:
+        from driver_cache import DriverCache
+        DriverCache().undetected_chromedriver()  # Resolve once here, not concurrently in every worker
+    except Exception as e:
+        logger.error(f"Could not prepare chromedriver: {str(e)}")
+
+    def start(worker_id):
+        process = context.Process(target=_daemon_worker, args=(worker_id, worker_config, stop_event, log_queue, backoff),
+                                  name=f"daemon-worker{worker_id}")
+        process.start()
+        return process
+
+    # Handled like Ctrl+C so both stop through the same path
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    processes = [start(worker_id) for worker_id in range(workers)]
+    jobs = JobQueue()
+    status = jobs.status()
+    logger.info(f"Daemon started with {workers} workers ({status['counts']['queued']} jobs queued, "
+                f"jobs db: {jobs.path})")
+    jobs.close()
+
+    try:
+        while not stop_event.is_set():
+            for worker_id, process in enumerate(processes):
+                if not process.is_alive() and not stop_event.is_set():
+                    logger.warning(f"Worker {worker_id} exited with code {process.exitcode}, restarting")
+                    processes[worker_id] = start(worker_id)
+            time.sleep(1)  # Not stop_event.wait(): interrupting it can leave the Event's lock held
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Stopping daemon; workers finish their current job...")
+        stop_event.set()
+        for process in processes:
+            process.join(timeout=CONFIG['TIMEOUT'] * 4)
+            if process.is_alive():
+                process.terminate()
+        logger.info("Daemon stopped")
+
+
+def submit(keywords: List[str], refresh: bool = False):
+    jobs = JobQueue()
+    try:
+        ids = jobs.submit(keywords, refresh=refresh)
+    finally:
+        jobs.close()
+    if ids:
+        print(f"Queued {len(ids)} jobs (#{ids[0]}-#{ids[-1]})")
+    else:
+        print("Nothing to queue")
+
+
+def print_status(job_id=None, recent: int = 10, as_json: bool = False):
+    jobs = JobQueue()
+    try:
+        if job_id is not None:
+            report = jobs.get(job_id)
+            if report is None:
+                print(f"No job #{job_id}")
+                sys.exit(1)
+        else:
+            report = jobs.status()
+            report['recent'] = jobs.recent(recent)
+    finally:
+        jobs.close()
+
+    if as_json or job_id is not None:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    counts = report['counts']
+    print(' | '.join(f"{status} {count}" for status, count in counts.items()))
+    rate = report['done_last_hour'] / 60
+    oldest = f"{report['oldest_queued_seconds']:.0f}s" if report['oldest_queued_seconds'] is not None else '-'
+    print(f"Done in the last hour: {report['done_last_hour']} ({rate:.1f}/min), oldest queued job: {oldest}")
+    for job in report['running']:
+        print(f"Running: #{job['id']} '{job['keyword']}' on {job['worker']} since {job['started_at']}")
+    if report['recent']:
+        print("Recent jobs:")
+        for job in report['recent']:
+            detail = f"{job['result_count']} results" if job['status'] == 'done' else (job['error'] or '')
+            print(f"  #{job['id']:<6} {job['status']:<8} {job['keyword'][:40]:<40} {detail}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-running scraper fed from a SQLite job queue")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Start the daemon and process jobs until stopped")
+    run_parser.add_argument('--workers', type=int, default=None,
+                            help="Number of warm browser processes (default: CONFIG['POOL_SIZE'])")
+    run_parser.add_argument('--fast', action='store_true',
+                            help="Load result pages by URL and wait on the DOM instead of fixed sleeps")
+    run_parser.add_argument('--block', choices=list(BLOCK_PROFILES), default=None,
+                            help="Resource blocking profile (default: CONFIG['BLOCK_PROFILE'])")
+    run_parser.add_argument('--headless', action='store_true', help="Run Chrome without a window")
+    run_parser.add_argument('--writers', default=None,
+                            help="Comma-separated output writers (default: CONFIG['OUTPUT_WRITERS'])")
+    run_parser.add_argument('--log-format', choices=['text', 'json'], default=None,
+                            help="Debug log format (default: CONFIG['LOG_FORMAT'])")
+
+    submit_parser = commands.add_parser('submit', help="Queue keywords for the daemon")
+    submit_parser.add_argument('keywords', nargs='*', help="Keywords to queue")
+    submit_parser.add_argument('--file', default=None, help="File with one keyword per line")
+    submit_parser.add_argument('--refresh', action='store_true', help="Ignore cached SERP pages for these jobs")
+
+    status_parser = commands.add_parser('status', help="Show queue counts, running and recent jobs")
+    status_parser.add_argument('--job', type=int, default=None, help="Show one job with its outputs")
+    status_parser.add_argument('--recent', type=int, default=10, help="Number of recent jobs to list")
+    status_parser.add_argument('--json', action='store_true', help="Machine-readable output")
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        if args.log_format:
+            CONFIG['LOG_FORMAT'] = args.log_format
+        setup_logging()
+        if args.fast:
+            CONFIG['FAST_MODE'] = True
+        if args.block:
+            CONFIG['BLOCK_PROFILE'] = args.block
+        if args.headless:
+            CONFIG['HEADLESS'] = True
+        if args.writers:
+            CONFIG['OUTPUT_WRITERS'] = [name.strip() for name in args.writers.split(',') if name.strip()]
+        run(max(1, args.workers or CONFIG['POOL_SIZE']))
+    elif args.command == 'submit':
+        keywords = list(args.keywords)
+        if args.file:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                keywords.extend(line.strip() for line in f if line.strip())
+        submit(keywords, refresh=args.refresh)
+    else:
+        print_status(args.job, args.recent, args.json)
+
+
+if __name__ == '__main__':
+    main()
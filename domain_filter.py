@@ -0,0 +1,168 @@
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+# Hosts-file addresses that prefix blocked domains, e.g. "0.0.0.0 ads.example.com"
+HOSTS_ADDRESSES = {'0.0.0.0', '127.0.0.1', '::', '::1'}
+
+# Longest label of a country or generic TLD part matched by a 'name.*' entry (com, co, uk, com.au, ...)
+MAX_TLD_LABEL = 3
+
+
+class DomainFilter:
+    """Block/allow decisions for URLs by domain suffix.
+
+    Every listed domain is stored once in a suffix index. A URL's host is parsed
+    once and its label suffixes are looked up from the full host towards the
+    TLD, so the cost is one dict lookup per label however large the lists are.
+    The most specific listed suffix decides; an allowlist entry beats a block
+    entry for the same domain.
+
+    An entry ending in ``.*`` (``google.*``) matches the name under any
+    country or generic TLD: google.com, google.de, google.co.uk,
+    www.google.com.au. It is checked only when no suffix entry matched.
+    """
+
+    def __init__(self, blocked: Iterable[str] = (), allowed: Iterable[str] = ()):
+        self.index: Dict[str, bool] = {}  # suffix -> True (blocked) / False (allowed)
+        self.wildcards: Dict[str, bool] = {}  # name of a 'name.*' entry -> blocked / allowed
+        self.add_all(blocked, blocked=True)
+        self.add_all(allowed, blocked=False)
+
+    @staticmethod
+    def normalize(domain: str) -> str:
+        domain = domain.strip().lower().rstrip('.')
+        if domain.startswith('*.'):
+            domain = domain[2:]
+        elif domain.startswith('.'):
+            domain = domain[1:]
+        return domain
+
+    def add(self, domain: str, blocked: bool = True):
+        domain = self.normalize(domain)
+        if not domain:
+            return
+        index = self.index
+        if domain.endswith('.*'):
+            index = self.wildcards
+            domain = domain[:-2]
+        if blocked and index.get(domain) is False:
+            return  # Allowlist wins for the same domain
+        index[domain] = blocked
+
+    def add_all(self, domains: Iterable[str], blocked: bool = True):
+        for domain in domains:
+            self.add(domain, blocked)
+
+    def load(self, path, blocked: bool = True) -> int:
+        """Load a plain or hosts-format list file; returns the number of entries"""
+        before = len(self.index) + len(self.wildcards)
+        with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                parts = line.split()
+                if len(parts) > 1 and parts[0] in HOSTS_ADDRESSES:
+                    for domain in parts[1:]:
+                        self.add(domain, blocked)
+                else:
+                    self.add(parts[0], blocked)
+        added = len(self.index) + len(self.wildcards) - before
+        logger.debug(f"Loaded {added} {'blocked' if blocked else 'allowed'} domains from {Path(path).name}")
+        return added
+
+    def match(self, host: str) -> Optional[bool]:
+        """Return True/False for the most specific listed suffix of host, None if unlisted"""
+        index = self.index
+        position = 0
+        while True:
+            verdict = index.get(host[position:] if position else host)
+            if verdict is not None:
+                return verdict
+            position = host.find('.', position) + 1
+            if not position:
+                return self.match_wildcard(host) if self.wildcards else None
+
+    def match_wildcard(self, host: str) -> Optional[bool]:
+        """Verdict of a 'name.*' entry whose name is followed only by one or two short TLD labels"""
+        labels = host.split('.')
+        for tld_labels in (1, 2):
+            if len(labels) > tld_labels and all(len(label) <= MAX_TLD_LABEL for label in labels[-tld_labels:]):
+                verdict = self.wildcards.get(labels[-tld_labels - 1])
+                if verdict is not None:
+                    return verdict
+        return None
+
+    def is_blocked_host(self, host: str) -> bool:
+        return bool(self.match(host.lower().rstrip('.')))
+
+    def allows(self, url: str) -> bool:
+        """True if the URL has a host that is not blocked"""
+        try:
+            host = urlsplit(url).hostname
+        except ValueError:
+            return False
+        if not host:
+            return False
+        return not self.match(host.rstrip('.'))
+
+
+def build_default_filter() -> DomainFilter:
+    """Filter from CONFIG['BLOCKED_DOMAINS'] plus the configured block/allow list files"""
+    domain_filter = DomainFilter(CONFIG['BLOCKED_DOMAINS'])
+    for path in CONFIG['BLOCKLIST_FILES']:
+        try:
+            domain_filter.load(path, blocked=True)
+        except OSError as e:
+            logger.error(f"Could not load blocklist {path}: {str(e)}")
+    for path in CONFIG['ALLOWLIST_FILES']:
+        try:
+            domain_filter.load(path, blocked=False)
+        except OSError as e:
+            logger.error(f"Could not load allowlist {path}: {str(e)}")
+    return domain_filter
+
+
+def benchmark(domain_filter: DomainFilter, urls: List[str], repeat: int = 5) -> float:
+    """Return URLs filtered per second"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for url in urls:
+            domain_filter.allows(url)
+    return len(urls) * repeat / (time.perf_counter() - start)
+
+
+def _synthetic_domains(count: int) -> List[str]:
+    rng = random.Random(42)
+    tlds = ['com', 'net', 'org', 'io', 'co.uk', 'de', 'ir']
+    return [f"{rng.getrandbits(40):x}.{rng.choice(tlds)}" for _ in range(count)]
+
+
+if __name__ == '__main__':
+    # python domain_filter.py [blocklist ...]  - synthetic 100k list when no files are given
+    start = time.perf_counter()
+    if len(sys.argv) > 1:
+        domain_filter = DomainFilter()
+        for path in sys.argv[1:]:
+            domain_filter.load(path)
+        domains = list(domain_filter.index)
+    else:
+        domains = _synthetic_domains(100000)
+        domain_filter = DomainFilter(domains)
+    load_seconds = time.perf_counter() - start
+
+    rng = random.Random(7)
+    urls = [f"https://www.{rng.choice(domains)}/page?q=google.com" for _ in range(50000)]
+    urls += [f"https://sub.unlisted-{i}.example/path" for i in range(50000)]
+    rng.shuffle(urls)
+
+    print(f"Domains indexed: {len(domain_filter.index)} in {load_seconds * 1000:.1f} ms")
+    print(f"Filtered: {benchmark(domain_filter, urls):,.0f} URLs/s")
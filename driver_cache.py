@@ -0,0 +1,175 @@
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+VERSION_PATTERN = re.compile(r'(\d+)\.\d+\.\d+\.\d+')
+
+CHROME_CANDIDATES = [
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\Application\chrome.exe"),
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+]
+CHROME_COMMANDS = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+
+
+def major_version(version: Optional[str]) -> Optional[int]:
+    match = VERSION_PATTERN.search(version or '')
+    return int(match.group(1)) if match else None
+
+
+def binary_version(path: str) -> Optional[str]:
+    """Version printed by `<binary> --version` (chromedriver, Chrome on Linux/macOS)"""
+    try:
+        output = subprocess.run([path, '--version'], capture_output=True, text=True, timeout=15).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(0) if match else None
+
+
+def find_chrome() -> Optional[str]:
+    if CONFIG['CHROME_BINARY']:
+        return str(CONFIG['CHROME_BINARY'])
+    for path in CHROME_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    for command in CHROME_COMMANDS:
+        path = shutil.which(command)
+        if path:
+            return path
+    return None
+
+
+def chrome_version(path: str) -> Optional[str]:
+    # chrome.exe prints nothing for --version; its install keeps one directory per version
+    if sys.platform.startswith('win'):
+        versions = [entry.name for entry in Path(path).parent.iterdir()
+                    if entry.is_dir() and VERSION_PATTERN.fullmatch(entry.name)]
+        return max(versions, key=lambda v: tuple(int(part) for part in v.split('.'))) if versions else None
+    return binary_version(path)
+
+
+class DriverCache:
+    """Chrome and chromedriver locations resolved once and kept in a small JSON file.
+
+    The browser entry is revalidated by the binary's mtime, so a Chrome update
+    is noticed without spawning Chrome. Driver entries remember the Chrome major
+    version they were resolved for and are resolved again when it changes or the
+    entry is older than CONFIG['DRIVER_CACHE_MAX_AGE'].
+    """
+
+    def __init__(self, cache_dir=None):
+        self.dir = Path(cache_dir or CONFIG['DRIVER_CACHE_DIR'])
+        self.path = self.dir / 'driver_cache.json'
+        self.data = self.load()
+
+    def load(self) -> Dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def is_fresh(self, entry: Optional[Dict], browser_major: Optional[int] = None) -> bool:
+        if not entry or not os.path.exists(entry.get('path', '')):
+            return False
+        if time.time() - entry.get('resolved_at', 0) > CONFIG['DRIVER_CACHE_MAX_AGE']:
+            return False
+        return browser_major is None or entry.get('major') in (None, browser_major)
+
+    def browser(self) -> Dict:
+        """{'path', 'version', 'major'} of the local Chrome; path is None if none was found"""
+        entry = self.data.get('browser')
+        configured = str(CONFIG['CHROME_BINARY']) if CONFIG['CHROME_BINARY'] else None
+        if (self.is_fresh(entry) and (configured is None or entry['path'] == configured)
+                and entry.get('mtime') == os.path.getmtime(entry['path'])):
+            return entry
+
+        path = find_chrome()
+        if not path:
+            return {'path': None, 'version': None, 'major': None}
+        version = chrome_version(path)
+        entry = {
+            'path': path,
+            'version': version,
+            'major': major_version(version),
+            'mtime': os.path.getmtime(path),
+            'resolved_at': time.time()
+        }
+        self.data['browser'] = entry
+        self.save()
+        logger.info(f"Chrome {version or '(unknown version)'} found at {path}")
+        return entry
+
+    def chromedriver(self, browser: Optional[Dict] = None) -> str:
+        """Path of a chromedriver for plain selenium, downloaded by webdriver_manager on a miss"""
+        browser = browser or self.browser()
+        entry = self.data.get('chromedriver')
+        if self.is_fresh(entry, browser['major']):
+            return entry['path']
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        start = time.perf_counter()
+        path = ChromeDriverManager().install()
+        version = binary_version(path)
+        if browser['major'] and major_version(version) != browser['major']:
+            logger.warning(f"chromedriver {version} does not match Chrome {browser['version']}")
+        self.data['chromedriver'] = {
+            'path': path,
+            'version': version,
+            'major': browser['major'] or major_version(version),
+            'resolved_at': time.time()
+        }
+        self.save()
+        logger.info(f"chromedriver {version} resolved in {time.perf_counter() - start:.1f}s: {path}")
+        return path
+
+    def undetected_chromedriver(self, browser: Optional[Dict] = None) -> str:
+        """Path of a patched chromedriver for undetected_chromedriver, kept between runs.
+
+        Without an explicit driver path undetected_chromedriver deletes and
+        downloads its driver on every start; with one it patches it once and
+        reuses it.
+        """
+        browser = browser or self.browser()
+        entry = self.data.get('undetected_chromedriver')
+        if self.is_fresh(entry, browser['major']):
+            return entry['path']
+
+        import undetected_chromedriver as uc
+        start = time.perf_counter()
+        patcher = uc.Patcher(version_main=browser['major'] or 0)
+        patcher.auto()
+        target_dir = self.dir / 'undetected'
+        target_dir.mkdir(parents=True, exist_ok=True)
+        target = target_dir / Path(patcher.executable_path).name
+        shutil.move(patcher.executable_path, target)
+
+        version = binary_version(str(target))
+        self.data['undetected_chromedriver'] = {
+            'path': str(target),
+            'version': version,
+            'major': browser['major'] or major_version(version),
+            'resolved_at': time.time()
+        }
+        self.save()
+        logger.info(f"chromedriver {version} downloaded and patched in {time.perf_counter() - start:.1f}s")
+        return str(target)
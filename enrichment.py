@@ -0,0 +1,140 @@
+import asyncio
+import codecs
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+ENRICHMENT_FIELDS = ['status_code', 'final_url', 'page_title', 'meta_description', 'h1', 'word_count']
+
+# Text inside these tags is not visible page content
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+
+
+class PageInfoParser(HTMLParser):
+    """Incremental parser for title, meta description, first H1 and visible word count"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self.meta_description = ''
+        self.h1 = ''
+        self.word_count = 0
+        self.in_title = False
+        self.in_h1 = False
+        self.h1_done = False
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == 'title':
+            self.in_title = True
+        elif tag == 'h1' and not self.h1_done:
+            self.in_h1 = True
+        elif tag == 'meta' and not self.meta_description:
+            attributes = dict(attrs)
+            if (attributes.get('name') or '').lower() == 'description':
+                self.meta_description = (attributes.get('content') or '').strip()
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag == 'title':
+            self.in_title = False
+        elif tag == 'h1' and self.in_h1:
+            self.in_h1 = False
+            self.h1_done = True
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.in_title:
+            self.title += data
+            return
+        if self.in_h1:
+            self.h1 += data
+        self.word_count += len(data.split())
+
+    def result(self) -> Dict:
+        return {
+            'page_title': ' '.join(self.title.split()),
+            'meta_description': ' '.join(self.meta_description.split()),
+            'h1': ' '.join(self.h1.split()),
+            'word_count': self.word_count
+        }
+
+
+class LandingPageEnricher:
+    """Fetch result URLs concurrently over pooled keep-alive connections.
+
+    ``concurrency`` caps open requests overall and ``per_host`` caps them per
+    host; bodies are parsed as they stream in and reading stops at ``max_bytes``.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, per_host: Optional[int] = None,
+                 timeout: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.concurrency = concurrency or CONFIG['ENRICH_CONCURRENCY']
+        self.per_host = per_host or CONFIG['ENRICH_PER_HOST']
+        self.timeout = timeout or CONFIG['ENRICH_TIMEOUT']
+        self.max_bytes = max_bytes or CONFIG['ENRICH_MAX_BYTES']
+
+    def enrich(self, results: List[Dict]) -> List[Dict]:
+        """Add landing-page fields to each result record in place"""
+        if results:
+            asyncio.run(self.enrich_async(results))
+        return results
+
+    async def enrich_async(self, results: List[Dict]) -> List[Dict]:
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ttl_dns_cache=300)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        headers = {'User-Agent': CONFIG['ENRICH_USER_AGENT'], 'Accept': 'text/html,application/xhtml+xml'}
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            await asyncio.gather(*(self.enrich_result(session, result) for result in results))
+        return results
+
+    async def enrich_result(self, session: aiohttp.ClientSession, result: Dict):
+        url = result.get('link')
+        if not url:
+            return
+        try:
+            result.update(await self.fetch_page_info(session, url))
+        except Exception as e:
+            logger.debug(f"Enrichment failed for {url}: {str(e)}")
+            result.update({field: None for field in ENRICHMENT_FIELDS})
+            result['enrichment_error'] = str(e) or e.__class__.__name__
+
+    async def fetch_page_info(self, session: aiohttp.ClientSession, url: str) -> Dict:
+        async with session.get(url, allow_redirects=True) as response:
+            info = {
+                'status_code': response.status,
+                'final_url': str(response.url),
+                'page_title': '',
+                'meta_description': '',
+                'h1': '',
+                'word_count': 0
+            }
+            if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                return info
+
+            parser = PageInfoParser()
+            try:
+                decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+            except LookupError:
+                decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+            received = 0
+            async for chunk in response.content.iter_chunked(16384):
+                received += len(chunk)
+                parser.feed(decoder.decode(chunk))
+                if received >= self.max_bytes:
+                    break
+            parser.feed(decoder.decode(b'', final=True))
+            parser.close()
+
+            info.update(parser.result())
+            return info
@@ -0,0 +1,83 @@
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import xlsxwriter
+
+from config import get_logger
+from output_files import temp_path_for
+
+logger = get_logger(__name__)
+
+RESULT_COLUMNS = ['keyword', 'rank', 'title', 'link', 'description', 'source', 'timestamp', 'status',
+                  'status_code', 'final_url', 'page_title', 'meta_description', 'h1', 'word_count']
+SUMMARY_COLUMNS = ['Keyword', 'Total Results', 'Processing Time', 'Success Rate', 'Timestamp']
+
+# Last row index Excel allows in one worksheet
+MAX_EXCEL_ROWS = 1048575
+
+
+class RunWorkbook:
+    """One workbook per run, streamed row by row in xlsxwriter's constant-memory mode.
+
+    Rows are flushed to a temporary file as soon as the next row starts, so memory
+    stays bounded however many keywords the run has. Results that exceed Excel's
+    row limit continue on a new 'Results N' sheet.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name and renamed on close, so a half-written workbook is never visible
+        self.temp_path = temp_path_for(self.path)
+        self.workbook = xlsxwriter.Workbook(str(self.temp_path), {
+            'constant_memory': True,
+            'strings_to_urls': False,  # Links stay plain text, Excel caps URLs per sheet
+        })
+        self.header_format = self.workbook.add_format({
+            'bold': True,
+            'text_wrap': True,
+            'valign': 'top',
+            'bg_color': '#D9EAD3',
+            'border': 1
+        })
+
+        self.results_sheets = 0
+        self.results_sheet = self._add_sheet('Results', RESULT_COLUMNS)
+        self.summary_sheet = self._add_sheet('Summary', SUMMARY_COLUMNS)
+        self.result_row = 1
+        self.summary_row = 1
+        self.total_rows = 0
+
+    def _add_sheet(self, name: str, columns: List[str]):
+        if name == 'Results':
+            self.results_sheets += 1
+            if self.results_sheets > 1:
+                name = f"Results {self.results_sheets}"
+        worksheet = self.workbook.add_worksheet(name)
+        # Column widths must be set before any rows are written in constant-memory mode
+        worksheet.set_column(0, len(columns) - 1, 15)
+        worksheet.write_row(0, 0, columns, self.header_format)
+        return worksheet
+
+    def add_keyword(self, keyword: str, results: List[Dict], summary: Dict):
+        """Append a keyword's results and its summary row"""
+        for result in results:
+            if self.result_row > MAX_EXCEL_ROWS:
+                self.results_sheet = self._add_sheet('Results', RESULT_COLUMNS)
+                self.result_row = 1
+            row = [result.get(column, keyword if column == 'keyword' else '') for column in RESULT_COLUMNS]
+            self.results_sheet.write_row(self.result_row, 0, row)
+            self.result_row += 1
+        self.total_rows += len(results)
+
+        self.summary_sheet.write_row(self.summary_row, 0, [summary.get(column, '') for column in SUMMARY_COLUMNS])
+        self.summary_row += 1
+
+    def close(self):
+        try:
+            self.workbook.close()
+            os.replace(self.temp_path, self.path)
+            logger.info(f"Run workbook saved: {self.path.name} ({self.total_rows} rows, {self.summary_row - 1} keywords)")
+        except Exception as e:
+            logger.error(f"Error closing run workbook {self.path.name}: {str(e)}")
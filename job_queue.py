@@ -0,0 +1,249 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+STATUSES = [QUEUED, RUNNING, DONE, FAILED]
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    refresh INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    lease_until REAL,
+    not_before REAL,
+    finished_at REAL,
+    result_count INTEGER,
+    outputs TEXT,
+    error TEXT
+);
+-- Claiming scans queued jobs (and expired leases) in submission order
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_finished ON jobs (finished_at);
+'''
+
+
+class JobQueue:
+    """Keyword jobs in SQLite, shared by `daemon.py submit/status` and the daemon's workers.
+
+    A worker claims a job with a lease of CONFIG['DAEMON_JOB_LEASE'] seconds and
+    renews it while the job runs (LeaseKeeper); a job whose worker died is
+    claimed again once its lease has expired. Failed jobs are retried,
+    CONFIG['DAEMON_RETRY_DELAY'] seconds per attempt later, until
+    CONFIG['MAX_RETRIES'] attempts; that includes attempts whose worker died,
+    so a keyword that crashes Chrome every time ends up failed. A job lost to a
+    broken browser is requeued without charging the attempt (requeue).
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or CONFIG['JOB_DB_PATH'])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        # Autocommit; claim() takes the write lock itself with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def submit(self, keywords: Iterable[str], refresh: bool = False) -> List[int]:
+        """Queue keywords; returns their job ids"""
+        now = time.time()
+        ids = []
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                for keyword in keywords:
+                    cursor = self.conn.execute(
+                        'INSERT INTO jobs (keyword, refresh, submitted_at) VALUES (?, ?, ?)',
+                        (keyword, int(refresh), now)
+                    )
+                    ids.append(cursor.lastrowid)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return ids
+
+    def claim(self, worker: str) -> Optional[Dict]:
+        """Take the oldest queued job (or one whose lease expired) for this worker"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                # The worker died on its last allowed attempt; handing the job out again could kill the next one
+                expired = self.conn.execute(
+                    'UPDATE jobs SET status = ?, finished_at = ?, lease_until = NULL, '
+                    'error = COALESCE(error || \'; \', \'\') || ? '
+                    'WHERE status = ? AND lease_until < ? AND attempts >= ?',
+                    (FAILED, now, 'worker stopped during the last attempt (lease expired)', RUNNING, now,
+                     CONFIG['MAX_RETRIES'])
+                )
+                if expired.rowcount:
+                    logger.warning(f"{expired.rowcount} jobs failed: their worker stopped on the last attempt")
+                row = self.conn.execute(
+                    'SELECT * FROM jobs WHERE (status = ? AND (not_before IS NULL OR not_before <= ?)) '
+                    'OR (status = ? AND lease_until < ?) ORDER BY id LIMIT 1',
+                    (QUEUED, now, RUNNING, now)
+                ).fetchone()
+                if row is None:
+                    self.conn.execute('COMMIT')
+                    return None
+                self.conn.execute(
+                    'UPDATE jobs SET status = ?, worker = ?, started_at = ?, lease_until = ?, attempts = attempts + 1 '
+                    'WHERE id = ?',
+                    (RUNNING, worker, now, now + CONFIG['DAEMON_JOB_LEASE'], row['id'])
+                )
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        job = dict(row)
+        job['attempts'] += 1
+        return job
+
+    def renew(self, job_id: int, worker: str) -> bool:
+        """Extend a running job's lease; False if it was meanwhile handed to another worker"""
+        with self.lock:
+            cursor = self.conn.execute(
+                'UPDATE jobs SET lease_until = ? WHERE id = ? AND status = ? AND worker = ?',
+                (time.time() + CONFIG['DAEMON_JOB_LEASE'], job_id, RUNNING, worker)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, result_count: int, outputs: Dict[str, str]):
+        with self.lock:
+            self.conn.execute(
+                'UPDATE jobs SET status = ?, finished_at = ?, lease_until = NULL, result_count = ?, outputs = ?, error = NULL '
+                'WHERE id = ?',
+                (DONE, time.time(), result_count, json.dumps(outputs, ensure_ascii=False), job_id)
+            )
+
+    def fail(self, job_id: int, error: str, attempts: int) -> bool:
+        """Put the job back in the queue, or mark it failed after the last attempt"""
+        final = attempts >= CONFIG['MAX_RETRIES']
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                'UPDATE jobs SET status = ?, finished_at = ?, lease_until = NULL, not_before = ?, error = ? WHERE id = ?',
+                (FAILED if final else QUEUED, now if final else None,
+                 None if final else now + CONFIG['DAEMON_RETRY_DELAY'] * attempts, error, job_id)
+            )
+        return final
+
+    def requeue(self, job_id: int, error: str):
+        """Put the job back without charging the attempt: it failed for a reason other than its keyword"""
+        with self.lock:
+            self.conn.execute(
+                'UPDATE jobs SET status = ?, lease_until = NULL, not_before = ?, error = ?, '
+                'attempts = MAX(attempts - 1, 0) WHERE id = ?',
+                (QUEUED, time.time() + CONFIG['DAEMON_RETRY_DELAY'], error, job_id)
+            )
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self.to_dict(row) if row else None
+
+    def recent(self, limit: int = 10) -> List[Dict]:
+        with self.lock:
+            rows = self.conn.execute('SELECT * FROM jobs ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+        return [self.to_dict(row) for row in rows]
+
+    def status(self) -> Dict:
+        """Counts per status, recent throughput, queue age and the jobs running now"""
+        now = time.time()
+        with self.lock:
+            counts = dict(self.conn.execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+            done_last_hour = self.conn.execute(
+                'SELECT COUNT(*) FROM jobs WHERE finished_at >= ? AND status = ?', (now - 3600, DONE)
+            ).fetchone()[0]
+            oldest = self.conn.execute(
+                'SELECT MIN(submitted_at) FROM jobs WHERE status = ?', (QUEUED,)
+            ).fetchone()[0]
+            running = self.conn.execute(
+                'SELECT * FROM jobs WHERE status = ? ORDER BY id', (RUNNING,)
+            ).fetchall()
+        return {
+            'counts': {status: counts.get(status, 0) for status in STATUSES},
+            'done_last_hour': done_last_hour,
+            'oldest_queued_seconds': round(now - oldest, 1) if oldest else None,
+            'running': [self.to_dict(row) for row in running]
+        }
+
+    @staticmethod
+    def to_dict(row) -> Dict:
+        job = dict(row)
+        job['outputs'] = json.loads(job['outputs']) if job['outputs'] else {}
+        job['refresh'] = bool(job['refresh'])
+        for key in ('submitted_at', 'started_at', 'finished_at', 'lease_until', 'not_before'):
+            if job[key]:
+                job[key] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(job[key]))
+        return job
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+class LeaseKeeper:
+    """Background thread renewing the leases of a worker's jobs until they are released.
+
+    A job is held from claim until it is completed or failed, including while
+    its buffered outputs wait to be written, so a slow job is never handed to
+    a second worker while the first is still on it.
+    """
+
+    def __init__(self, jobs: JobQueue, worker: str, interval: Optional[float] = None):
+        self.jobs = jobs
+        self.worker = worker
+        self.interval = interval or CONFIG['DAEMON_JOB_LEASE'] / 3
+        self.held = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"{worker}-leases", daemon=True)
+
+    def start(self) -> 'LeaseKeeper':
+        self.thread.start()
+        return self
+
+    def hold(self, job_id: int):
+        with self.lock:
+            self.held.add(job_id)
+
+    def release(self, job_id: int):
+        with self.lock:
+            self.held.discard(job_id)
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            with self.lock:
+                held = list(self.held)
+            for job_id in held:
+                try:
+                    if not self.jobs.renew(job_id, self.worker):
+                        logger.warning(f"[{self.worker}] Lease of job #{job_id} lost to another worker")
+                        self.release(job_id)
+                except Exception as e:
+                    logger.error(f"[{self.worker}] Could not renew lease of job #{job_id}: {str(e)}")
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
@@ -0,0 +1,113 @@
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from config import CONFIG, get_logger
+from result_record import ResultRecord
+
+logger = get_logger(__name__)
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+
+class JsonlWriter:
+    """Append one compact JSON line per record, optionally gzip-compressed.
+
+    Records are appended to ``path`` itself, so everything written before a
+    crash stays readable; a torn last line is skipped by iter_jsonl.
+
+    fsync policy:
+        'always'   - fsync after every record (safest, slowest)
+        'interval' - fsync at most every ``fsync_interval`` seconds
+        'never'    - only flush to the OS, leave syncing to it
+
+    Plain files are flushed to the OS after every record. A gzip stream is
+    flushed only when the policy syncs, or every ``fsync_interval`` seconds
+    under 'never', since each flush ends a deflate block and costs ratio.
+    """
+
+    def __init__(self, path, compress: Optional[bool] = None, fsync: Optional[str] = None,
+                 fsync_interval: Optional[float] = None):
+        compress = CONFIG['JSONL_COMPRESS'] if compress is None else compress
+        self.fsync = fsync or CONFIG['JSONL_FSYNC']
+        self.fsync_interval = CONFIG['JSONL_FSYNC_INTERVAL'] if fsync_interval is None else fsync_interval
+        if self.fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {self.fsync}")
+
+        path = Path(path)
+        if compress and path.suffix != '.gz':
+            path = path.with_name(path.name + '.gz')
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.raw = open(self.path, 'ab')
+        # Appending to an existing .gz adds a new member, which gzip readers concatenate
+        self.stream = gzip.GzipFile(fileobj=self.raw, mode='ab') if compress else self.raw
+        self.records = 0
+        self.last_sync = self.last_flush = time.monotonic()
+
+    def write(self, record: Dict):
+        """Append a record and apply the fsync policy"""
+        line = json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=to_json) + '\n'
+        self.stream.write(line.encode('utf-8'))
+        self.records += 1
+        now = time.monotonic()
+        sync = self.fsync == 'always' or (self.fsync == 'interval' and now - self.last_sync >= self.fsync_interval)
+        if sync or self.stream is self.raw or now - self.last_flush >= self.fsync_interval:
+            self.flush(sync=sync)
+
+    def flush(self, sync: bool = False):
+        self.stream.flush()
+        if self.stream is not self.raw:
+            self.raw.flush()
+        self.last_flush = time.monotonic()
+        if sync:
+            os.fsync(self.raw.fileno())
+            self.last_sync = self.last_flush
+
+    def close(self):
+        try:
+            if self.stream is not self.raw:
+                self.stream.close()
+            self.raw.flush()
+            if self.fsync != 'never':
+                os.fsync(self.raw.fileno())
+            self.raw.close()
+            logger.debug(f"Closed {self.path.name} after {self.records} records")
+        except Exception as e:
+            logger.error(f"Error closing {self.path}: {str(e)}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def to_json(value):
+    """Result records as dicts, anything else (datetimes, paths) as its string"""
+    if isinstance(value, ResultRecord):
+        return value.to_dict()
+    return str(value)
+
+
+def iter_jsonl(path) -> Iterator[Dict]:
+    """Yield records one at a time from a .jsonl or .jsonl.gz file"""
+    path = Path(path)
+    opener = gzip.open if path.suffix == '.gz' else open
+    try:
+        with opener(path, 'rt', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping unreadable line {line_number} in {path.name}")
+    except EOFError:
+        # A compressed file cut off by a crash still yields everything before the cut
+        logger.warning(f"{path.name} ends with a truncated gzip member")
@@ -0,0 +1,99 @@
+import copy
+import json
+import logging
+import time
+from datetime import datetime
+from logging.handlers import QueueHandler
+
+from colorama import Fore, Style
+
+# Colour of a console line when the record does not carry its own (extra={'color': ...})
+LEVEL_COLORS = {
+    logging.WARNING: Fore.YELLOW,
+    logging.ERROR: Fore.RED,
+    logging.CRITICAL: Fore.RED,
+}
+
+
+class RecordQueueHandler(QueueHandler):
+    """Put records on the listener's queue with the message already rendered.
+
+    Unlike QueueHandler.prepare, the traceback stays in ``exc_text`` rather than
+    being folded into the message, so the JSON formatter can keep it in a field
+    of its own. Records stay picklable for a multiprocessing queue.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record, for `jq` and log shippers"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'process': record.processName,
+            'thread': record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """Coloured console lines, with INFO and DEBUG limited to ``rate`` lines per second.
+
+    Warnings and errors are always written. Lines over the limit are dropped,
+    not delayed; the next line written says how many there were. debug.log
+    still has all of them.
+    """
+
+    def __init__(self, stream=None, rate: float = 0, color: bool = True):
+        super().__init__(stream)
+        self.rate = rate
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.dropped = 0
+        self.color = color
+
+    def allow(self, record: logging.LogRecord) -> bool:
+        if not self.rate or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.dropped += 1
+        return False
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        color = getattr(record, 'color', None) or LEVEL_COLORS.get(record.levelno)
+        return f"{color}{text}{Style.RESET_ALL}" if color and self.color else text
+
+    def emit(self, record: logging.LogRecord):
+        if not self.allow(record):
+            return
+        if self.dropped:
+            notice = f"... {self.dropped} console lines dropped by the rate limit (all of them are in the log file)"
+            try:
+                self.stream.write((f"{Fore.YELLOW}{notice}{Style.RESET_ALL}" if self.color else notice) + self.terminator)
+            except Exception:
+                self.handleError(record)
+            self.dropped = 0
+        super().emit(record)
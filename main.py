@@ -1,14 +1,74 @@
 #!/usr/bin/env python3
-from pathlib import Path
-import time
+import argparse
+import sys
 from datetime import datetime
 import logging
 from tqdm import tqdm
-import json
-from config import CONFIG, logger
+from config import CONFIG, logger, setup_logging
 from web_scraper import WebScraper
+from worker_pool import WorkerPool, MSG_RESULT, MSG_ERROR, MSG_DONE
+from run_journal import RunJournal
+from jsonl_writer import JsonlWriter
+from excel_export import RunWorkbook
+from output_files import create_run_dir
+from driver_cache import DriverCache
+from resource_blocking import BLOCK_PROFILES
+
+def _search_worker(worker_id, task_queue, result_queue):
+    """Worker process running its own browser for the keyword pool"""
+    try:
+        scraper = WebScraper()
+    except Exception as e:
+        logger.error(f"Worker {worker_id} could not start: {str(e)}")
+        result_queue.put((MSG_DONE, worker_id, None))
+        return
+
+    try:
+        while True:
+            keyword = task_queue.get()
+            if keyword is None:
+                break
+            try:
+                # Request pacing happens in search_google through the shared scheduler
+                result_queue.put((MSG_RESULT, keyword, scraper.search_google(keyword)))
+            except Exception as e:
+                result_queue.put((MSG_ERROR, keyword, str(e)))
+    finally:
+        result_queue.put((MSG_DONE, worker_id, None))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Search Google for every keyword in keywords.txt")
+    parser.add_argument('--refresh-cache', action='store_true',
+                        help="Ignore cached SERP pages and fetch every keyword again")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip keywords completed by the previous run and reuse their results")
+    parser.add_argument('--compress', action='store_true',
+                        help="Write gzip-compressed JSON lines (.jsonl.gz)")
+    parser.add_argument('--fast', action='store_true',
+                        help="Load result pages by URL and wait on the DOM instead of fixed sleeps")
+    parser.add_argument('--excel', action='store_true',
+                        help="Also write one streaming Excel workbook for the whole run")
+    parser.add_argument('--block', choices=list(BLOCK_PROFILES), default=None,
+                        help="Resource blocking profile (default: CONFIG['BLOCK_PROFILE'])")
+    parser.add_argument('--headless', action='store_true', help="Run Chrome without a window")
+    parser.add_argument('--log-format', choices=['text', 'json'], default=None,
+                        help="Debug log format (default: CONFIG['LOG_FORMAT'])")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    if args.log_format:
+        CONFIG['LOG_FORMAT'] = args.log_format
+    setup_logging()
+    if args.refresh_cache:
+        CONFIG['CACHE_REFRESH'] = True
+    if args.fast:
+        CONFIG['FAST_MODE'] = True
+    if args.block:
+        CONFIG['BLOCK_PROFILE'] = args.block
+    if args.headless:
+        CONFIG['HEADLESS'] = True
+
     try:
         # Print banner
         print("=" * 50)
@@ -25,29 +85,77 @@ def main():
             keywords = [line.strip() for line in f if line.strip()]
         logger.info(f"Loaded {len(keywords)} keywords")
 
-        # Initialize scraper
-        logger.info("Initializing scraper...")
-        scraper = WebScraper()
-        
-        # Process keywords
-        all_results = {}
-        for keyword in tqdm(keywords, desc="Processing keywords"):
-            try:
-                results = scraper.search_google(keyword)
-                if results:
-                    all_results[keyword] = results
-                time.sleep(2)
-            except Exception as e:
-                logger.error(f"Error processing keyword '{keyword}': {str(e)}")
-                continue
-
-        # Save results
-        if all_results:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = Path('output') / f'results_{timestamp}.json'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(all_results, f, ensure_ascii=False, indent=4)
-            logger.info(f"Results saved to {output_file}")
+        # Each keyword is streamed to disk as one JSON line as soon as it finishes, in a directory of
+        # this run's own (a resumed run replays its journal into the new files)
+        run_dir = create_run_dir()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        writer = JsonlWriter(run_dir / 'jsonl' / f'results_{timestamp}.jsonl', compress=args.compress or None)
+        workbook = RunWorkbook(run_dir / 'excel' / f'run_{timestamp}.xlsx') if args.excel else None
+
+        def save(keyword, results):
+            writer.write({'keyword': keyword, 'results': results})
+            if workbook:
+                workbook.add_keyword(keyword, results, {
+                    'Keyword': keyword,
+                    'Total Results': len(results),
+                    'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                })
+
+        # Completed keywords are journaled as they finish so a crash can be resumed
+        journal = RunJournal('main', resume=args.resume)
+        for keyword, entry in journal.entries.items():
+            if keyword in keywords:
+                save(keyword, entry['results'])
+        keywords = journal.pending(keywords)
+
+        def collect(keyword, results):
+            if results:
+                save(keyword, results)
+                journal.record(keyword, results=results)
+
+        try:
+            # Process keywords
+            if CONFIG['POOL_SIZE'] > 1 and len(keywords) > 1:
+                logger.info(f"Initializing pool of {CONFIG['POOL_SIZE']} scrapers...")
+                progress = tqdm(total=len(keywords), desc="Processing keywords")
+                try:
+                    DriverCache().undetected_chromedriver()  # Resolve once here, not concurrently in every worker
+                except Exception as e:
+                    logger.error(f"Could not prepare chromedriver: {str(e)}")
+
+                def on_result(keyword, results):
+                    collect(keyword, results)
+                    progress.update(1)
+
+                def on_error(keyword, message):
+                    logger.error(f"Error processing keyword '{keyword}': {message}")
+                    progress.update(1)
+
+                try:
+                    WorkerPool(_search_worker, CONFIG['POOL_SIZE']).run(keywords, on_result, on_error)
+                finally:
+                    progress.close()
+            elif keywords:
+                # Initialize scraper
+                logger.info("Initializing scraper...")
+                scraper = WebScraper()
+
+                for keyword in tqdm(keywords, desc="Processing keywords"):
+                    try:
+                        results = scraper.search_google(keyword)
+                        collect(keyword, results)
+                    except Exception as e:
+                        logger.error(f"Error processing keyword '{keyword}': {str(e)}")
+                        continue
+        finally:
+            # Always finish the gzip member and the workbook, even when processing fails
+            journal.close()
+            writer.close()
+            if workbook:
+                workbook.close()
+
+        if writer.records:
+            logger.info(f"Results for {writer.records} keywords saved to {writer.path}")
         else:
             logger.warning("No results were collected")
 
@@ -55,7 +163,8 @@ def main():
         logger.error(f"An unexpected error occurred: {str(e)}")
     
     finally:
-        input("\nPress Enter to exit...")
+        if sys.stdin.isatty():  # Unattended runs (cron, daemon, CI) must not block on a prompt
+            input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,200 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+# Upper bounds in seconds, from fast DOM reads up to slow page loads
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 0.75,
+                   1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0, 60.0, 120.0)
+
+METRIC_PREFIX = 'seo_scraper'
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; percentiles are interpolated within buckets"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= target and bucket_count:
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                return min(self.max, lower + (upper - lower) * (target - seen) / bucket_count)
+            seen += bucket_count
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {'counts': list(self.counts), 'count': self.count, 'sum': self.sum, 'max': self.max}
+
+    def merge(self, snapshot: Dict):
+        for index, bucket_count in enumerate(snapshot['counts']):
+            self.counts[index] += bucket_count
+        self.count += snapshot['count']
+        self.sum += snapshot['sum']
+        self.max = max(self.max, snapshot['max'])
+
+
+class Metrics:
+    """Per-stage latency histograms and throughput counters for one process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.histograms: Dict[str, LatencyHistogram] = {}
+            self.counters: Dict[str, float] = {}
+            self.started = time.time()
+
+    def observe(self, stage: str, seconds: float):
+        with self.lock:
+            if stage not in self.histograms:
+                self.histograms[stage] = LatencyHistogram()
+            self.histograms[stage].observe(seconds)
+
+    def inc(self, name: str, value: float = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def time(self, stage: str):
+        """Time the enclosed block as one observation of ``stage``"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                'histograms': {stage: histogram.snapshot() for stage, histogram in self.histograms.items()},
+                'counters': dict(self.counters)
+            }
+
+    def drain(self) -> Dict:
+        """Return a snapshot and start over, used by pool workers to ship deltas"""
+        snapshot = self.snapshot()
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+        return snapshot
+
+    def merge(self, snapshot: Dict):
+        with self.lock:
+            for stage, data in snapshot.get('histograms', {}).items():
+                if stage not in self.histograms:
+                    self.histograms[stage] = LatencyHistogram()
+                self.histograms[stage].merge(data)
+            for name, value in snapshot.get('counters', {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def summary(self) -> Dict:
+        """Percentiles per stage in milliseconds plus counters and per-minute rates"""
+        with self.lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            return {
+                'stages': {
+                    stage: {
+                        'count': histogram.count,
+                        'total_s': round(histogram.sum, 3),
+                        'p50_ms': round(histogram.percentile(0.50) * 1000, 2),
+                        'p95_ms': round(histogram.percentile(0.95) * 1000, 2),
+                        'p99_ms': round(histogram.percentile(0.99) * 1000, 2),
+                        'max_ms': round(histogram.max * 1000, 2)
+                    }
+                    for stage, histogram in sorted(self.histograms.items())
+                },
+                'counters': dict(self.counters),
+                'per_minute': {name: round(value * 60 / elapsed, 2) for name, value in self.counters.items()}
+            }
+
+    def to_prometheus(self) -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        lines = [
+            f'# HELP {METRIC_PREFIX}_stage_latency_seconds Latency of each scraping stage',
+            f'# TYPE {METRIC_PREFIX}_stage_latency_seconds histogram',
+        ]
+        with self.lock:
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{METRIC_PREFIX}_stage_latency_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{METRIC_PREFIX}_stage_latency_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{METRIC_PREFIX}_stage_latency_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{METRIC_PREFIX}_stage_latency_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+            for name, value in sorted(self.counters.items()):
+                metric = f'{METRIC_PREFIX}_{name}_total'
+                lines.append(f'# TYPE {metric} counter')
+                lines.append(f'{metric} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path=None):
+        """Write the text file atomically so a collector never reads half of it"""
+        path = Path(path or CONFIG['METRICS_FILE'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+
+
+class MetricsExporter:
+    """Background thread writing the Prometheus text file every few seconds"""
+
+    def __init__(self, registry: Metrics, path=None, interval: Optional[float] = None):
+        self.registry = registry
+        self.path = path or CONFIG['METRICS_FILE']
+        self.interval = interval or CONFIG['METRICS_EXPORT_INTERVAL']
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name='metrics-exporter', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.export()
+
+    def export(self):
+        try:
+            self.registry.write_prometheus(self.path)
+        except Exception as e:
+            logger.error(f"Error exporting metrics: {str(e)}")
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=5)
+        self.export()
+
+
+# Shared by everything in this process
+metrics = Metrics()
@@ -0,0 +1,82 @@
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+LATEST_POINTER = 'latest'
+
+
+def temp_path_for(path) -> Path:
+    """Hidden sibling of ``path`` in the same directory, so the final rename stays atomic"""
+    path = Path(path)
+    return path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+
+@contextmanager
+def atomic_path(path) -> Iterator[Path]:
+    """Yield a temporary path to write to; it replaces ``path`` only if the block succeeds.
+
+    Readers see either the previous file or the complete new one, never a
+    partly written file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = temp_path_for(path)
+    try:
+        yield temp_path
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def atomic_write_json(path, data, **kwargs):
+    with atomic_path(path) as temp_path:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, **kwargs)
+
+
+def create_run_dir(started: Optional[datetime] = None, runs_dir=None) -> Path:
+    """Create ``runs/<YYYYmmdd_HHMMSS>`` for a new run and point ``runs/latest`` at it.
+
+    mkdir is atomic, so runs started in the same second (pool parents, daemon
+    workers) still get directories of their own.
+    """
+    runs_dir = Path(runs_dir or CONFIG['RUNS_DIR'])
+    runs_dir.mkdir(parents=True, exist_ok=True)
+    name = (started or datetime.now()).strftime('%Y%m%d_%H%M%S')
+    run_dir = runs_dir / name
+    suffix = 1
+    while True:
+        try:
+            run_dir.mkdir()
+            break
+        except FileExistsError:
+            suffix += 1
+            run_dir = runs_dir / f"{name}_{suffix}"
+    mark_latest(run_dir)
+    return run_dir
+
+
+def mark_latest(run_dir: Path):
+    """Point ``latest`` at the run; a one-line text file, so it works where symlinks don't"""
+    pointer = run_dir.parent / LATEST_POINTER
+    with atomic_path(pointer) as temp_path:
+        temp_path.write_text(run_dir.name + '\n', encoding='utf-8')
+
+
+def latest_run_dir(runs_dir=None) -> Optional[Path]:
+    runs_dir = Path(runs_dir or CONFIG['RUNS_DIR'])
+    try:
+        name = (runs_dir / LATEST_POINTER).read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+    run_dir = runs_dir / name
+    return run_dir if name and run_dir.is_dir() else None
+
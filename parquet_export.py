@@ -0,0 +1,174 @@
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import CONFIG, get_logger
+from output_files import temp_path_for
+from utils import extract_domain
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency, only needed for the 'parquet' writer
+    pa = None
+    pq = None
+
+logger = get_logger(__name__)
+
+# JSON result fields in their original order, plus the derived domain column
+RESULT_FIELDS = ['title', 'link', 'description', 'keyword', 'timestamp', 'processing_time', 'source', 'rank', 'status']
+DICTIONARY_COLUMNS = ['keyword', 'source', 'domain', 'status']
+# enrichment.ENRICHMENT_FIELDS, repeated so the export does not load aiohttp
+ENRICHMENT_FIELDS = ['status_code', 'final_url', 'page_title', 'meta_description', 'h1', 'word_count']
+INTEGER_FIELDS = {'status_code', 'word_count'}
+
+
+def get_schema():
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([
+        ('keyword', dictionary),
+        ('rank', pa.int32()),
+        ('title', pa.string()),
+        ('link', pa.string()),
+        ('description', pa.string()),
+        ('domain', dictionary),
+        ('source', dictionary),
+        ('timestamp', pa.string()),
+        ('processing_time', pa.string()),
+        ('status', dictionary),
+        # Landing-page enrichment; null for rows of runs without ENRICH_RESULTS
+        ('status_code', pa.int32()),
+        ('final_url', pa.string()),
+        ('page_title', pa.string()),
+        ('meta_description', pa.string()),
+        ('h1', pa.string()),
+        ('word_count', pa.int32()),
+    ])
+
+
+class ParquetExporter:
+    """Write a run's results to Parquet, partitioned by run date (run_date=YYYY-MM-DD).
+
+    Rows are buffered and written as one complete part file per flush, when
+    the buffer reaches the row group size or its oldest row has waited
+    CONFIG['PARQUET_FLUSH_INTERVAL'] seconds. A Parquet file is only readable
+    once its footer is written, so rows count as saved when ``buffered`` is
+    back to 0. Keyword, source, domain and status are dictionary encoded so
+    filters on them can be pushed down cheaply.
+    """
+
+    def __init__(self, base_dir=None, run_started: Optional[datetime] = None,
+                 row_group_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        if pa is None:
+            raise ImportError("The parquet writer needs pyarrow: pip install pyarrow")
+
+        run_started = run_started or datetime.now()
+        base_dir = Path(base_dir or CONFIG['OUTPUT_DIR'] / 'parquet')
+        self.partition = base_dir / f"run_date={run_started.strftime('%Y-%m-%d')}"
+        self.partition.mkdir(parents=True, exist_ok=True)
+
+        # The pid keeps processes started in the same second (daemon workers) on parts of their own
+        self.prefix = f"part-{run_started.strftime('%Y%m%d_%H%M%S')}-{os.getpid()}"
+        self.part = 1
+        self.path = self.part_path()
+        self.row_group_size = row_group_size or CONFIG['PARQUET_ROW_GROUP_SIZE']
+        self.flush_interval = CONFIG['PARQUET_FLUSH_INTERVAL'] if flush_interval is None else flush_interval
+        self.schema = get_schema()
+        self.buffer = {name: [] for name in self.schema.names}
+        self.buffered = 0
+        self.buffer_started = None
+        self.total_rows = 0
+        self.parts = []
+
+    def part_path(self) -> Path:
+        return self.partition / f"{self.prefix}-{self.part:04d}.parquet"
+
+    def write(self, keyword: str, results: List[Dict]):
+        """Buffer a keyword's results, flushing a row group when the buffer is full.
+
+        If the flush fails the keyword's rows are taken out of the buffer again,
+        so a retried save does not write them twice.
+        """
+        buffered, buffer_started = self.buffered, self.buffer_started
+        for result in results:
+            link = result.get('link', '')
+            self.buffer['keyword'].append(result.get('keyword') or keyword)
+            self.buffer['rank'].append(int(result.get('rank') or 0))
+            self.buffer['title'].append(result.get('title', ''))
+            self.buffer['link'].append(link)
+            self.buffer['description'].append(result.get('description', ''))
+            self.buffer['domain'].append(extract_domain(link))
+            self.buffer['source'].append(result.get('source', ''))
+            self.buffer['timestamp'].append(result.get('timestamp', ''))
+            self.buffer['processing_time'].append(result.get('processing_time', ''))
+            self.buffer['status'].append(result.get('status', ''))
+            for field in ENRICHMENT_FIELDS:
+                value = result.get(field)
+                self.buffer[field].append(int(value) if field in INTEGER_FIELDS and value is not None else value)
+        if results and self.buffer_started is None:
+            self.buffer_started = time.monotonic()
+        self.buffered += len(results)
+
+        if self.buffered >= self.row_group_size or (
+                self.buffered and time.monotonic() - self.buffer_started >= self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                for column in self.buffer.values():
+                    del column[buffered:]
+                self.buffered, self.buffer_started = buffered, buffer_started
+                raise
+
+    def flush(self):
+        """Write the buffered rows as the next part file (hidden until complete)"""
+        if not self.buffered:
+            return
+        table = pa.table(self.buffer, schema=self.schema)
+        # Dataset readers skip dot files, so a part is never read half-written
+        temp_path = temp_path_for(self.path)
+        try:
+            pq.write_table(table, str(temp_path), row_group_size=self.row_group_size,
+                           compression=CONFIG['PARQUET_COMPRESSION'], use_dictionary=DICTIONARY_COLUMNS)
+            os.replace(temp_path, self.path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+        self.parts.append(self.path)
+        self.total_rows += self.buffered
+        self.buffer = {name: [] for name in self.schema.names}
+        self.buffered = 0
+        self.buffer_started = None
+        self.part += 1
+        self.path = self.part_path()
+
+    def close(self) -> bool:
+        """Write the remaining rows; False if they could not be saved"""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error closing parquet export {self.path.name}: {str(e)}")
+            return False
+        if self.parts:
+            logger.info(f"Parquet export saved: {len(self.parts)} part files in {self.partition} ({self.total_rows} rows)")
+        return True
+
+
+def read_results(base_dir=None, columns: Optional[List[str]] = None, filters=None):
+    """Read exported results as a pyarrow Table, e.g. filters=[('keyword', '=', 'seo')]"""
+    if pq is None:
+        raise ImportError("Reading parquet exports needs pyarrow: pip install pyarrow")
+    base_dir = Path(base_dir or CONFIG['OUTPUT_DIR'] / 'parquet')
+    return pq.read_table(str(base_dir), columns=columns, filters=filters, partitioning='hive')
+
+
+def to_result_dicts(table) -> List[Dict]:
+    """Convert a Table back to the result dicts save_results writes to JSON"""
+    results = []
+    for row in table.to_pylist():
+        result = {field: row[field] for field in RESULT_FIELDS if field in row}
+        # Enrichment fields only when the row had them, as in the JSON output
+        result.update({field: row[field] for field in ENRICHMENT_FIELDS if row.get(field) is not None})
+        results.append(result)
+    return results
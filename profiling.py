@@ -0,0 +1,139 @@
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+# Allocations made by the profilers themselves are not interesting
+IGNORED_TRACE_FILES = [__file__, tracemalloc.__file__, cProfile.__file__, pstats.__file__, '<frozen importlib._bootstrap>',
+                       '<frozen importlib._bootstrap_external>', '<unknown>']
+
+
+class KeywordProfiler:
+    """Profile a sample of keywords with cProfile and tracemalloc, aggregated over the run.
+
+    Only every ``every``-th keyword is profiled and tracemalloc runs only while a
+    sampled keyword does, so unsampled keywords pay nothing. ``write_report``
+    writes the top hot functions and allocation sites next to the processing stats.
+    """
+
+    def __init__(self, every: Optional[int] = None, top_n: Optional[int] = None,
+                 frames: Optional[int] = None, output_dir=None, name: str = 'profile'):
+        self.every = max(1, every or CONFIG['PROFILE_EVERY'])
+        self.top_n = top_n or CONFIG['PROFILE_TOP_N']
+        self.frames = frames or CONFIG['PROFILE_TRACE_FRAMES']
+        self.output_dir = Path(output_dir or CONFIG['OUTPUT_DIR'] / 'logs')
+        self.name = name
+        self.seen = 0
+        self.sampled: List[str] = []
+        self.profiled_seconds = 0.0
+        self.peak_bytes = 0
+        self.stats: Optional[pstats.Stats] = None
+        self.allocations: Dict[Tuple[str, int], List[int]] = {}  # (file, line) -> [bytes, blocks]
+
+    @contextmanager
+    def profile(self, keyword: str):
+        """Profile the enclosed block if this keyword falls in the sample"""
+        self.seen += 1
+        if (self.seen - 1) % self.every:
+            yield
+            return
+
+        owns_tracing = not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self.profiled_seconds += time.perf_counter() - start
+            after = tracemalloc.take_snapshot()
+            self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+            if owns_tracing:
+                tracemalloc.stop()
+            self.add_profile(profiler)
+            self.add_allocations(before, after)
+            self.sampled.append(keyword)
+
+    def add_profile(self, profiler: cProfile.Profile):
+        if self.stats is None:
+            self.stats = pstats.Stats(profiler, stream=io.StringIO())
+        else:
+            self.stats.add(profiler)
+
+    def add_allocations(self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot):
+        """Accumulate memory still held at the end of the keyword, per source line"""
+        filters = [tracemalloc.Filter(False, path) for path in IGNORED_TRACE_FILES]
+        after = after.filter_traces(filters)
+        before = before.filter_traces(filters)
+        for diff in after.compare_to(before, 'lineno'):
+            if diff.size_diff <= 0:
+                continue
+            frame = diff.traceback[0]
+            totals = self.allocations.setdefault((frame.filename, frame.lineno), [0, 0])
+            totals[0] += diff.size_diff
+            totals[1] += diff.count_diff
+
+    def hot_functions(self, sort: str = 'cumulative') -> List[Dict]:
+        if self.stats is None:
+            return []
+        rows = []
+        for (filename, lineno, function), (calls, primitive, tottime, cumtime, _) in self.stats.stats.items():
+            rows.append({
+                'function': f"{Path(filename).name}:{lineno}({function})",
+                'calls': calls,
+                'tottime_s': round(tottime, 4),
+                'cumtime_s': round(cumtime, 4)
+            })
+        key = 'cumtime_s' if sort == 'cumulative' else 'tottime_s'
+        rows.sort(key=lambda row: row[key], reverse=True)
+        return rows[:self.top_n]
+
+    def allocation_sites(self) -> List[Dict]:
+        top = sorted(self.allocations.items(), key=lambda item: item[1][0], reverse=True)[:self.top_n]
+        return [
+            {'site': f"{filename}:{lineno}", 'kib': round(size / 1024, 1), 'blocks': blocks}
+            for (filename, lineno), (size, blocks) in top
+        ]
+
+    def write_report(self) -> Optional[Path]:
+        """Write the aggregated JSON report plus a .prof file for snakeviz/pstats"""
+        if not self.sampled:
+            return None
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            base = self.output_dir / f"{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            report = {
+                'keywords_seen': self.seen,
+                'keywords_profiled': len(self.sampled),
+                'sample_every': self.every,
+                'profiled_seconds': round(self.profiled_seconds, 3),
+                'peak_traced_mib': round(self.peak_bytes / (1024 * 1024), 2),
+                'hot_functions_cumulative': self.hot_functions('cumulative'),
+                'hot_functions_own_time': self.hot_functions('tottime'),
+                'allocation_sites': self.allocation_sites(),
+                'sampled_keywords': self.sampled
+            }
+            with open(base.with_suffix('.json'), 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stats.dump_stats(str(base.with_suffix('.prof')))
+
+            logger.info(f"Profile of {len(self.sampled)} keywords saved to: {base.name}.json")
+            return base.with_suffix('.json')
+        except Exception as e:
+            logger.error(f"Error saving profile report: {str(e)}")
+            return None
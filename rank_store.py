@@ -0,0 +1,160 @@
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import CONFIG, get_logger
+from utils import extract_domain
+
+logger = get_logger(__name__)
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS rankings (
+    id INTEGER PRIMARY KEY,
+    keyword TEXT NOT NULL,
+    date TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    link TEXT,
+    title TEXT,
+    captured_at TEXT NOT NULL
+);
+-- Every index carries the remaining lookup columns and rank, so the query
+-- helpers are answered from an index without touching the table rows.
+-- Unique: a keyword holds one snapshot per day
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rankings_keyword_day ON rankings (keyword, date, domain, rank);
+CREATE INDEX IF NOT EXISTS idx_rankings_domain_date ON rankings (domain, date, keyword, rank);
+-- Whole-day scans: share of voice and day-over-day deltas across all keywords
+CREATE INDEX IF NOT EXISTS idx_rankings_date ON rankings (date, keyword, domain, rank);
+'''
+
+# Stores from before the unique index could hold several captures of a keyword per day
+DEDUPLICATE = '''
+DELETE FROM rankings WHERE captured_at < (
+    SELECT MAX(captured_at) FROM rankings AS latest
+    WHERE latest.keyword = rankings.keyword AND latest.date = rankings.date
+);
+DELETE FROM rankings WHERE id NOT IN (SELECT MAX(id) FROM rankings GROUP BY keyword, date, domain, rank);
+DROP INDEX idx_rankings_keyword_date;
+'''
+
+
+class RankStore:
+    """Embedded SQLite history of saved rankings, indexed for trend queries.
+
+    A keyword keeps one snapshot per day: saving it again the same day (a
+    re-run, a retry, a repeated merge) replaces that day's rows, so counts
+    like share of voice are not inflated.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path or CONFIG['RANK_DB_PATH'])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' "
+                             "AND name = 'idx_rankings_keyword_date'").fetchone():
+            logger.info(f"Removing repeated same-day captures from {self.path.name}")
+            with self.conn:
+                self.conn.executescript(DEDUPLICATE)
+        self.conn.executescript(SCHEMA)
+
+    def add_results(self, keyword: str, results: List[Dict], captured: Optional[datetime] = None) -> int:
+        """Replace the keyword's rows for the day in a single transaction; returns the row count"""
+        captured = captured or datetime.now()
+        day = captured.strftime('%Y-%m-%d')
+        captured_at = captured.strftime('%Y-%m-%d %H:%M:%S')
+        rows = [
+            (
+                keyword,
+                day,
+                extract_domain(result.get('link', '')),
+                int(result.get('rank') or index),
+                result.get('link', ''),
+                result.get('title', ''),
+                captured_at
+            )
+            for index, result in enumerate(results, 1)
+        ]
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM rankings WHERE keyword = ? AND date = ?', (keyword, day))
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO rankings (keyword, date, domain, rank, link, title, captured_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def query(self, sql: str, params=()) -> List[Dict]:
+        with self.lock:
+            cursor = self.conn.execute(sql, params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def rank_history(self, keyword: str, domain: str, days: int = 90) -> List[Dict]:
+        """Best daily rank of a domain for a keyword over the last ``days`` days"""
+        since = (date.today() - timedelta(days=days)).isoformat()
+        return self.query(
+            'SELECT date, MIN(rank) AS rank FROM rankings '
+            'WHERE keyword = ? AND date >= ? AND domain = ? '
+            'GROUP BY date ORDER BY date',
+            (keyword, since, domain.lower())
+        )
+
+    def domain_history(self, domain: str, days: int = 90) -> List[Dict]:
+        """Best daily rank of a domain for every keyword it ranked for"""
+        since = (date.today() - timedelta(days=days)).isoformat()
+        return self.query(
+            'SELECT date, keyword, MIN(rank) AS rank FROM rankings '
+            'WHERE domain = ? AND date >= ? '
+            'GROUP BY date, keyword ORDER BY date, keyword',
+            (domain.lower(), since)
+        )
+
+    def share_of_voice(self, start: str, end: Optional[str] = None, keyword: Optional[str] = None,
+                       top_n: int = 10, limit: int = 50) -> List[Dict]:
+        """Share of top-N positions held by each domain between two dates (inclusive)"""
+        end = end or start
+        where = 'date BETWEEN ? AND ? AND rank <= ?'
+        params = [start, end, top_n]
+        if keyword:
+            where = 'keyword = ? AND ' + where
+            params.insert(0, keyword)
+
+        return self.query(
+            f'SELECT domain, COUNT(*) AS appearances, '
+            f'ROUND(COUNT(*) * 100.0 / SUM(COUNT(*)) OVER (), 2) AS share '
+            f'FROM rankings WHERE {where} '
+            f'GROUP BY domain ORDER BY appearances DESC LIMIT ?',
+            params + [limit]
+        )
+
+    def rank_deltas(self, day: str, previous_day: Optional[str] = None, keyword: Optional[str] = None) -> List[Dict]:
+        """Day-over-day change of each keyword/domain's best rank (positive = moved up)"""
+        previous_day = previous_day or (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+        keyword_filter = 'AND keyword = ?' if keyword else ''
+        params = [day] + ([keyword] if keyword else []) + [previous_day] + ([keyword] if keyword else [])
+
+        return self.query(
+            f'WITH today AS ('
+            f'    SELECT keyword, domain, MIN(rank) AS rank FROM rankings '
+            f'    WHERE date = ? {keyword_filter} GROUP BY keyword, domain'
+            f'), before AS ('
+            f'    SELECT keyword, domain, MIN(rank) AS rank FROM rankings '
+            f'    WHERE date = ? {keyword_filter} GROUP BY keyword, domain'
+            f') '
+            f'SELECT today.keyword, today.domain, before.rank AS previous_rank, today.rank AS rank, '
+            f'before.rank - today.rank AS delta '
+            f'FROM today LEFT JOIN before ON before.keyword = today.keyword AND before.domain = today.domain '
+            f'ORDER BY today.keyword, today.rank',
+            params
+        )
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,111 @@
+from typing import Dict, List, Optional
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+# Chrome content setting value that blocks a type for every site
+BLOCK = 2
+
+IMAGE_PATTERNS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.avif']
+FONT_PATTERNS = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+MEDIA_PATTERNS = ['*.mp4', '*.webm', '*.mp3', '*.m4a', '*.ogg']
+STYLESHEET_PATTERNS = ['*.css']
+# Ads, analytics and other third-party scripts; the results markup never needs them
+THIRD_PARTY_PATTERNS = ['*doubleclick.net*', '*googlesyndication.com*', '*google-analytics.com*',
+                        '*googletagmanager.com*', '*googleadservices.com*', '*adservice.google.*']
+
+# Profiles from least to most aggressive. 'strict' also turns JavaScript off, which
+# only fast mode (results loaded by URL) can live with
+BLOCK_PROFILES = {
+    'off': {'prefs': {}, 'patterns': []},
+    'media': {
+        'prefs': {'images': BLOCK},
+        'patterns': IMAGE_PATTERNS + FONT_PATTERNS + MEDIA_PATTERNS + THIRD_PARTY_PATTERNS
+    },
+    'text': {
+        'prefs': {'images': BLOCK},
+        'patterns': IMAGE_PATTERNS + FONT_PATTERNS + MEDIA_PATTERNS + STYLESHEET_PATTERNS + THIRD_PARTY_PATTERNS
+    },
+    'strict': {
+        'prefs': {'images': BLOCK, 'javascript': BLOCK},
+        'patterns': IMAGE_PATTERNS + FONT_PATTERNS + MEDIA_PATTERNS + STYLESHEET_PATTERNS + THIRD_PARTY_PATTERNS
+    },
+}
+
+# Bytes on the wire and load time of the current document and its subresources
+PAGE_TRANSFER_SCRIPT = """
+var nav = performance.getEntriesByType('navigation')[0];
+var resources = performance.getEntriesByType('resource');
+var bytes = nav ? (nav.transferSize || 0) : 0;
+for (var i = 0; i < resources.length; i++) {
+    bytes += resources[i].transferSize || 0;
+}
+var end = nav ? (nav.loadEventEnd || nav.domContentLoadedEventEnd || nav.responseEnd) : 0;
+return {bytes: bytes, resources: resources.length, load_ms: nav ? end - nav.startTime : 0};
+"""
+
+
+def get_profile(name: Optional[str] = None) -> Dict:
+    name = name or CONFIG['BLOCK_PROFILE']
+    if name not in BLOCK_PROFILES:
+        logger.error(f"Unknown resource blocking profile '{name}', using 'off'")
+        name = 'off'
+    profile = BLOCK_PROFILES[name]
+    return {
+        'name': name,
+        'prefs': profile['prefs'],
+        'patterns': profile['patterns'] + (CONFIG['BLOCKED_URL_PATTERNS'] if name != 'off' else [])
+    }
+
+
+def content_setting_prefs(profile: Dict) -> Dict:
+    """Chrome prefs blocking whole content types, e.g. {'profile.managed_default_content_settings.images': 2}"""
+    return {f"profile.managed_default_content_settings.{setting}": value
+            for setting, value in profile['prefs'].items()}
+
+
+def configure_options(options, profile: Optional[Dict] = None, headless: Optional[bool] = None):
+    """Add blocking prefs and headless flags to ChromeOptions (selenium or undetected_chromedriver)"""
+    profile = profile or get_profile()
+    prefs = content_setting_prefs(profile)
+    if prefs:
+        options.add_experimental_option('prefs', prefs)
+    if CONFIG['HEADLESS'] if headless is None else headless:
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1366,900')
+
+
+def apply_url_blocking(driver, profile: Optional[Dict] = None):
+    """Block requests by URL pattern through the DevTools protocol (fonts, stylesheets, trackers)"""
+    profile = profile or get_profile()
+    if not profile['patterns']:
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': profile['patterns']})
+    except Exception as e:
+        logger.warning(f"Could not enable URL blocking: {str(e)}")
+
+
+def page_transfer_stats(driver) -> Dict:
+    """{'bytes', 'resources', 'load_ms'} for the page currently loaded"""
+    try:
+        stats = driver.execute_script(PAGE_TRANSFER_SCRIPT) or {}
+    except Exception as e:
+        logger.debug(f"Could not read page transfer stats: {str(e)}")
+        stats = {}
+    return {
+        'bytes': int(stats.get('bytes') or 0),
+        'resources': int(stats.get('resources') or 0),
+        'load_ms': float(stats.get('load_ms') or 0)
+    }
+
+
+def summarize_pages(pages: List[Dict]) -> Dict:
+    return {
+        'pages': len(pages),
+        'bytes': sum(page['bytes'] for page in pages),
+        'resources': sum(page['resources'] for page in pages),
+        'load_ms': sum(page['load_ms'] for page in pages)
+    }
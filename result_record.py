@@ -0,0 +1,105 @@
+import sys
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Same keys, in the same order, as the dicts ContentProcessor.process_result used to build
+FIELDS = ('title', 'link', 'description', 'keyword', 'timestamp', 'processing_time', 'source', 'rank', 'status')
+FIELD_SET = frozenset(FIELDS)
+
+
+class ResultRecord:
+    """One processed search result, kept in slots instead of a per-row dict.
+
+    Keyword and source are interned and the timestamps are shared by every row
+    of a keyword, so a row costs little more than its title, link and
+    description. Writers keep working on it as a read/write mapping (``get``,
+    ``[]``, ``update``); fields added later, like enrichment data, go to
+    ``extra``. ``to_dict()`` gives the plain dict for JSON and pandas.
+    """
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, title: str, link: str, description: str, keyword: str, timestamp: str,
+                 processing_time: str, source: str = 'Google Search', rank: int = 0, status: str = 'processed'):
+        self.title = title
+        self.link = link
+        self.description = description
+        self.keyword = sys.intern(keyword) if isinstance(keyword, str) else keyword
+        self.timestamp = timestamp
+        self.processing_time = processing_time
+        self.source = sys.intern(source) if isinstance(source, str) else source
+        self.rank = rank
+        self.status = status
+        self.extra = None
+
+    def __getitem__(self, key: str):
+        if key in FIELD_SET:
+            return getattr(self, key)
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        if key in FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in FIELD_SET or (self.extra is not None and key in self.extra)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(FIELDS) + (len(self.extra) if self.extra else 0)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self) -> List[str]:
+        return list(FIELDS) + (list(self.extra) if self.extra else [])
+
+    def items(self) -> List[Tuple[str, object]]:
+        return list(self.to_dict().items())
+
+    def update(self, values: Dict):
+        for key, value in values.items():
+            self[key] = value
+
+    def to_dict(self) -> Dict:
+        record = {field: getattr(self, field) for field in FIELDS}
+        if self.extra:
+            record.update(self.extra)
+        return record
+
+    def __reduce__(self):
+        # Rebuilding through __init__ re-interns keyword and source in the receiving process
+        return (self.__class__, tuple(getattr(self, field) for field in FIELDS), self.extra)
+
+    def __setstate__(self, extra):
+        self.extra = extra
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ResultRecord, dict)):
+            return self.to_dict() == (other.to_dict() if isinstance(other, ResultRecord) else other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ResultRecord({self.to_dict()!r})"
+
+
+def json_default(value):
+    """``default=`` hook for json.dump: records are written in their dict form"""
+    if isinstance(value, ResultRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+def as_dicts(results: Iterable) -> List[Dict]:
+    """Plain dicts for consumers that need them (pandas, external code)"""
+    return [result.to_dict() if isinstance(result, ResultRecord) else result for result in results]
@@ -0,0 +1,72 @@
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+
+class RunJournal:
+    """Append-only JSONL record of completed keywords so a crashed run can resume"""
+
+    def __init__(self, name: str, resume: bool = False, journal_dir=None):
+        self.path = Path(journal_dir or CONFIG['JOURNAL_DIR']) / f"{name}.jsonl"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.entries: Dict[str, Dict] = {}
+        # Keywords completed in this session; their payloads are not kept in memory
+        self.completed = set()
+
+        if resume:
+            self.entries = self.load()
+            logger.info(f"Resuming run: {len(self.entries)} keywords already completed ({self.path.name})")
+        elif self.path.exists():
+            # A new run starts a new journal; keep the previous one for reference
+            self.path.replace(self.path.with_suffix('.prev.jsonl'))
+
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def load(self) -> Dict[str, Dict]:
+        """Read completed entries, ignoring a partially written last line"""
+        entries = {}
+        if not self.path.exists():
+            return entries
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                    entries[entry['keyword']] = entry
+                except (ValueError, KeyError):
+                    logger.warning(f"Skipping unreadable journal line {line_number} in {self.path.name}")
+        return entries
+
+    def is_done(self, keyword: str) -> bool:
+        return keyword in self.entries or keyword in self.completed
+
+    def pending(self, keywords: Iterable[str]) -> List[str]:
+        """Return the keywords that still have to be processed"""
+        return [keyword for keyword in keywords if not self.is_done(keyword)]
+
+    def record(self, keyword: str, **data):
+        """Durably append a completed keyword with its outputs"""
+        entry = {
+            'keyword': keyword,
+            'completed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            **data
+        }
+        self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.completed.add(keyword)
+
+    def close(self):
+        try:
+            self.file.close()
+        except Exception:
+            pass
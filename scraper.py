@@ -1,36 +1,81 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import pandas as pd
-import json
+import argparse
+import sys
 import time
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlencode
+from config import CONFIG, setup_logging
+from driver_cache import DriverCache
+from resource_blocking import BLOCK_PROFILES, get_profile, configure_options, apply_url_blocking, page_transfer_stats, summarize_pages
+from utils import format_size, scheduler
+from jsonl_writer import JsonlWriter
+from output_files import atomic_path, atomic_write_json, create_run_dir
+
 
 class GoogleScraper:
-    def __init__(self):
+    def __init__(self, stream_writer=None, fast_mode=False, run_dir=None):
+        # Optional JsonlWriter: results are appended as one line per keyword
+        # instead of separate JSON/Excel files
+        self.stream_writer = stream_writer
+        # Per-keyword files go into this run's directory (json/, excel/), created on first save
+        self.run_dir = run_dir
+        # Fast mode loads result pages by URL and waits on the DOM instead of sleeping
+        self.fast_mode = fast_mode
+        # Images, fonts, stylesheets and trackers are not loaded (CONFIG['BLOCK_PROFILE'])
+        self.block_profile = get_profile()
+        self.page_loads = []
+        self.launch_started = time.perf_counter()
         self.setup_driver()
+        print(f"Browser started in {time.perf_counter() - self.launch_started:.2f}s")
         
     def setup_driver(self):
+        # Imported here so --help and argument errors don't load selenium
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.support.ui import WebDriverWait
+
         options = webdriver.ChromeOptions()
         options.add_argument('--start-maximized')
         options.add_argument('--no-sandbox')
         options.add_experimental_option('excludeSwitches', ['enable-automation'])
-        
-        service = Service(ChromeDriverManager().install())
+        if CONFIG['CHROME_PROFILE_DIR']:
+            # A reused profile skips Chrome's first-run work on every start
+            options.add_argument(f"--user-data-dir={Path(CONFIG['CHROME_PROFILE_DIR']).resolve()}")
+        configure_options(options, self.block_profile)
+
+        # The driver is resolved over the network only on a cache miss or a Chrome update
+        driver_cache = DriverCache()
+        browser = driver_cache.browser()
+        if browser['path']:
+            options.binary_location = browser['path']
+        service = Service(driver_cache.chromedriver(browser))
         self.driver = webdriver.Chrome(service=service, options=options)
+        apply_url_blocking(self.driver, self.block_profile)
         self.wait = WebDriverWait(self.driver, 10)
+        self.fast_wait = WebDriverWait(self.driver, 10, poll_frequency=0.05)
         
+    def record_first_request(self):
+        # Startup metric: launch until the first page has loaded, reported once
+        if self.launch_started is not None:
+            print(f"First page loaded {time.perf_counter() - self.launch_started:.2f}s after browser launch")
+            self.launch_started = None
+
     def search_and_extract(self, keyword):
+        self.page_loads = []
+        if self.fast_mode:
+            return self.search_by_url(keyword)
+
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.keys import Keys
+        from selenium.webdriver.support import expected_conditions as EC
+
         results = []
         
         try:
-            # Go to Google
+            # Go to Google; every page load waits for a slot in the per-host request budget
+            scheduler.acquire(CONFIG['SEARCH_URL'])
             self.driver.get('https://www.google.com')
+            self.record_first_request()
             time.sleep(2)
             
             # Find search box and enter keyword
@@ -46,6 +91,7 @@ class GoogleScraper:
             # Try to get second page results
             try:
                 next_button = self.wait.until(EC.element_to_be_clickable((By.ID, 'pnnext')))
+                scheduler.acquire(CONFIG['SEARCH_URL'])
                 next_button.click()
                 time.sleep(2)
                 results.extend(self._extract_results())
@@ -58,25 +104,48 @@ class GoogleScraper:
             print(f"Error during search: {str(e)}")
             return results
     
-    def _extract_results(self):
+    def search_by_url(self, keyword):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+
         results = []
-        elements = self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.g')))
         
-        for element in elements:
-            try:
-                title = element.find_element(By.CSS_SELECTOR, 'h3').text
-                link = element.find_element(By.CSS_SELECTOR, 'a').get_attribute('href')
-                desc = element.find_element(By.CSS_SELECTOR, 'div.VwiC3b').text
+        try:
+            for page in (1, 2):
+                params = {'q': keyword}
+                if page > 1:
+                    params['start'] = (page - 1) * 10
+                scheduler.acquire(CONFIG['SEARCH_URL'])
+                self.driver.get(f"{CONFIG['SEARCH_URL']}?{urlencode(params)}")
+                self.record_first_request()
                 
-                if title and link:
-                    results.append({
-                        'title': title,
-                        'link': link,
-                        'description': desc,
-                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    })
-            except:
-                continue
+                # Returns as soon as the results container is in the DOM
+                self.fast_wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '#search')))
+                page_results = self._extract_results(wait=False)
+                results.extend(page_results)
+                if not page_results:
+                    break
+                    
+            return results
+            
+        except Exception as e:
+            print(f"Error during search: {str(e)}")
+            return results
+    
+    def _extract_results(self, wait=True):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from serp_parser import parse_serp
+
+        self.page_loads.append(page_transfer_stats(self.driver))
+        results = []
+        if wait:
+            self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.g')))
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        for item in parse_serp(self.driver.page_source, base_url=self.driver.current_url):
+            item['timestamp'] = timestamp
+            results.append(item)
                 
         return results
     
@@ -84,22 +153,34 @@ class GoogleScraper:
         if not results:
             return
             
-        # Create output directory
-        output_dir = Path('output')
-        output_dir.mkdir(exist_ok=True)
+        if self.stream_writer:
+            self.stream_writer.write({
+                'keyword': keyword,
+                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'results': results
+            })
+            print(f"\nAppended results for '{keyword}' to {self.stream_writer.path}")
+            return
+            
+        # Create output directories
+        if self.run_dir is None:
+            self.run_dir = create_run_dir()
+        for kind in ('json', 'excel'):
+            (self.run_dir / kind).mkdir(exist_ok=True)
         
         # Generate timestamp
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         # Save as JSON
-        json_file = output_dir / f'results_{keyword}_{timestamp}.json'
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=4)
+        json_file = self.run_dir / 'json' / f'results_{keyword}_{timestamp}.json'
+        atomic_write_json(json_file, results, ensure_ascii=False, indent=4)
             
         # Save as Excel
+        import pandas as pd
         df = pd.DataFrame(results)
-        excel_file = output_dir / f'results_{keyword}_{timestamp}.xlsx'
-        df.to_excel(excel_file, index=False)
+        excel_file = self.run_dir / 'excel' / f'results_{keyword}_{timestamp}.xlsx'
+        with atomic_path(excel_file) as temp_path:
+            df.to_excel(temp_path, index=False, engine='openpyxl')
         
         print(f"\nSaved results for '{keyword}':")
         print(f"JSON: {json_file}")
@@ -110,6 +191,23 @@ class GoogleScraper:
             self.driver.quit()
 
 def main():
+    parser = argparse.ArgumentParser(description="Search Google for every keyword in keywords.txt")
+    parser.add_argument('--jsonl', action='store_true',
+                        help="Stream all results into one JSON-lines file instead of per-keyword files")
+    parser.add_argument('--compress', action='store_true',
+                        help="gzip-compress the JSON-lines output")
+    parser.add_argument('--fast', action='store_true',
+                        help="Load result pages by URL and wait on the DOM instead of fixed sleeps")
+    parser.add_argument('--block', choices=list(BLOCK_PROFILES), default=None,
+                        help="Resource blocking profile (default: CONFIG['BLOCK_PROFILE'])")
+    parser.add_argument('--headless', action='store_true', help="Run Chrome without a window")
+    args = parser.parse_args()
+    setup_logging()
+    if args.block:
+        CONFIG['BLOCK_PROFILE'] = args.block
+    if args.headless:
+        CONFIG['HEADLESS'] = True
+
     # Read keywords
     with open('keywords.txt', 'r', encoding='utf-8') as f:
         keywords = [line.strip() for line in f if line.strip()]
@@ -117,20 +215,36 @@ def main():
     print(f"Found {len(keywords)} keywords to process")
     
     # Initialize scraper
-    scraper = GoogleScraper()
+    run_dir = create_run_dir()
+    writer = None
+    if args.jsonl:
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        writer = JsonlWriter(run_dir / 'jsonl' / f'results_{timestamp}.jsonl', compress=args.compress)
+    scraper = GoogleScraper(stream_writer=writer, fast_mode=args.fast, run_dir=run_dir)
     
     try:
         # Process each keyword
-        for keyword in keywords:
+        run_start = time.perf_counter()
+        for count, keyword in enumerate(keywords, 1):
             print(f"\nProcessing: {keyword}")
+            keyword_start = time.perf_counter()
             results = scraper.search_and_extract(keyword)
-            print(f"Found {len(results)} results")
+            scheduler.report(CONFIG['SEARCH_URL'], bool(results))
+            elapsed = time.perf_counter() - keyword_start
+            rate = count * 60 / (time.perf_counter() - run_start)
+            print(f"Found {len(results)} results in {elapsed:.2f}s ({rate:.1f} keywords/min)")
+            if scraper.page_loads:
+                pages = summarize_pages(scraper.page_loads)
+                print(f"Transferred {format_size(pages['bytes'])} in {pages['resources']} resources, "
+                      f"{pages['load_ms']:.0f} ms page load (blocking: {scraper.block_profile['name']})")
             scraper.save_results(keyword, results)
-            time.sleep(2)  # Delay between searches
             
     finally:
         scraper.close()
-        input("\nPress Enter to exit...")
+        if writer:
+            writer.close()
+        if sys.stdin.isatty():
+            input("\nPress Enter to exit...")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,117 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import CONFIG, get_logger
+
+logger = get_logger(__name__)
+
+
+class SerpCache:
+    """On-disk SQLite cache of SERP pages keyed by normalized keyword and page number.
+
+    A keyword's pages are stored, served and evicted together: whatever pages
+    the last search got (one when page 2 timed out or there was no next page)
+    are what a later lookup returns, and each lookup counts as one hit or miss.
+    """
+
+    def __init__(self, path=None, ttl: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.path = Path(path or CONFIG['CACHE_PATH'])
+        self.ttl = CONFIG['CACHE_TTL'] if ttl is None else ttl
+        self.max_bytes = CONFIG['CACHE_MAX_BYTES'] if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS serp_cache (
+                keyword TEXT NOT NULL,
+                page INTEGER NOT NULL,
+                results TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (keyword, page)
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_serp_cache_accessed ON serp_cache (accessed_at)')
+        self.conn.commit()
+
+    @staticmethod
+    def normalize_keyword(keyword: str) -> str:
+        """Case-fold and collapse whitespace so equivalent keywords share an entry"""
+        return ' '.join(keyword.lower().split())
+
+    def get_pages(self, keyword: str) -> Optional[List[List[Dict]]]:
+        """Return the cached pages of a keyword in order, or None when missing or expired"""
+        key = self.normalize_keyword(keyword)
+        now = time.time()
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT page, results, created_at FROM serp_cache WHERE keyword = ? ORDER BY page',
+                (key,)
+            ).fetchall()
+
+            # Pages are written together, so a gap or an expired page means the entry is incomplete
+            if (not rows or [row[0] for row in rows] != list(range(1, len(rows) + 1))
+                    or any(now - row[2] > self.ttl for row in rows)):
+                self.misses += 1
+                return None
+
+            self.conn.execute('UPDATE serp_cache SET accessed_at = ? WHERE keyword = ?', (now, key))
+            self.conn.commit()
+            self.hits += 1
+
+        return [json.loads(row[1]) for row in rows]
+
+    def set_pages(self, keyword: str, pages: List[List[Dict]]):
+        """Replace the keyword's cached pages and evict entries beyond the size budget"""
+        key = self.normalize_keyword(keyword)
+        now = time.time()
+        rows = []
+        for page, results in enumerate(pages, 1):
+            payload = json.dumps(results, ensure_ascii=False)
+            rows.append((key, page, payload, len(payload.encode('utf-8')), now, now))
+        with self.lock:
+            self.conn.execute('DELETE FROM serp_cache WHERE keyword = ?', (key,))
+            self.conn.executemany('INSERT INTO serp_cache VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self.conn.commit()
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used keywords until under max_bytes"""
+        with self.lock:
+            self.conn.execute('DELETE FROM serp_cache WHERE created_at < ?', (time.time() - self.ttl,))
+            total = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM serp_cache').fetchone()[0]
+
+            if total > self.max_bytes:
+                removed = 0
+                rows = self.conn.execute(
+                    'SELECT keyword, SUM(size) FROM serp_cache GROUP BY keyword ORDER BY MAX(accessed_at)'
+                )
+                victims = []
+                for keyword, size in rows:
+                    if total - removed <= self.max_bytes:
+                        break
+                    victims.append((keyword,))
+                    removed += size
+                self.conn.executemany('DELETE FROM serp_cache WHERE keyword = ?', victims)
+                logger.debug(f"Cache evicted {len(victims)} entries ({removed} bytes)")
+
+            self.conn.commit()
+
+    def stats(self) -> Dict:
+        """Return hit and miss counters"""
+        return {'cache_hits': self.hits, 'cache_misses': self.misses}
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,84 @@
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Same selectors the Selenium extractors use
+RESULT_SELECTOR = 'div.g'
+TITLE_SELECTOR = 'h3'
+LINK_SELECTOR = 'a'
+DESCRIPTION_SELECTOR = 'div.VwiC3b'
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+# Only build the result blocks, the rest of the page is skipped while parsing
+RESULT_STRAINER = SoupStrainer('div', class_='g')
+
+
+def parse_serp(html: str, base_url: Optional[str] = None, parser: Optional[str] = None) -> List[Dict]:
+    """Parse raw SERP HTML into a list of {'title', 'link', 'description'} dicts"""
+    soup = BeautifulSoup(html, parser or DEFAULT_PARSER, parse_only=RESULT_STRAINER)
+    results = []
+
+    for element in soup.select(RESULT_SELECTOR):
+        title_tag = element.select_one(TITLE_SELECTOR)
+        link_tag = element.select_one(LINK_SELECTOR)
+        if title_tag is None or link_tag is None:
+            continue
+
+        title = title_tag.get_text(' ', strip=True)
+        link = link_tag.get('href', '')
+        if base_url and link:
+            link = urljoin(base_url, link)
+
+        description_tag = element.select_one(DESCRIPTION_SELECTOR)
+        description = description_tag.get_text(' ', strip=True) if description_tag else ''
+
+        if title and link:
+            results.append({
+                'title': title,
+                'link': link,
+                'description': description
+            })
+
+    return results
+
+
+def parse_serp_file(path, base_url: Optional[str] = None, parser: Optional[str] = None) -> List[Dict]:
+    """Parse a saved SERP page from disk"""
+    html = Path(path).read_text(encoding='utf-8', errors='replace')
+    return parse_serp(html, base_url=base_url, parser=parser)
+
+
+def benchmark(paths: List[str], repeat: int = 20) -> Dict[str, float]:
+    """Return the average parse time in ms per page for each available backend"""
+    pages = [Path(path).read_text(encoding='utf-8', errors='replace') for path in paths]
+    parsers = ['html.parser'] + (['lxml'] if DEFAULT_PARSER == 'lxml' else [])
+    timings = {}
+
+    for parser in parsers:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for html in pages:
+                parse_serp(html, parser=parser)
+        timings[parser] = (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+
+    return timings
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python serp_parser.py page.html [page2.html ...]")
+        sys.exit(1)
+
+    for path in sys.argv[1:]:
+        print(f"{path}: {len(parse_serp_file(path))} results")
+    for parser, ms in benchmark(sys.argv[1:]).items():
+        print(f"{parser:<12} {ms:8.2f} ms/page")
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+import argparse
+import heapq
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import CONFIG, get_logger, setup_logging
+from jsonl_writer import JsonlWriter, iter_jsonl
+from metrics import metrics
+from resource_blocking import BLOCK_PROFILES
+
+logger = get_logger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    shard_count INTEGER NOT NULL,
+    keyword_count INTEGER NOT NULL,
+    merged_at REAL
+);
+CREATE TABLE IF NOT EXISTS shards (
+    run_id TEXT NOT NULL,
+    shard INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    node TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_until REAL,
+    started_at REAL,
+    finished_at REAL,
+    keyword_count INTEGER NOT NULL,
+    stats TEXT,
+    PRIMARY KEY (run_id, shard)
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    run_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    shard INTEGER NOT NULL,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS idx_keywords_shard ON keywords (run_id, shard, position);
+'''
+
+
+def shard_of(keyword: str, shard_count: int) -> int:
+    """Stable shard number for a keyword (crc32, so every node and every run agree)"""
+    return zlib.crc32(keyword.encode('utf-8')) % shard_count
+
+
+class ShardStore:
+    """Runs split into keyword shards that nodes lease from a shared SQLite file.
+
+    The coordinator plans a run once; every node then claims a shard, renews
+    its lease after each keyword and marks it done with the shard's stats. A
+    shard whose node stops renewing is handed to the next node that asks once
+    CONFIG['SHARD_LEASE'] seconds have passed. A shard that has failed or lost
+    its node CONFIG['MAX_RETRIES'] times is marked failed instead of being
+    handed out again. Point CONFIG['SHARD_DIR'] at a
+    directory every node can reach (or a local one to try it on one machine).
+    """
+
+    def __init__(self, shard_dir=None):
+        self.dir = Path(shard_dir or CONFIG['SHARD_DIR'])
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.path = self.dir / 'shards.sqlite3'
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def run_dir(self, run_id: str) -> Path:
+        return self.dir / run_id
+
+    def shard_path(self, run_id: str, shard: int) -> Path:
+        return self.run_dir(run_id) / f"shard_{shard:04d}.jsonl"
+
+    def transaction(self, statements: List[Tuple[str, tuple]]):
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                for sql, params in statements:
+                    self.conn.execute(sql, params)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+
+    def create_run(self, keywords: List[str], shard_count: int) -> str:
+        """Plan a run: assign every keyword to a shard, keeping its position in the list"""
+        # The suffix keeps two plans made in the same second apart
+        run_id = f"{datetime.now().strftime('run_%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        assignments = [(position, shard_of(keyword, shard_count), keyword)
+                       for position, keyword in enumerate(keywords)]
+        sizes = [0] * shard_count
+        for _, shard, _ in assignments:
+            sizes[shard] += 1
+
+        statements = [('INSERT INTO runs (run_id, created_at, shard_count, keyword_count) VALUES (?, ?, ?, ?)',
+                       (run_id, time.time(), shard_count, len(keywords)))]
+        # Empty shards are not created, so nobody waits on them
+        statements += [('INSERT INTO shards (run_id, shard, keyword_count) VALUES (?, ?, ?)', (run_id, shard, size))
+                       for shard, size in enumerate(sizes) if size]
+        statements += [('INSERT INTO keywords (run_id, position, shard, keyword) VALUES (?, ?, ?, ?)',
+                        (run_id, position, shard, keyword)) for position, shard, keyword in assignments]
+        self.transaction(statements)
+        self.run_dir(run_id).mkdir(parents=True, exist_ok=True)
+        return run_id
+
+    def latest_run(self) -> Optional[str]:
+        with self.lock:
+            row = self.conn.execute('SELECT run_id FROM runs ORDER BY created_at DESC LIMIT 1').fetchone()
+        return row['run_id'] if row else None
+
+    def claim(self, run_id: str, node: str) -> Optional[int]:
+        """Lease the next queued shard (or one whose lease expired) to this node"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                # Its node died on the last allowed attempt; handing it out again could stop the next one
+                expired = self.conn.execute(
+                    'UPDATE shards SET status = ?, lease_until = NULL, finished_at = ? '
+                    'WHERE run_id = ? AND status = ? AND lease_until < ? AND attempts >= ?',
+                    (FAILED, now, run_id, RUNNING, now, CONFIG['MAX_RETRIES'])
+                )
+                if expired.rowcount:
+                    logger.warning(f"{expired.rowcount} shards of {run_id} failed: their node stopped on the last attempt")
+                row = self.conn.execute(
+                    'SELECT shard, node FROM shards WHERE run_id = ? AND (status = ? OR (status = ? AND lease_until < ?)) '
+                    'ORDER BY shard LIMIT 1',
+                    (run_id, QUEUED, RUNNING, now)
+                ).fetchone()
+                if row is not None:
+                    self.conn.execute(
+                        'UPDATE shards SET status = ?, node = ?, lease_until = ?, started_at = ?, attempts = attempts + 1 '
+                        'WHERE run_id = ? AND shard = ?',
+                        (RUNNING, node, now + CONFIG['SHARD_LEASE'], now, run_id, row['shard'])
+                    )
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        if row is None:
+            return None
+        if row['node']:
+            logger.warning(f"Shard {row['shard']} of {run_id} taken over from {row['node']} (lease expired)")
+        return row['shard']
+
+    def renew(self, run_id: str, shard: int, node: str) -> bool:
+        """Extend the lease; False if the shard was meanwhile handed to another node"""
+        with self.lock:
+            cursor = self.conn.execute(
+                'UPDATE shards SET lease_until = ? WHERE run_id = ? AND shard = ? AND status = ? AND node = ?',
+                (time.time() + CONFIG['SHARD_LEASE'], run_id, shard, RUNNING, node)
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, run_id: str, shard: int, node: str, stats: Dict) -> bool:
+        with self.lock:
+            cursor = self.conn.execute(
+                'UPDATE shards SET status = ?, lease_until = NULL, finished_at = ?, stats = ? '
+                'WHERE run_id = ? AND shard = ? AND status = ? AND node = ?',
+                (DONE, time.time(), json.dumps(stats, ensure_ascii=False, default=str), run_id, shard, RUNNING, node)
+            )
+        return cursor.rowcount == 1
+
+    def release(self, run_id: str, shard: int, node: str) -> bool:
+        """Give a shard back without waiting for its lease to run out; True if it failed for good"""
+        with self.lock:
+            row = self.conn.execute('SELECT attempts FROM shards WHERE run_id = ? AND shard = ?',
+                                    (run_id, shard)).fetchone()
+            final = row is not None and row['attempts'] >= CONFIG['MAX_RETRIES']
+            self.conn.execute(
+                'UPDATE shards SET status = ?, node = NULL, lease_until = NULL, finished_at = ? '
+                'WHERE run_id = ? AND shard = ? AND node = ? AND status = ?',
+                (FAILED if final else QUEUED, time.time() if final else None, run_id, shard, node, RUNNING)
+            )
+        return final
+
+    def retry_failed(self, run_id: str) -> int:
+        """Queue the run's failed shards again with fresh attempts"""
+        with self.lock:
+            cursor = self.conn.execute(
+                'UPDATE shards SET status = ?, node = NULL, attempts = 0, finished_at = NULL '
+                'WHERE run_id = ? AND status = ?',
+                (QUEUED, run_id, FAILED)
+            )
+        return cursor.rowcount
+
+    def keywords(self, run_id: str, shard: int) -> List[Tuple[int, str]]:
+        with self.lock:
+            rows = self.conn.execute(
+                'SELECT position, keyword FROM keywords WHERE run_id = ? AND shard = ? ORDER BY position',
+                (run_id, shard)
+            ).fetchall()
+        return [(row['position'], row['keyword']) for row in rows]
+
+    def shards(self, run_id: str) -> List[Dict]:
+        with self.lock:
+            rows = self.conn.execute('SELECT * FROM shards WHERE run_id = ? ORDER BY shard', (run_id,)).fetchall()
+        shards = []
+        for row in rows:
+            shard = dict(row)
+            shard['stats'] = json.loads(shard['stats']) if shard['stats'] else None
+            shards.append(shard)
+        return shards
+
+    def run(self, run_id: str) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute('SELECT * FROM runs WHERE run_id = ?', (run_id,)).fetchone()
+        return dict(row) if row else None
+
+    def mark_merged(self, run_id: str):
+        with self.lock:
+            self.conn.execute('UPDATE runs SET merged_at = ? WHERE run_id = ?', (time.time(), run_id))
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception:
+            pass
+
+
+def default_node_name() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def work(run_id: str, node: Optional[str] = None, store: Optional[ShardStore] = None):
+    """Node loop: claim shards and process their keywords until every shard of the run is done"""
+    from content_processor import ContentProcessor
+
+    node = node or default_node_name()
+    store = store or ShardStore()
+    processor = ContentProcessor()
+    logger.info(f"Node {node} working on {run_id}")
+    try:
+        while True:
+            shard = store.claim(run_id, node)
+            if shard is None:
+                shards = store.shards(run_id)
+                if all(s['status'] in (DONE, FAILED) for s in shards):
+                    failed = [s['shard'] for s in shards if s['status'] == FAILED]
+                    if failed:
+                        logger.error(f"{len(failed)} shards of {run_id} failed after {CONFIG['MAX_RETRIES']} attempts: "
+                                     f"{failed[:10]}")
+                    break
+                # Others hold the remaining shards; wait in case one of them dies
+                time.sleep(CONFIG['SHARD_POLL_INTERVAL'])
+                continue
+            try:
+                process_shard(processor, store, run_id, shard, node)
+            except Exception as e:
+                final = store.release(run_id, shard, node)
+                state = 'failed for good' if final else 'requeued'
+                logger.error(f"Shard {shard} failed on {node} ({state}): {str(e)}")
+    finally:
+        processor.close_writers()
+        processor.quit_browser()
+    logger.info(f"Node {node}: no shards left in {run_id}")
+
+
+def process_shard(processor, store: ShardStore, run_id: str, shard: int, node: str):
+    """Process one shard into a per-node part file, published by rename once the shard is done"""
+    keywords = store.keywords(run_id, shard)
+    final_path = store.shard_path(run_id, shard)
+    part_path = final_path.with_name(f"{final_path.stem}.{node}.part.jsonl")
+    logger.info(f"Shard {shard}: {len(keywords)} keywords")
+
+    processor.stats = processor.new_stats()
+    metrics.drain()  # Only this shard's metrics go into its stats
+    writer = JsonlWriter(part_path, compress=False)
+    lost = False
+    try:
+        for position, keyword in keywords:
+            results = processor.process_keyword(keyword)
+            writer.write({'position': position, 'keyword': keyword, 'results': results})
+            if not store.renew(run_id, shard, node):
+                lost = True
+                break
+    finally:
+        writer.close()
+
+    if lost:
+        logger.warning(f"Shard {shard}: lease lost to another node, discarding this attempt")
+        part_path.unlink(missing_ok=True)
+        return
+    # Publish the file before marking the shard done; a late duplicate has the same content
+    os.replace(part_path, final_path)
+    if store.complete(run_id, shard, node, {'stats': processor.stats, 'metrics': metrics.drain()}):
+        logger.info(f"Shard {shard} done ({processor.stats['total_results']} results)")
+    else:
+        logger.warning(f"Shard {shard}: lease lost to another node before completion")
+
+
+def merge(run_id: str, store: Optional[ShardStore] = None, writers: Optional[List[str]] = None,
+          force: bool = False, skip_failed: bool = False) -> bool:
+    """Combine finished shards into the outputs and stats a single-node run would have written.
+
+    A run that was merged already is skipped (returns False) unless ``force``,
+    since merging it again writes every output and rank_store row twice.
+    Failed shards stop the merge unless ``skip_failed``, which leaves their
+    keywords out.
+    """
+    from content_processor import ContentProcessor
+
+    store = store or ShardStore()
+    run = store.run(run_id)
+    if run and run['merged_at'] and not force:
+        merged_at = datetime.fromtimestamp(run['merged_at']).strftime('%Y-%m-%d %H:%M:%S')
+        logger.warning(f"{run_id} was merged at {merged_at}; use --force to merge it again")
+        return False
+    shards = store.shards(run_id)
+    pending = [s['shard'] for s in shards if s['status'] not in (DONE, FAILED)]
+    failed = [s for s in shards if s['status'] == FAILED]
+    if not shards:
+        raise Exception(f"{run_id} has no keywords")
+    if pending:
+        raise Exception(f"{len(pending)} shards of {run_id} are not done yet: {pending[:10]}")
+    if failed and not skip_failed:
+        raise Exception(f"{len(failed)} shards of {run_id} failed: {[s['shard'] for s in failed][:10]} "
+                        f"(retry them with `retry`, or merge without them with --skip-failed)")
+    if failed:
+        logger.warning(f"Leaving out {sum(s['keyword_count'] for s in failed)} keywords of {len(failed)} failed shards")
+        shards = [s for s in shards if s['status'] == DONE]
+        if not shards:
+            raise Exception(f"No shard of {run_id} is done")
+
+    processor = ContentProcessor(launch_browser=False)
+    processor.stats['start_time'] = datetime.fromtimestamp(min(s['started_at'] for s in shards))
+    for shard in shards:
+        processor.merge_stats(shard['stats']['stats'])
+        metrics.merge(shard['stats']['metrics'])
+
+    # Every shard file is in keyword order already, so a streaming merge restores the input order
+    records = heapq.merge(*(iter_jsonl(store.shard_path(run_id, shard['shard'])) for shard in shards),
+                          key=lambda record: record['position'])
+    merged = 0
+    try:
+        for record in records:
+            if record['results']:
+                processor.save_results(record['keyword'], record['results'], writers=writers)
+                merged += 1
+            else:
+                logger.warning(f"No results found for keyword: {record['keyword']}")
+        processor.save_processing_stats()
+    finally:
+        processor.close_writers()
+    store.mark_merged(run_id)
+    logger.info(f"Merged {len(shards)} shards of {run_id}: {merged} keywords with results")
+    return True
+
+
+def print_status(store: ShardStore, run_id: str, as_json: bool = False):
+    run = store.run(run_id)
+    shards = store.shards(run_id)
+    if as_json:
+        print(json.dumps({'run': run, 'shards': shards}, ensure_ascii=False, indent=2, default=str))
+        return
+
+    counts = {status: sum(1 for s in shards if s['status'] == status) for status in (QUEUED, RUNNING, DONE, FAILED)}
+    done_keywords = sum(s['keyword_count'] for s in shards if s['status'] == DONE)
+    print(f"{run_id}: {run['keyword_count']} keywords in {len(shards)} shards "
+          f"({run['shard_count']} planned){' - merged' if run['merged_at'] else ''}")
+    print(f"queued {counts[QUEUED]} | running {counts[RUNNING]} | done {counts[DONE]} | failed {counts[FAILED]} "
+          f"({done_keywords}/{run['keyword_count']} keywords)")
+    now = time.time()
+    for shard in shards:
+        if shard['status'] == RUNNING:
+            expired = ' (lease expired)' if shard['lease_until'] < now else ''
+            print(f"  shard {shard['shard']:<5} {shard['node']}, attempt {shard['attempts']}{expired}")
+        elif shard['status'] == FAILED:
+            print(f"  shard {shard['shard']:<5} failed after {shard['attempts']} attempts ({shard['keyword_count']} keywords)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a keyword run into shards processed by several nodes")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    plan_parser = commands.add_parser('plan', help="Create a run from a keyword file")
+    plan_parser.add_argument('keywords_file', nargs='?', default='keywords.txt')
+    plan_parser.add_argument('--shards', type=int, default=None,
+                             help="Number of shards (default: CONFIG['SHARD_COUNT'])")
+
+    work_parser = commands.add_parser('work', help="Process shards on this node until the run is done")
+    work_parser.add_argument('--run', default=None, help="Run id (default: the latest run)")
+    work_parser.add_argument('--node', default=None, help="Node name (default: hostname-pid)")
+    work_parser.add_argument('--fast', action='store_true',
+                             help="Load result pages by URL and wait on the DOM instead of fixed sleeps")
+    work_parser.add_argument('--block', choices=list(BLOCK_PROFILES), default=None,
+                             help="Resource blocking profile (default: CONFIG['BLOCK_PROFILE'])")
+    work_parser.add_argument('--headless', action='store_true', help="Run Chrome without a window")
+
+    merge_parser = commands.add_parser('merge', help="Write the run's outputs and stats from its finished shards")
+    merge_parser.add_argument('--run', default=None, help="Run id (default: the latest run)")
+    merge_parser.add_argument('--writers', default=None,
+                              help="Comma-separated output writers (default: CONFIG['OUTPUT_WRITERS'])")
+    merge_parser.add_argument('--force', action='store_true', help="Merge again even if the run was merged already")
+    merge_parser.add_argument('--skip-failed', action='store_true', help="Merge without the keywords of failed shards")
+
+    retry_parser = commands.add_parser('retry', help="Queue the run's failed shards again")
+    retry_parser.add_argument('--run', default=None, help="Run id (default: the latest run)")
+
+    status_parser = commands.add_parser('status', help="Show shard progress")
+    status_parser.add_argument('--run', default=None, help="Run id (default: the latest run)")
+    status_parser.add_argument('--json', action='store_true', help="Machine-readable output")
+
+    for subparser in (plan_parser, work_parser, merge_parser, retry_parser, status_parser):
+        subparser.add_argument('--shard-dir', default=None,
+                               help="Shared directory for the shard database and files (default: CONFIG['SHARD_DIR'])")
+    args = parser.parse_args()
+    if args.command != 'status':
+        setup_logging()
+
+    store = ShardStore(args.shard_dir)
+    try:
+        if args.command == 'plan':
+            from content_processor import load_keywords
+            keywords = load_keywords(args.keywords_file)
+            run_id = store.create_run(keywords, max(1, args.shards or CONFIG['SHARD_COUNT']))
+            print(f"Planned {run_id}: {len(keywords)} keywords")
+            return
+
+        run_id = args.run or store.latest_run()
+        if run_id is None or store.run(run_id) is None:
+            print(f"No run found in {store.dir}")
+            sys.exit(1)
+
+        if args.command == 'work':
+            if args.fast:
+                CONFIG['FAST_MODE'] = True
+            if args.block:
+                CONFIG['BLOCK_PROFILE'] = args.block
+            if args.headless:
+                CONFIG['HEADLESS'] = True
+            work(run_id, args.node, store)
+        elif args.command == 'merge':
+            writers = [name.strip() for name in args.writers.split(',') if name.strip()] if args.writers else None
+            if not merge(run_id, store, writers, args.force, args.skip_failed):
+                sys.exit(1)
+        elif args.command == 'retry':
+            print(f"Queued {store.retry_failed(run_id)} failed shards of {run_id} again")
+        else:
+            print_status(store, run_id, args.json)
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()
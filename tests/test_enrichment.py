@@ -0,0 +1,106 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from enrichment import ENRICHMENT_FIELDS, LandingPageEnricher
+
+PAGE = b'''<html><head><title> Landing  page </title>
+<meta name="description" content="A page about SEO tools"><style>p { color: red }</style></head>
+<body><h1>Best <b>SEO</b> tools</h1><p>one two three</p><script>var hidden = "words";</script></body></html>'''
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/page':
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+        elif self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/page')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/slow':
+            time.sleep(2)
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        else:
+            self.send_response(404)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StandInHandler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def enrich(*urls):
+    results = [{'link': url} for url in urls]
+    return LandingPageEnricher(concurrency=4, per_host=2, timeout=0.5).enrich(results)
+
+
+def test_page_fields(server):
+    result, = enrich(f"{server}/page")
+    assert result['status_code'] == 200
+    assert result['final_url'] == f"{server}/page"
+    assert result['page_title'] == 'Landing page'
+    assert result['meta_description'] == 'A page about SEO tools'
+    assert result['h1'] == 'Best SEO tools'
+    assert result['word_count'] == 6  # H1 and paragraph text; title, style and script are not counted
+    assert 'enrichment_error' not in result
+
+
+def test_redirect_reports_final_url(server):
+    result, = enrich(f"{server}/redirect")
+    assert result['status_code'] == 200
+    assert result['final_url'] == f"{server}/page"
+    assert result['page_title'] == 'Landing page'
+
+
+def test_error_status_is_kept(server):
+    result, = enrich(f"{server}/missing")
+    assert result['status_code'] == 404
+    assert result['page_title'] == ''
+    assert 'enrichment_error' not in result
+
+
+def test_timeout_sets_error(server):
+    result, = enrich(f"{server}/slow")
+    assert all(result[field] is None for field in ENRICHMENT_FIELDS)
+    assert result['enrichment_error'] == 'TimeoutError'
+
+
+def test_connection_error_sets_error():
+    result, = enrich(f"http://127.0.0.1:{unused_port()}/page")
+    assert all(result[field] is None for field in ENRICHMENT_FIELDS)
+    assert result['enrichment_error']
+
+
+def test_results_are_enriched_concurrently(server):
+    results = enrich(f"{server}/page", f"{server}/missing", f"{server}/redirect")
+    assert [result['status_code'] for result in results] == [200, 404, 200]
@@ -0,0 +1,107 @@
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from parquet_export import ParquetExporter, read_results, to_result_dicts
+from result_record import ResultRecord
+
+
+def make_results(keyword, count, enriched=False):
+    results = []
+    for index in range(count):
+        record = ResultRecord(f"Title {index}", f"https://www.example.com/page/{index}", f"Description {index}",
+                              keyword, '2024-01-01 10:00:00', '2024-01-01 10:00:01', rank=index + 1)
+        if enriched:
+            record.update({'status_code': 200, 'final_url': f"https://example.com/page/{index}",
+                           'page_title': f"Page {index}", 'meta_description': '', 'h1': f"Heading {index}",
+                           'word_count': 120 + index})
+        results.append(record)
+    return results
+
+
+def test_round_trip_matches_json_results(tmp_path):
+    exporter = ParquetExporter(tmp_path)
+    written = make_results('seo tools', 3) + make_results('rank tracker', 2)
+    exporter.write('seo tools', written[:3])
+    exporter.write('rank tracker', written[3:])
+    assert exporter.close()
+
+    table = read_results(tmp_path)
+    assert to_result_dicts(table) == [record.to_dict() for record in written]
+    assert set(table.column('domain').to_pylist()) == {'example.com'}
+
+
+def test_enrichment_fields_survive(tmp_path):
+    exporter = ParquetExporter(tmp_path)
+    written = make_results('seo tools', 2, enriched=True) + make_results('plain', 1)
+    exporter.write('seo tools', written[:2])
+    exporter.write('plain', written[2:])
+    assert exporter.close()
+
+    assert to_result_dicts(read_results(tmp_path)) == [record.to_dict() for record in written]
+
+
+def test_filters_are_pushed_down(tmp_path):
+    exporter = ParquetExporter(tmp_path)
+    exporter.write('seo tools', make_results('seo tools', 4))
+    exporter.write('rank tracker', make_results('rank tracker', 2))
+    exporter.close()
+
+    table = read_results(tmp_path, columns=['keyword', 'rank'], filters=[('keyword', '=', 'rank tracker')])
+    assert table.num_rows == 2
+    assert table.column('rank').to_pylist() == [1, 2]
+
+
+def test_full_buffer_is_written_as_a_complete_part(tmp_path):
+    exporter = ParquetExporter(tmp_path, row_group_size=5)
+    exporter.write('seo tools', make_results('seo tools', 3))
+    assert exporter.buffered == 3
+    assert not list(tmp_path.rglob('*.parquet'))
+
+    first_part = exporter.path
+    exporter.write('rank tracker', make_results('rank tracker', 3))
+    # Saved without close(): a crash from here on loses nothing already flushed
+    assert exporter.buffered == 0
+    assert first_part.exists()
+    assert read_results(tmp_path).num_rows == 6
+
+    exporter.write('backlinks', make_results('backlinks', 1))
+    assert exporter.close()
+    assert len(exporter.parts) == 2
+    assert not list(tmp_path.rglob('.*.tmp'))
+    assert read_results(tmp_path).num_rows == 7
+
+
+def test_rows_older_than_the_flush_interval_are_written(tmp_path):
+    exporter = ParquetExporter(tmp_path, flush_interval=0)
+    exporter.write('seo tools', make_results('seo tools', 2))
+    assert exporter.buffered == 0
+    assert read_results(tmp_path).num_rows == 2
+
+
+def test_failed_flush_does_not_duplicate_retried_rows(tmp_path, monkeypatch):
+    import parquet_export
+
+    exporter = ParquetExporter(tmp_path, row_group_size=5)
+    exporter.write('seo tools', make_results('seo tools', 3))
+    write_table = parquet_export.pq.write_table
+    calls = []
+
+    def fail_once(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return write_table(*args, **kwargs)
+
+    monkeypatch.setattr(parquet_export.pq, 'write_table', fail_once)
+    with pytest.raises(OSError):
+        exporter.write('rank tracker', make_results('rank tracker', 3))
+    assert exporter.buffered == 3
+
+    # save_results retries the failed writer with the same rows
+    exporter.write('rank tracker', make_results('rank tracker', 3))
+    assert exporter.buffered == 0
+    assert exporter.close()
+    table = read_results(tmp_path)
+    assert table.num_rows == 6
+    assert table.column('keyword').to_pylist() == ['seo tools'] * 3 + ['rank tracker'] * 3
@@ -1,12 +1,18 @@
+import logging
 from tqdm import tqdm
-import random
+import threading
 import time
+from collections import deque
+from contextlib import nullcontext
 from datetime import datetime
+from urllib.parse import urlsplit
 from colorama import Fore, Back, Style
-import requests
-from typing import Optional, Tuple
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
 from config import CONFIG, logger
 
+if TYPE_CHECKING:
+    import requests
+
 class ProgressBar:
     def __init__(self, total: int, desc: str = ""):
         self.start_time = datetime.utcnow()
@@ -23,53 +29,181 @@ class ProgressBar:
         self.pbar.close()
         end_time = datetime.utcnow()
         duration = (end_time - self.start_time).total_seconds()
-        print(f"{Fore.GREEN}[{end_time}] Completed in {duration:.2f} seconds{Style.RESET_ALL}")
+        logger.info(f"Completed in {duration:.2f} seconds", extra={'color': Fore.GREEN})
 
-class DelayManager:
-    def __init__(self):
-        self.base_delay_range = CONFIG['DELAY_RANGE']
-        self.captcha_delay_range = CONFIG['CAPTCHA_DELAY_RANGE']
-        self.captcha_encountered = False
-    
-    def get_delay(self) -> float:
-        if self.captcha_encountered:
-            delay = random.uniform(*self.captcha_delay_range)
-            print(f"{Fore.YELLOW}[{datetime.utcnow()}] CAPTCHA detected, increasing delay to {delay:.2f}s{Style.RESET_ALL}")
-        else:
-            delay = random.uniform(*self.base_delay_range)
-            print(f"{Fore.BLUE}[{datetime.utcnow()}] Normal delay: {delay:.2f}s{Style.RESET_ALL}")
+class TokenBucket:
+    """Token bucket for one host; tokens may go negative to queue reservations"""
+
+    def __init__(self, rate: float, burst: float):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.outcomes = deque()  # (timestamp, success) inside the error window
+
+    def refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(1 for _, success in self.outcomes if not success) / len(self.outcomes)
+
+
+class RequestScheduler:
+    """Per-host token buckets that hand out request slots from one shared budget.
+
+    Callers in any thread ask for a slot with ``acquire(url)``, which returns as
+    soon as a token is available, and then ``report(url, success)``. When the
+    share of failures in the recent window crosses ``CONFIG['RATE_ERROR_THRESHOLD']``
+    the host's rate is cut by ``RATE_BACKOFF_FACTOR``; it recovers gradually on
+    success. ``reserve(url)`` books a slot without sleeping for asyncio callers.
+
+    Pool and daemon workers each have their own scheduler with a share of the
+    rate; ``share_backoff`` keeps a host's back-off in shared memory so that
+    when one worker starts seeing blocks, every worker slows down with it.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self.rate = rate or CONFIG['RATE_LIMIT']
+        self.burst = burst or CONFIG['RATE_BURST']
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.shared = {}  # host -> multiprocessing Value('d'): current share of the base rate
+        self.lock = threading.Lock()
+        self.waiting = 0
+
+    def share_backoff(self, url: str, value):
+        """Take the host's back-off from ``value``, shared with the other worker processes"""
+        with self.lock:
+            self.shared[self.host_of(url)] = value
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return (urlsplit(url).hostname or url).lower() if '://' in url else url.lower()
+
+    def bucket(self, host: str) -> TokenBucket:
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    def reserve(self, url: str) -> float:
+        """Book the next slot for the host and return how long to wait for it"""
+        with self.lock:
+            host = self.host_of(url)
+            bucket = self.bucket(host)
+            if host in self.shared:
+                bucket.rate = bucket.base_rate * self.shared[host].value
+            now = time.monotonic()
+            bucket.refill(now)
+            bucket.tokens -= 1
+            if bucket.tokens >= 0:
+                return 0.0
+            return -bucket.tokens / bucket.rate
+
+    def acquire(self, url: str) -> float:
+        """Block until a request slot for the host is available; returns the wait"""
+        delay = self.reserve(url)
+        if delay > 0:
+            with self.lock:
+                self.waiting += 1
+            try:
+                time.sleep(delay)
+            finally:
+                with self.lock:
+                    self.waiting -= 1
         return delay
-    
-    def reset(self):
-        self.captcha_encountered = False
-        print(f"{Fore.GREEN}[{datetime.utcnow()}] Delay manager reset{Style.RESET_ALL}")
+
+    def report(self, url: str, success: bool):
+        """Record a request outcome and adapt the host's rate to the error level"""
+        with self.lock:
+            host = self.host_of(url)
+            bucket = self.bucket(host)
+            shared = self.shared.get(host)
+            with shared.get_lock() if shared is not None else nullcontext():
+                if shared is not None:
+                    # Start from the back-off the other workers have applied
+                    bucket.rate = bucket.base_rate * shared.value
+                now = time.monotonic()
+                bucket.outcomes.append((now, success))
+                while bucket.outcomes and now - bucket.outcomes[0][0] > CONFIG['RATE_ERROR_WINDOW']:
+                    bucket.outcomes.popleft()
+
+                bucket.refill(now)
+                error_rate = bucket.error_rate()
+                if (not success and len(bucket.outcomes) >= CONFIG['RATE_MIN_SAMPLES']
+                        and error_rate >= CONFIG['RATE_ERROR_THRESHOLD']):
+                    new_rate = max(bucket.base_rate * CONFIG['RATE_MIN_FRACTION'],
+                                   bucket.rate * CONFIG['RATE_BACKOFF_FACTOR'])
+                    if new_rate < bucket.rate:
+                        bucket.rate = new_rate
+                        logger.warning(f"{host}: error rate {error_rate:.0%}, slowing to {new_rate:.3f} requests/s")
+                elif success and bucket.rate < bucket.base_rate and error_rate < CONFIG['RATE_ERROR_THRESHOLD']:
+                    bucket.rate = min(bucket.base_rate, bucket.rate * CONFIG['RATE_RECOVERY_FACTOR'])
+                if shared is not None:
+                    shared.value = bucket.rate / bucket.base_rate
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers currently sleeping for a slot"""
+        return self.waiting
+
+    def current_rate(self, url: str) -> float:
+        with self.lock:
+            host = self.host_of(url)
+            if host in self.shared:
+                return self.bucket(host).base_rate * self.shared[host].value
+            return self.bucket(host).rate
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                'queue_depth': self.waiting,
+                'hosts': {
+                    host: {
+                        'rate': round(bucket.rate, 4),
+                        'base_rate': bucket.base_rate,
+                        'tokens': round(bucket.tokens, 2),
+                        'error_rate': round(bucket.error_rate(), 4)
+                    }
+                    for host, bucket in self.buckets.items()
+                }
+            }
+
+
+# Shared by every caller in this process
+scheduler = RequestScheduler()
 
 class NetworkManager:
     @staticmethod
-    def safe_request(url: str, method: str = 'GET', timeout: int = None, **kwargs) -> Optional[requests.Response]:
+    def safe_request(url: str, method: str = 'GET', timeout: int = None, **kwargs) -> Optional['requests.Response']:
+        import requests  # Only callers that actually make requests pay for the import
+
         if timeout is None:
             timeout = CONFIG['TIMEOUT']
         
         for attempt in range(CONFIG['MAX_RETRIES']):
+            # Waits only as long as the host's budget requires, retries included
+            scheduler.acquire(url)
             try:
                 response = requests.request(method, url, timeout=timeout, **kwargs)
                 response.raise_for_status()
+                scheduler.report(url, True)
                 return response
             except requests.exceptions.RequestException as e:
-                print(f"{Fore.RED}[{datetime.utcnow()}] Request failed (attempt {attempt + 1}/{CONFIG['MAX_RETRIES']}): {str(e)}{Style.RESET_ALL}")
+                scheduler.report(url, False)
+                logger.warning(f"Request failed (attempt {attempt + 1}/{CONFIG['MAX_RETRIES']}): {str(e)}")
                 if attempt == CONFIG['MAX_RETRIES'] - 1:
                     logger.error(f"All requests failed for URL {url}: {str(e)}")
                     return None
-                time.sleep(random.uniform(1, 3))
         return None
 
 def safe_sleep(seconds: float):
     """Safe delay with progress indication"""
-    start_time = datetime.utcnow()
-    print(f"{Fore.BLUE}[{start_time}] Waiting for {seconds:.1f} seconds...{Style.RESET_ALL}")
+    logger.info(f"Waiting for {seconds:.1f} seconds...", extra={'color': Fore.BLUE})
     time.sleep(seconds)
-    end_time = datetime.utcnow()
-    print(f"{Fore.GREEN}[{end_time}] Wait completed{Style.RESET_ALL}")
+    logger.info("Wait completed", extra={'color': Fore.GREEN})
 
 def format_size(size: int) -> str:
     """Format file size in bytes to human readable format"""
@@ -79,17 +213,26 @@ def format_size(size: int) -> str:
         size /= 1024
     return f"{size:.2f} TB"
 
+def extract_domain(link: str) -> str:
+    """Return the lower-cased host of a link without a leading www."""
+    try:
+        host = (urlsplit(link).hostname or '').lower()
+    except ValueError:
+        return ''
+    return host[4:] if host.startswith('www.') else host
+
 def get_timestamp() -> str:
     """Get current timestamp in formatted string"""
     return datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
 
 def print_status(message: str, status: str = 'info'):
-    """Print colored status message with timestamp"""
+    """Log a colored status message; the console handler adds the timestamp and rate-limits it"""
     colors = {
         'info': Fore.CYAN,
         'success': Fore.GREEN,
         'warning': Fore.YELLOW,
         'error': Fore.RED
     }
-    color = colors.get(status.lower(), Fore.WHITE)
-    print(f"{color}[{get_timestamp()}] {message}{Style.RESET_ALL}")
\ No newline at end of file
+    levels = {'warning': logging.WARNING, 'error': logging.ERROR}
+    status = status.lower()
+    logger.log(levels.get(status, logging.INFO), message, extra={'color': colors.get(status, Fore.WHITE)})
\ No newline at end of file
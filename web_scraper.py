@@ -1,30 +1,96 @@
-import undetected_chromedriver as uc
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from fake_useragent import UserAgent
 import time
 import random
 from datetime import datetime
 import logging
-import os
-import pandas as pd  # اضافه کردن کتابخانه pandas برای ذخیره در اکسل
+from pathlib import Path
+from urllib.parse import urlencode
 
 from config import CONFIG, get_logger
+from utils import scheduler, format_size
+from serp_cache import SerpCache
+from domain_filter import build_default_filter
+from driver_cache import DriverCache
+from resource_blocking import get_profile, configure_options, apply_url_blocking, page_transfer_stats, summarize_pages
+from metrics import metrics
+from output_files import atomic_path
 
 logger = get_logger(__name__)
 
+# Present as soon as the results page has rendered, with or without results
+RESULTS_CONTAINER = "#search"
+
+# Collects title, link and description of every result in a single WebDriver call
+EXTRACT_RESULTS_SCRIPT = """
+return Array.from(document.querySelectorAll('div.g')).map(function (element) {
+    var title = element.querySelector('h3');
+    var link = element.querySelector('a');
+    var description = element.querySelector('div.VwiC3b');
+    return {
+        title: title ? title.innerText : '',
+        link: link ? link.href : '',
+        description: description ? description.innerText : ''
+    };
+});
+"""
+
 class WebScraper:
-    def __init__(self):
-        self.ua = UserAgent()
-        self.driver = None
-        self.setup_driver()
-        if self.driver:
-            self.wait = WebDriverWait(self.driver, 15)
+    # selenium, undetected_chromedriver, fake_useragent, bs4 and pandas are imported
+    # where they are first needed, and Chrome starts on the first access to self.driver,
+    # so cached keywords and offline commands never pay for them
+    def __init__(self, launch_browser=True):
+        self.launch_browser = launch_browser  # False: never start Chrome (benchmarks, HTML extraction)
+        self._driver = None
+        self._wait = None
+        self._fast_wait = None
+        self.driver_error = None
+        self.search_error = None  # Why the last live search failed (browser or network), None if it did not
+        self.launch_started = None  # Set at launch, cleared once the first page has loaded
+        self.block_profile = get_profile()
+        self.page_loads = []  # Transfer stats of the pages loaded for the current keyword
+        self.cache = SerpCache() if CONFIG['CACHE_ENABLED'] else None
+        self.domain_filter = build_default_filter()
+        self.search_count = 0
+        self.search_seconds = 0.0
+
+    @property
+    def driver(self):
+        """The browser, started on first use"""
+        if self._driver is None and self.launch_browser:
+            if self.driver_error:
+                raise Exception(self.driver_error)  # Don't relaunch a browser that failed to start
+            try:
+                self.launch_started = time.perf_counter()
+                with metrics.time('driver_startup'):
+                    self.setup_driver()
+            except Exception as e:
+                self.driver_error = str(e)
+                raise
+        return self._driver
+
+    @driver.setter
+    def driver(self, value):
+        self._driver = value
+
+    @property
+    def wait(self):
+        if self._wait is None:
+            from selenium.webdriver.support.ui import WebDriverWait
+            self._wait = WebDriverWait(self.driver, 15)
+        return self._wait
+
+    @property
+    def fast_wait(self):
+        if self._fast_wait is None:
+            from selenium.webdriver.support.ui import WebDriverWait
+            # Polls often so fast mode returns as soon as the DOM is ready
+            self._fast_wait = WebDriverWait(self.driver, CONFIG['TIMEOUT'], poll_frequency=0.05)
+        return self._fast_wait
 
     def setup_driver(self):
         try:
+            import undetected_chromedriver as uc
+            from fake_useragent import UserAgent
+
             options = uc.ChromeOptions()
             options.add_argument('--no-sandbox')
             options.add_argument('--disable-dev-shm-usage')
@@ -32,27 +98,36 @@ class WebScraper:
             options.add_argument('--disable-extensions')
             options.add_argument('--disable-popup-blocking')
             options.add_argument('--start-maximized')
-            options.add_argument(f'user-agent={self.ua.random}')
-            
-            # Chrome path
-            chrome_paths = [
-                r"C:\Program Files\Google\Chrome\Application\chrome.exe",
-                r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe"
-            ]
-            
-            chrome_path = None
-            for path in chrome_paths:
-                if os.path.exists(path):
-                    chrome_path = path
-                    break
+            options.add_argument(f'user-agent={UserAgent().random}')
+            if self.block_profile['name'] == 'strict' and not CONFIG['FAST_MODE']:
+                logger.warning("The 'strict' blocking profile disables JavaScript, which interactive search needs")
+            # Images/JS via content settings; undetected_chromedriver adds its own headless flags
+            configure_options(options, self.block_profile, headless=False)
+            if CONFIG['HEADLESS']:
+                options.add_argument('--window-size=1366,900')
+
+            # Chrome and the patched chromedriver are resolved once and cached between runs
+            with metrics.time('driver_resolve'):
+                driver_cache = DriverCache()
+                browser = driver_cache.browser()
+                driver_path = driver_cache.undetected_chromedriver(browser)
+
+            # A reused profile skips Chrome's first-run work on every start
+            profile_dir = CONFIG['CHROME_PROFILE_DIR']
+            if profile_dir:
+                Path(profile_dir).mkdir(parents=True, exist_ok=True)
 
-            # Initialize the Chrome driver without 'executable_path'
             self.driver = uc.Chrome(
                 options=options,
-                browser_executable_path=chrome_path,
-                version_main=None,  # Auto-detect Chrome version
+                browser_executable_path=browser['path'],
+                driver_executable_path=driver_path,
+                user_data_dir=str(profile_dir) if profile_dir else None,
+                version_main=browser['major'],
+                headless=CONFIG['HEADLESS'],
                 use_subprocess=True
             )
+            # Fonts, stylesheets and trackers by URL pattern
+            apply_url_blocking(self.driver, self.block_profile)
             
             self.driver.set_page_load_timeout(CONFIG['TIMEOUT'])
             logger.info("Browser initialized successfully")
@@ -62,69 +137,206 @@ class WebScraper:
             logger.error(error_msg)
             raise Exception(error_msg)
 
-    def search_google(self, keyword):
+    def record_first_request(self):
+        """Report the time from browser launch until its first page had loaded, once per browser"""
+        if self.launch_started is None:
+            return
+        elapsed = time.perf_counter() - self.launch_started
+        self.launch_started = None
+        metrics.observe('launch_to_first_request', elapsed)
+        logger.info(f"Browser startup: first page loaded {elapsed:.2f}s after launch")
+
+    def record_page_load(self):
+        """Add the bytes transferred and load time of the page now in the browser"""
+        stats = page_transfer_stats(self.driver)
+        self.page_loads.append(stats)
+        metrics.observe('page_load', stats['load_ms'] / 1000)
+        metrics.inc('bytes_transferred', stats['bytes'])
+
+    def log_page_loads(self, keyword):
+        """Log what the keyword's result pages cost on the wire under the active blocking profile"""
+        if not self.page_loads:
+            return
+        summary = summarize_pages(self.page_loads)
+        logger.info(f"Keyword '{keyword}': {summary['pages']} pages, {format_size(summary['bytes'])} transferred "
+                    f"in {summary['resources']} resources, {summary['load_ms']:.0f} ms page load "
+                    f"(blocking: {self.block_profile['name']})")
+
+    def get_cached_results(self, keyword):
+        """Return the results of every cached page, or None if the keyword must be fetched"""
+        if not self.cache:
+            return None
+        pages = self.cache.get_pages(keyword)
+        if pages is None:
+            return None
+        return [result for page_results in pages for result in page_results]
+
+    def search_google(self, keyword, refresh=None):
+        self.search_error = None
+        if refresh is None:
+            refresh = CONFIG['CACHE_REFRESH']
+
+        if not refresh:
+            cached = self.get_cached_results(keyword)
+            if cached is not None:
+                logger.info(f"Cache hit for: {keyword}")
+                metrics.inc('cache_hits')
+                return cached[:20]
+
+        fast_mode = CONFIG['FAST_MODE']
+        start = time.perf_counter()
+        self.page_loads = []
         try:
             logger.info(f"Searching for: {keyword}")
+            if fast_mode:
+                pages = self._search_by_url(keyword)
+            else:
+                pages = self._search_interactive(keyword)
+            # An empty first page usually means a CAPTCHA or block, which slows the scheduler down
+            scheduler.report(CONFIG['SEARCH_URL'], bool(pages and pages[0]))
+
+            if self.cache and pages and pages[0]:
+                self.cache.set_pages(keyword, pages)
+            results = [result for page_results in pages for result in page_results]
+
+            # ذخیره نتایج در فایل اکسل
+            if CONFIG['PER_KEYWORD_EXCEL']:
+                self.save_results_to_excel(keyword, results)
+
+            return results[:20]
+
+        except Exception as e:
+            logger.error(f"Search error for '{keyword}': {str(e)}")
+            self.search_error = str(e)
+            scheduler.report(CONFIG['SEARCH_URL'], False)
+            return []
+
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe('search', elapsed)
+            metrics.inc('searches')
+            self.record_search_time(keyword, elapsed, fast_mode)
+            self.log_page_loads(keyword)
+
+    def _search_interactive(self, keyword):
+        """Type the keyword into the Google home page like a user, then paginate"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.keys import Keys
+        from selenium.webdriver.support import expected_conditions as EC
+
+        with metrics.time('rate_limit_wait'):
+            scheduler.acquire(CONFIG['SEARCH_URL'])
+        with metrics.time('navigation'):
             self.driver.get("https://www.google.com")
+        self.record_first_request()
+        self.record_page_load()
+        with metrics.time('wait'):
             time.sleep(3)
-
             search_box = self.wait.until(EC.presence_of_element_located((By.NAME, "q")))
-            search_box.clear()
-            
-            # Type keyword naturally
+        search_box.clear()
+        
+        # Type keyword naturally
+        with metrics.time('typing'):
             for char in keyword:
                 search_box.send_keys(char)
                 time.sleep(random.uniform(0.1, 0.3))
-            
             time.sleep(1)
+        with metrics.time('navigation'):
             search_box.send_keys(Keys.RETURN)
+        with metrics.time('wait'):
             time.sleep(3)
 
-            results = self.extract_results_from_page()
-            time.sleep(2)
+        self.record_page_load()
+        pages = [self.extract_results_from_page()]
 
-            # Try to get results from second page
-            try:
+        # Try to get results from second page
+        try:
+            with metrics.time('wait'):
                 next_button = self.wait.until(EC.element_to_be_clickable((By.ID, "pnnext")))
+            with metrics.time('rate_limit_wait'):
+                scheduler.acquire(CONFIG['SEARCH_URL'])
+            with metrics.time('navigation'):
                 self.driver.execute_script("arguments[0].click();", next_button)
+            with metrics.time('wait'):
                 time.sleep(3)
-                second_page_results = self.extract_results_from_page()
-                results.extend(second_page_results)
-            except Exception as e:
-                logger.warning(f"Could not get second page: {str(e)}")
+            self.record_page_load()
+            pages.append(self.extract_results_from_page())
+        except Exception as e:
+            logger.warning(f"Could not get second page: {str(e)}")
 
-            # ذخیره نتایج در فایل اکسل
-            self.save_results_to_excel(keyword, results)
+        return pages
 
-            return results[:20]
+    def _search_by_url(self, keyword):
+        """Fast mode: load result pages by URL and wait only until the results container exists"""
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
 
-        except Exception as e:
-            logger.error(f"Search error for '{keyword}': {str(e)}")
-            return []
+        pages = []
+        for page in (1, 2):
+            with metrics.time('rate_limit_wait'):
+                scheduler.acquire(CONFIG['SEARCH_URL'])
+            with metrics.time('navigation'):
+                self.driver.get(self.build_search_url(keyword, page))
+            self.record_first_request()
+            try:
+                with metrics.time('wait'):
+                    self.fast_wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, RESULTS_CONTAINER)))
+            except TimeoutException:
+                if page == 1:
+                    raise
+                logger.warning(f"Could not get page {page} for: {keyword}")
+                break
 
-    def extract_results_from_page(self):
-        results = []
+            self.record_page_load()
+            page_results = self.extract_results_from_page(wait=False)
+            pages.append(page_results)
+            if not page_results:
+                break
+
+        return pages
+
+    @staticmethod
+    def build_search_url(keyword, page=1):
+        params = {'q': keyword}
+        if page > 1:
+            params['start'] = (page - 1) * 10
+        return f"{CONFIG['SEARCH_URL']}?{urlencode(params)}"
+
+    def record_search_time(self, keyword, elapsed, fast_mode):
+        """Log per-keyword wall time and the running keywords/minute rate"""
+        self.search_count += 1
+        self.search_seconds += elapsed
+        rate = self.search_count * 60 / self.search_seconds if self.search_seconds else 0
+        mode = 'fast' if fast_mode else 'normal'
+        logger.info(f"Keyword '{keyword}' took {elapsed:.2f}s ({mode} mode, {rate:.1f} keywords/min)")
+
+    def extract_results_from_page(self, method=None, wait=True):
+        """Extract results from the current page using the configured method"""
+        method = method or CONFIG['EXTRACTION_METHOD']
         try:
-            elements = self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.g")))
-            
-            for element in elements:
-                try:
-                    title = element.find_element(By.CSS_SELECTOR, "h3").text
-                    link = element.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
-                    try:
-                        description = element.find_element(By.CSS_SELECTOR, "div.VwiC3b").text
-                    except:
-                        description = ""
-                    
-                    if title and link and self.is_valid_url(link):
-                        results.append({
-                            'title': title,
-                            'link': link,
-                            'description': description,
-                            'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                        })
-                except:
-                    continue
+            if wait:
+                from selenium.webdriver.common.by import By
+                from selenium.webdriver.support import expected_conditions as EC
+                with metrics.time('wait'):
+                    self.wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div.g")))
+
+            start = time.perf_counter()
+            if method == 'elements':
+                results = self._extract_with_elements()
+            elif method == 'script':
+                results = self._extract_with_script()
+            else:
+                results = self._extract_with_parser()
+            elapsed = time.perf_counter() - start
+            metrics.observe('extraction', elapsed)
+            metrics.inc('pages_extracted')
+            metrics.inc('results_extracted', len(results))
+            elapsed_ms = elapsed * 1000
+            logger.info(f"Extracted {len(results)} results in {elapsed_ms:.1f} ms ({method})")
+
+            if CONFIG['COMPARE_EXTRACTION']:
+                self.compare_extraction_methods()
 
             return results
 
@@ -132,13 +344,93 @@ class WebScraper:
             logger.error(f"Error extracting results: {str(e)}")
             return []
 
+    def _extract_with_parser(self):
+        """Extract results offline from one page_source read"""
+        return self.extract_results_from_html(self.driver.page_source, base_url=self.driver.current_url)
+
+    def extract_results_from_html(self, html, base_url=None):
+        """Parse SERP HTML and keep results whose domain passes the filter"""
+        from serp_parser import parse_serp
+
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        results = []
+        for item in parse_serp(html, base_url=base_url):
+            if self.is_valid_url(item['link']):
+                item['timestamp'] = timestamp
+                results.append(item)
+        return results
+
+    def _extract_with_script(self):
+        """Extract all results with one execute_script round trip"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        results = []
+        for item in self.driver.execute_script(EXTRACT_RESULTS_SCRIPT) or []:
+            title = item.get('title', '')
+            link = item.get('link', '')
+            if title and link and self.is_valid_url(link):
+                results.append({
+                    'title': title,
+                    'link': link,
+                    'description': item.get('description', ''),
+                    'timestamp': timestamp
+                })
+        return results
+
+    def _extract_with_elements(self):
+        """Extract results with per-element WebDriver queries (one round trip per field)"""
+        from selenium.webdriver.common.by import By
+
+        results = []
+        elements = self.driver.find_elements(By.CSS_SELECTOR, "div.g")
+        
+        for element in elements:
+            try:
+                title = element.find_element(By.CSS_SELECTOR, "h3").text
+                link = element.find_element(By.CSS_SELECTOR, "a").get_attribute("href")
+                try:
+                    description = element.find_element(By.CSS_SELECTOR, "div.VwiC3b").text
+                except:
+                    description = ""
+                
+                if title and link and self.is_valid_url(link):
+                    results.append({
+                        'title': title,
+                        'link': link,
+                        'description': description,
+                        'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    })
+            except:
+                continue
+
+        return results
+
+    def compare_extraction_methods(self):
+        """Time every extraction method on the current page and log them side by side"""
+        timings = {}
+        extractors = {
+            'html': self._extract_with_parser,
+            'script': self._extract_with_script,
+            'elements': self._extract_with_elements,
+        }
+        for name, extract in extractors.items():
+            start = time.perf_counter()
+            count = len(extract())
+            timings[name] = (time.perf_counter() - start) * 1000
+            logger.info(f"Extraction benchmark: {name:<8} {timings[name]:8.1f} ms ({count} results)")
+        for name in ('html', 'script'):
+            if timings[name] > 0:
+                logger.info(f"Extraction benchmark: {name} speedup {timings['elements'] / timings[name]:.1f}x")
+        return timings
+
     def is_valid_url(self, url):
-        blacklist = ['google.com', 'youtube.com', 'facebook.com']
-        return url and not any(site in url.lower() for site in blacklist)
+        # Matches the URL's host against the block/allow lists, not the whole URL text
+        return bool(url) and self.domain_filter.allows(url)
 
     def save_results_to_excel(self, keyword, results):
         """ذخیره نتایج در فایل اکسل"""
         try:
+            import pandas as pd
+
             # ایجاد یک DataFrame از نتایج
             df = pd.DataFrame(results)
 
@@ -152,7 +444,8 @@ class WebScraper:
                 excel_filename = f"results_{keyword}_{timestamp}.xlsx"
 
                 # ذخیره در فایل اکسل
-                df.to_excel(excel_filename, index=False, engine='openpyxl')
+                with atomic_path(excel_filename) as temp_path:
+                    df.to_excel(temp_path, index=False, engine='openpyxl')
                 logger.info(f"نتایج با موفقیت در فایل اکسل ذخیره شد: {excel_filename}")
             else:
                 logger.warning("هیچ نتیجه‌ای برای ذخیره در اکسل وجود ندارد.")
@@ -160,10 +453,24 @@ class WebScraper:
         except Exception as e:
             logger.error(f"خطا در ذخیره نتایج در اکسل: {str(e)}")
 
+    def quit_browser(self):
+        """Close the browser if one was started; the next search starts a new one"""
+        self.driver_error = None  # Also retry a browser that failed to start
+        if self._driver is not None:
+            try:
+                self._driver.quit()
+                logger.info("Browser closed successfully")
+            except Exception as e:
+                logger.error(f"Error closing browser: {str(e)}")
+            self._driver = None
+            self._wait = None
+            self._fast_wait = None
+
     def __del__(self):
         try:
-            if hasattr(self, 'driver') and self.driver:
-                self.driver.quit()
+            # _driver, not driver: a browser that never started must not be launched here
+            if getattr(self, '_driver', None):
+                self._driver.quit()
                 logger.info("Browser closed successfully")
         except:
             pass
\ No newline at end of file
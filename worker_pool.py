@@ -0,0 +1,121 @@
+import multiprocessing as mp
+import queue
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from config import CONFIG, get_logger, setup_logging, worker_log_queue
+from utils import scheduler
+
+logger = get_logger(__name__)
+
+# Message kinds sent from workers back to the parent process
+MSG_RESULT = 'result'
+MSG_ERROR = 'error'
+MSG_DONE = 'done'
+
+
+class WorkerPool:
+    """Run keywords across several browser processes that pull from a shared queue.
+
+    ``worker`` must be a module-level function with the signature
+    ``worker(worker_id, task_queue, result_queue)``. It reads keywords from
+    ``task_queue`` until it receives ``None`` and reports back with
+    ``(MSG_RESULT, keyword, payload)`` or ``(MSG_ERROR, keyword, message)``,
+    finishing with ``(MSG_DONE, worker_id, None)``.
+    """
+
+    def __init__(self, worker: Callable, size: Optional[int] = None):
+        self.worker = worker
+        self.size = max(1, size or CONFIG['POOL_SIZE'])
+        # Spawn gives every worker a clean interpreter for its own Chrome instance
+        self.context = mp.get_context('spawn')
+
+    def run(self, keywords: Iterable[str], on_result: Callable, on_error: Optional[Callable] = None):
+        """Distribute keywords and call ``on_result(keyword, payload)`` as results arrive"""
+        keywords = list(keywords)
+        if not keywords:
+            return
+
+        task_queue = self.context.Queue()
+        result_queue = self.context.Queue()
+        for keyword in keywords:
+            task_queue.put(keyword)
+
+        size = min(self.size, len(keywords))
+        for _ in range(size):
+            task_queue.put(None)
+
+        # Workers split the per-host request budget so the pool as a whole keeps to it
+        worker_config = dict(CONFIG)
+        worker_config['RATE_LIMIT'] = CONFIG['RATE_LIMIT'] / size
+        log_queue = worker_log_queue(self.context)
+        backoff = self.context.Value('d', 1.0)  # Search host back-off, shared so workers slow down together
+
+        workers: List[mp.Process] = []
+        for worker_id in range(size):
+            process = self.context.Process(
+                target=_run_worker,
+                args=(self.worker, worker_config, worker_id, task_queue, result_queue, log_queue, backoff),
+                daemon=True
+            )
+            process.start()
+            workers.append(process)
+        logger.info(f"Started worker pool with {size} browser processes")
+
+        # Counts, not a set: a keyword listed twice is outstanding until both copies report back
+        pending = Counter(keywords)
+        finished_workers = 0
+        try:
+            while +pending and finished_workers < size:
+                try:
+                    kind, key, payload = result_queue.get(timeout=1)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in workers):
+                        break
+                    continue
+
+                if kind == MSG_DONE:
+                    finished_workers += 1
+                elif kind == MSG_RESULT:
+                    pending[key] -= 1
+                    on_result(key, payload)
+                elif kind == MSG_ERROR:
+                    pending[key] -= 1
+                    if on_error:
+                        on_error(key, payload)
+                    else:
+                        logger.error(f"Worker error for keyword {key}: {payload}")
+
+            # Keywords left behind by workers that died before finishing
+            for keyword, count in pending.items():
+                for _ in range(count):
+                    message = "Worker exited before processing keyword"
+                    if on_error:
+                        on_error(keyword, message)
+                    else:
+                        logger.error(f"{message}: {keyword}")
+        finally:
+            for process in workers:
+                process.join(timeout=30)
+                if process.is_alive():
+                    process.terminate()
+            logger.info("Worker pool stopped")
+
+
+def init_worker_process(config: dict, worker_id: int, log_queue=None, backoff=None):
+    """Apply the parent's runtime CONFIG (CLI overrides) in a spawned browser process"""
+    CONFIG.update(config)
+    if CONFIG.get('CHROME_PROFILE_DIR'):
+        # Chrome locks its profile, so each worker keeps its own
+        CONFIG['CHROME_PROFILE_DIR'] = Path(CONFIG['CHROME_PROFILE_DIR']) / f"worker{worker_id}"
+    setup_logging(log_queue)  # Records go to the parent's listener, the only writer of debug.log
+    scheduler.rate = CONFIG['RATE_LIMIT']
+    if backoff is not None:
+        scheduler.share_backoff(CONFIG['SEARCH_URL'], backoff)
+
+
+def _run_worker(worker: Callable, config: dict, worker_id: int, task_queue, result_queue, log_queue=None,
+                backoff=None):
+    init_worker_process(config, worker_id, log_queue, backoff)
+    worker(worker_id, task_queue, result_queue)